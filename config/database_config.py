@@ -24,6 +24,30 @@ class DatabaseConfig:
     # 벡터 설정
     vector_dimension: int = 1536  # OpenAI embedding 차원
     vector_similarity_threshold: float = 0.7
+    # text_embedding 저장 형식: array(BSON 배열), float32/float16/int8(BSON Binary)
+    embedding_storage_format: str = "array"
+    # 차원 축소 투영 버전 (None이면 원본 임베딩 사용, scripts/fit_embedding_projection.py로 생성)
+    embedding_projection_version: Optional[str] = None
+    embedding_projection_path: str = "./data/embeddings/projections"
+    
+    # 벡터 검색 캐시 설정 (프로세스 단위 임베딩 행렬 캐시)
+    vector_cache_enabled: bool = True
+    vector_cache_max_mb: int = 1024
+    vector_cache_ttl_seconds: int = 300
+    # 폴더별 임베딩 스냅샷(.npy, mmap)에서 먼저 로드하고 이후 변경분만 MongoDB에서 조회
+    vector_snapshot_enabled: bool = False
+    vector_snapshot_path: str = "./data/embeddings/snapshots"
+    
+    # ANN 인덱스 설정 (폴더별 FAISS 인덱스, 비활성화 시 정확 검색)
+    ann_enabled: bool = False
+    ann_index_type: str = "hnsw"  # hnsw | ivf_flat
+    ann_index_path: str = "./data/embeddings/ann"
+    ann_min_documents: int = 1000  # 이보다 작은 폴더는 정확 검색
+    ann_hnsw_m: int = 32
+    ann_ef_search: int = 64
+    ann_ivf_nlist: int = 1024
+    ann_nprobe: int = 16
+    ann_autosave_every: int = 1000  # 저장되지 않은 변경 수가 이만큼 쌓이면 저장
     
     # 폴더 설정
     default_folder_name: str = "기본 폴더"
@@ -10,8 +10,50 @@ class Settings:
         self.mongodb_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017/rag_system")
         self.vector_db_type = os.getenv("VECTOR_DB_TYPE", "faiss")
         self.embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+        self.local_embedding_dimension = int(os.getenv("LOCAL_EMBEDDING_DIMENSION", "1536"))
         self.llm_model = os.getenv("LLM_MODEL", "gpt-4")
         self.chunk_size = int(os.getenv("CHUNK_SIZE", "500"))
         self.chunk_overlap = int(os.getenv("CHUNK_OVERLAP", "50"))
+        self.chunk_strategy = os.getenv("CHUNK_STRATEGY", "character")
+        self.chunk_tokens = int(os.getenv("CHUNK_TOKENS", "256"))
+        self.chunk_overlap_tokens = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+        self.context_max_tokens = int(os.getenv("CONTEXT_MAX_TOKENS", "3000"))
+        self.chunk_spans_enabled = os.getenv("CHUNK_SPANS_ENABLED", "false").lower() == "true"
+        self.faiss_index_path = os.getenv("FAISS_INDEX_PATH", "./data/embeddings/faiss")
+        self.faiss_keep_versions = int(os.getenv("FAISS_KEEP_VERSIONS", "3"))
+        self.faiss_publish_every = int(os.getenv("FAISS_PUBLISH_EVERY", "5000"))
+        self.faiss_allow_pickle = os.getenv("FAISS_ALLOW_PICKLE", "false").lower() == "true"
+        self.index_reload_interval = float(os.getenv("INDEX_RELOAD_INTERVAL", "5"))
+        self.embedding_cache_enabled = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+        self.embedding_cache_path = os.getenv("EMBEDDING_CACHE_PATH", "./data/cache/embeddings.sqlite")
+        self.embedding_cache_max_mb = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "2048"))
+        self.embedding_scheduler_enabled = os.getenv("EMBEDDING_SCHEDULER_ENABLED", "true").lower() == "true"
+        self.embedding_api_base = os.getenv("EMBEDDING_API_BASE", "https://api.openai.com/v1")
+        self.embedding_max_concurrency = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+        self.embedding_rpm = int(os.getenv("EMBEDDING_RPM", "3000"))
+        self.embedding_tpm = int(os.getenv("EMBEDDING_TPM", "1000000"))
+        self.embedding_batch_tokens = int(os.getenv("EMBEDDING_BATCH_TOKENS", "20000"))
+        self.query_cache_enabled = os.getenv("QUERY_CACHE_ENABLED", "true").lower() == "true"
+        self.query_cache_max_entries = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "10000"))
+        self.query_cache_ttl_seconds = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "3600"))
+        self.query_cache_shared = os.getenv("QUERY_CACHE_SHARED", "false").lower() == "true"
+        self.loader_workers = int(os.getenv("LOADER_WORKERS", "0"))
+        self.loader_file_timeout = float(os.getenv("LOADER_FILE_TIMEOUT", "120"))
+        self.pipeline_load_workers = int(os.getenv("PIPELINE_LOAD_WORKERS", "2"))
+        self.pipeline_embed_workers = int(os.getenv("PIPELINE_EMBED_WORKERS", "2"))
+        self.pipeline_embed_batch_size = int(os.getenv("PIPELINE_EMBED_BATCH_SIZE", "256"))
+        self.pipeline_store_batch_size = int(os.getenv("PIPELINE_STORE_BATCH_SIZE", "500"))
+        self.pipeline_queue_size = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+        self.dedup_enabled = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+        self.dedup_threshold = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+        self.dedup_num_perm = int(os.getenv("DEDUP_NUM_PERM", "128"))
+        self.dedup_bands = int(os.getenv("DEDUP_BANDS", "16"))
+        self.upload_dir = os.getenv("UPLOAD_DIR", "./data/uploads")
+        self.upload_max_mb = int(os.getenv("UPLOAD_MAX_MB", "512"))
+        self.upload_max_concurrency = int(os.getenv("UPLOAD_MAX_CONCURRENCY", "4"))
+        self.upload_workers = int(os.getenv("UPLOAD_WORKERS", "2"))
+        self.upload_job_poll_interval = float(os.getenv("UPLOAD_JOB_POLL_INTERVAL", "1"))
+        self.upload_job_stale_seconds = float(os.getenv("UPLOAD_JOB_STALE_SECONDS", "300"))
+        self.upload_job_max_attempts = int(os.getenv("UPLOAD_JOB_MAX_ATTEMPTS", "3"))
 
 settings = Settings()
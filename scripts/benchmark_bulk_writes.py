@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+MongoDB 쓰기 경로 벤치마크
+CREATED [2026-10-18]: 행 단위 insert_one과 배치 insert_many의 초당 저장 행 수 비교
+
+동작:
+- 임시 폴더에 합성 Document / Labels / QAPairs를 행 단위와 배치 단위로 각각 저장
+- pymongo 명령 모니터링으로 왕복 횟수를 집계
+- 종료 시 임시 폴더 삭제
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import time
+import numpy as np
+from pymongo import monitoring
+from config.database_config import DatabaseConfig
+from config.settings import settings
+
+
+class RoundTripListener(monitoring.CommandListener):
+    """쓰기 명령 왕복 횟수 집계"""
+
+    def __init__(self):
+        self.round_trips = 0
+
+    def reset(self):
+        self.round_trips = 0
+
+    def started(self, event):
+        if event.command_name in ("insert", "update"):
+            self.round_trips += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def synthetic_rows(folder_id, count, dimension, text_length):
+    rng = np.random.default_rng(42)
+    text = "가나다라마바사아자차카타파하 " * (text_length // 15 + 1)
+    return [{
+        "folder_id": folder_id,
+        "raw_text": text[:text_length],
+        "chunk_sequence": f"bench_{i}",
+        "text_embedding": rng.normal(size=dimension).tolist(),
+        "metadata": {"source": "benchmark", "index": i}
+    } for i in range(count)]
+
+
+def measure(listener, label, func, rows):
+    listener.reset()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26} {rows / elapsed:>12.0f} rows/s {listener.round_trips:>8} {elapsed:>9.2f} s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MongoDB bulk write benchmark")
+    parser.add_argument("--documents", type=int, default=2000, help="Number of synthetic documents")
+    parser.add_argument("--dimension", type=int, default=1536, help="Embedding dimension")
+    parser.add_argument("--text-length", type=int, default=500, help="Characters of raw_text per document")
+    parser.add_argument("--batch-size", type=int, default=DatabaseConfig.batch_size, help="DatabaseConfig.batch_size")
+    args = parser.parse_args()
+
+    listener = RoundTripListener()
+    monitoring.register(listener)
+
+    # 모니터링 등록 후 클라이언트 생성
+    from src.utils.database_v2 import MongoDBClientV2
+
+    db = MongoDBClientV2(settings.mongodb_uri, DatabaseConfig(vector_cache_enabled=False, batch_size=args.batch_size))
+    folder_id = db.create_folder(title="bulk write benchmark", folder_type="benchmark")
+
+    try:
+        rows = synthetic_rows(folder_id, args.documents, args.dimension, args.text_length)
+        print(f"{args.documents} documents (dim={args.dimension}, text={args.text_length} chars), "
+              f"batch size {args.batch_size}")
+        print(f"\n{'method':<26} {'throughput':>19} {'trips':>8} {'time':>11}")
+
+        document_ids = []
+        row_time = measure(listener, "Document insert_one", lambda: document_ids.extend(
+            db.insert_document(**row) for row in rows), len(rows))
+        bulk_time = measure(listener, "Document bulk", lambda: db.insert_documents_bulk(rows), len(rows))
+
+        labels = [{"document_id": doc_id, "folder_id": folder_id, "main_topic": "경제",
+                   "tags": ["금리", "물가"], "category": "news"} for doc_id in document_ids]
+        measure(listener, "Labels insert_one", lambda: [db.insert_labels(**label) for label in labels], len(labels))
+        measure(listener, "Labels bulk", lambda: db.insert_labels_bulk(labels), len(labels))
+
+        qa_pairs = [{"document_id": doc_id, "folder_id": folder_id, "question": "금리는 언제 내려가나요?",
+                     "answer": "시점이 늦어질 수 있습니다."} for doc_id in document_ids]
+        measure(listener, "QAPairs insert_one", lambda: [db.insert_qa_pair(**qa) for qa in qa_pairs], len(qa_pairs))
+        measure(listener, "QAPairs bulk", lambda: db.insert_qa_pairs_bulk(qa_pairs), len(qa_pairs))
+
+        print(f"\nDocument speedup: {row_time / bulk_time:.1f}x")
+    finally:
+        db.delete_folder(folder_id, recursive=True)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+청킹 벤치마크
+CREATED [2026-10-18]: 글자 수 청커와 한국어 문장/토큰 청커의 처리량과 청크 토큰 수 분포 비교
+
+비교 대상:
+- character: RecursiveCharacterTextSplitter 기반 글자 수 청킹 (TextChunker)
+- korean_sentence: 문장 경계 + 토큰 수 청킹 (KoreanSentenceChunker)
+
+토큰 수 분포는 임베딩 모델 카운터 기준이며, korean_sentence는 청크의
+metadata["token_count"]를 그대로 사용합니다.
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import statistics
+import time
+from langchain.schema import Document
+from config.settings import settings
+from src.data_processing.chunker import KoreanSentenceChunker, TextChunker
+from src.utils.token_counter import get_token_counter
+
+SENTENCES = [
+    "서울시는 내년부터 대중교통 요금을 3.5% 인상한다고 밝혔다.",
+    "시는 운영 적자가 누적되어 요금 조정이 불가피하다고 설명했다.",
+    "정부는 반도체 산업 지원을 위해 세액 공제 범위를 넓히기로 했다.",
+    "전문가들은 “금리 인하 시점이 늦어질 수 있다”고 전망했다.",
+    "시민단체는 물가 부담을 이유로 반대 입장을 냈다.",
+    "과연 이번 대책이 효과를 낼 수 있을까?"
+]
+
+
+def synthetic_documents(documents: int, document_kb: int):
+    documents_list = []
+    for i in range(documents):
+        parts, size = [], 0
+        while size < document_kb * 1024:
+            sentence = SENTENCES[(i + len(parts)) % len(SENTENCES)]
+            parts.append(sentence + ("\n" if len(parts) % 7 == 6 else " "))
+            size += len(sentence.encode("utf-8")) + 1
+        documents_list.append(Document(page_content="".join(parts), metadata={"source": f"news{i}.txt"}))
+    return documents_list
+
+
+def report(label: str, chunker, documents, total_mb: float, count_tokens):
+    start = time.perf_counter()
+    chunks = chunker.split_documents(documents)
+    elapsed = time.perf_counter() - start
+    counts = [chunk.metadata.get("token_count") or count_tokens(chunk.page_content) for chunk in chunks]
+    print(f"{label:<17}{elapsed:9.3f}s{total_mb / elapsed:10.2f} MB/s{len(chunks):>8}"
+          f"{min(counts):>6}{statistics.mean(counts):>8.1f}{max(counts):>6}{statistics.pstdev(counts):>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunking throughput benchmark")
+    parser.add_argument("--documents", type=int, default=8)
+    parser.add_argument("--document-kb", type=int, default=256, help="Size of each synthetic article")
+    args = parser.parse_args()
+
+    documents = synthetic_documents(args.documents, args.document_kb)
+    total_mb = sum(len(doc.page_content.encode("utf-8")) for doc in documents) / 1024 / 1024
+    count_tokens = get_token_counter(settings.embedding_model)
+
+    print(f"Corpus: {args.documents} documents, {total_mb:.1f} MB")
+    print(f"{'chunker':<17}{'time':>10}{'throughput':>15}{'chunks':>8}{'min':>6}{'mean':>8}{'max':>6}{'stdev':>8}")
+    report("character", TextChunker(), documents, total_mb, count_tokens)
+    report("korean_sentence", KoreanSentenceChunker(token_counter=count_tokens), documents, total_mb, count_tokens)
+
+
+if __name__ == "__main__":
+    main()
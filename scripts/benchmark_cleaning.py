@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+텍스트 클렌징 벤치마크
+CREATED [2026-10-18]: 수 MB 한국어 뉴스 코퍼스로 클렌징 처리량과 메모리 사용량 측정
+
+비교 대상:
+- legacy: 컴파일하지 않은 패턴으로 re.sub 4회 (기존 구현)
+- compiled: 병합/컴파일된 규칙 + str.split 공백 정리 (TextCleaner.clean_text)
+- stream: 블록 단위 클렌징 (TextCleaner.clean_stream)
+- parallel: 문서 목록을 프로세스 풀로 분산 (TextCleaner.clean_texts_parallel)
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import os
+import random
+import re
+import time
+import tracemalloc
+from src.data_processing.cleaner import TextCleaner
+
+SENTENCES = [
+    "서울시는 내년부터 대중교통 요금을 인상한다고 밝혔다.",
+    "시는 운영 적자가 누적되어 요금 조정이 불가피하다고 설명했다.",
+    "정부는 반도체 산업 지원을 위해 세액 공제 범위를 넓히기로 했다.",
+    "전문가들은 금리 인하 시점이 늦어질 수 있다고 전망했다.",
+    "시민단체는 물가 부담을 이유로 반대 입장을 냈다."
+]
+NOISE = [
+    "이 기사에는 광고가 포함될 수 있습니다.",
+    "<p>", "</p>", "<br/>", "<a href=\"https://news.example.com/related\">관련 기사</a>",
+    "https://news.example.com/2026/10/18/article?id=12345",
+    "\n\n   ", "\t"
+]
+
+
+def synthetic_corpus(documents: int, document_kb: int, seed: int = 0):
+    """광고 문구, HTML, URL, 불규칙한 공백이 섞인 한국어 기사"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(documents):
+        parts, size = [], 0
+        while size < document_kb * 1024:
+            part = rng.choice(SENTENCES) if rng.random() < 0.8 else rng.choice(NOISE)
+            parts.append(part)
+            size += len(part.encode("utf-8")) + 1
+        corpus.append(" ".join(parts))
+    return corpus
+
+
+def legacy_clean(cleaner: TextCleaner, text: str) -> str:
+    """기존 구현 (패턴 문자열로 re.sub 4회)"""
+    text = re.sub(cleaner.patterns['ads'], '', text)
+    text = re.sub(cleaner.patterns['html'], '', text)
+    text = re.sub(cleaner.patterns['urls'], '', text)
+    text = re.sub(cleaner.patterns['multiple_spaces'], ' ', text)
+    return text.strip()
+
+
+def measure(label: str, func, total_mb: float, baseline: float = None):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    speedup = f"{baseline / elapsed:6.2f}x" if baseline else f"{'1.00x':>7}"
+    print(f"{label:<14}{elapsed:9.3f}s{total_mb / elapsed:10.1f} MB/s{speedup:>9}{peak / 1024 / 1024:12.1f} MB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Text cleaning throughput benchmark")
+    parser.add_argument("--documents", type=int, default=16)
+    parser.add_argument("--document-kb", type=int, default=1024, help="Size of each synthetic article")
+    parser.add_argument("--block-kb", type=int, default=64, help="Block size for stream cleaning")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    cleaner = TextCleaner()
+    corpus = synthetic_corpus(args.documents, args.document_kb)
+    total_mb = sum(len(text.encode("utf-8")) for text in corpus) / 1024 / 1024
+    block = args.block_kb * 1024
+
+    expected = [legacy_clean(cleaner, text) for text in corpus[:2]]
+    assert [cleaner.clean_text(text) for text in corpus[:2]] == expected
+    assert ["".join(cleaner.clean_stream(text[i:i + block] for i in range(0, len(text), block)))
+            for text in corpus[:2]] == expected
+
+    print(f"Corpus: {args.documents} documents, {total_mb:.1f} MB")
+    print(f"{'method':<14}{'time':>10}{'throughput':>15}{'speedup':>9}{'peak memory':>13}")
+    baseline = measure("legacy", lambda: [legacy_clean(cleaner, text) for text in corpus], total_mb)
+    measure("compiled", lambda: [cleaner.clean_text(text) for text in corpus], total_mb, baseline)
+    measure("stream", lambda: [
+        sum(1 for _ in cleaner.clean_stream(text[i:i + block] for i in range(0, len(text), block)))
+        for text in corpus
+    ], total_mb, baseline)
+    for workers in sorted(set(args.workers)):
+        measure(f"parallel x{workers}",
+                lambda: cleaner.clean_texts_parallel(corpus, max_workers=workers, batch_size=1),
+                total_mb, baseline)
+
+
+if __name__ == "__main__":
+    main()
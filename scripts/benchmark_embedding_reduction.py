@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+임베딩 차원 축소 벤치마크
+CREATED [2026-10-18]: 축소 차원별 recall@k(원본 정확 검색 대비)와 메모리 절감량 측정
+
+동작:
+- MongoDB 폴더의 원본 임베딩(--folder-id) 또는 합성 임베딩을 사용
+- 쿼리는 문서 임베딩에 잡음을 더해 생성
+- PCA/절단 투영별로 정확 검색 결과를 원본 공간의 정확 검색과 비교
+- 절단(truncate)은 Matryoshka 학습 모델에서만 의미가 있음 (합성 데이터는 참고용)
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import time
+import numpy as np
+from bson import ObjectId
+from config.settings import settings
+from src.utils.embedding_projection import fit_pca, sample_document_embeddings, truncation
+from src.utils.vector_cache import EmbeddingMatrix
+
+
+def synthetic_embeddings(count: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """실제 임베딩처럼 고유값이 멱법칙으로 감소하는 합성 임베딩"""
+    rng = np.random.default_rng(seed)
+    basis, _ = np.linalg.qr(rng.normal(size=(dimension, dimension)))
+    scales = np.arange(1, dimension + 1) ** -0.75
+    vectors = (rng.normal(size=(count, dimension)) * scales) @ basis.T
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def search(corpus: np.ndarray, queries: np.ndarray, k: int):
+    matrix = EmbeddingMatrix.from_rows(enumerate(corpus), corpus.shape[1])
+    normalized = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    return [{doc_id for doc_id, _ in hits} for hits in matrix.top_k_batch(normalized.astype(np.float32), k)]
+
+
+def recall(expected, actual) -> float:
+    return float(np.mean([len(e & a) / len(e) for e, a in zip(expected, actual) if e]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding dimensionality reduction benchmark")
+    parser.add_argument("--folder-id", help="Use raw embeddings of this folder from MongoDB")
+    parser.add_argument("--documents", type=int, default=20000, help="Corpus size (sample size for MongoDB)")
+    parser.add_argument("--input-dim", type=int, default=1536, help="Synthetic embedding dimension")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--fit-sample", type=int, default=5000, help="Documents used to fit PCA")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[256, 512, 768])
+    args = parser.parse_args()
+
+    if args.folder_id:
+        from src.utils.database_v2 import MongoDBClientV2
+        db = MongoDBClientV2(settings.mongodb_uri)
+        try:
+            corpus = sample_document_embeddings(db, args.documents, ObjectId(args.folder_id))
+        finally:
+            db.close()
+        if corpus.size == 0:
+            sys.exit("폴더에 원본 임베딩이 없습니다")
+    else:
+        corpus = synthetic_embeddings(args.documents, args.input_dim)
+
+    rng = np.random.default_rng(1)
+    picked = rng.choice(len(corpus), size=min(args.queries, len(corpus)), replace=False)
+    queries = corpus[picked] + rng.normal(scale=0.5 / np.sqrt(corpus.shape[1]), size=(len(picked), corpus.shape[1]))
+    fit_sample = corpus[rng.choice(len(corpus), size=min(args.fit_sample, len(corpus)), replace=False)]
+
+    start = time.perf_counter()
+    expected = search(corpus, queries, args.k)
+    full_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    full_mb = corpus.shape[0] * corpus.shape[1] * 4 / 1024 / 1024
+
+    print(f"Corpus: {corpus.shape[0]} x {corpus.shape[1]}, queries: {len(queries)}, k={args.k}")
+    print(f"{'method':<10}{'dim':>6}{f'recall@{args.k}':>12}{'matrix MB':>12}{'saved':>8}{'ms/query':>10}")
+    print(f"{'full':<10}{corpus.shape[1]:>6}{1.0:>12.3f}{full_mb:>12.1f}{'0%':>8}{full_ms:>10.2f}")
+
+    for dimension in args.dimensions:
+        if dimension >= corpus.shape[1]:
+            continue
+        for projection in (fit_pca(fit_sample, dimension), truncation(corpus.shape[1], dimension)):
+            reduced_corpus = projection.transform(corpus)
+            start = time.perf_counter()
+            actual = search(reduced_corpus, projection.transform(queries), args.k)
+            ms = (time.perf_counter() - start) * 1000 / len(queries)
+            mb = reduced_corpus.shape[0] * dimension * 4 / 1024 / 1024
+            print(f"{projection.method:<10}{dimension:>6}{recall(expected, actual):>12.3f}"
+                  f"{mb:>12.1f}{1 - mb / full_mb:>8.0%}{ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+오프라인 수집 파이프라인 벤치마크
+CREATED [2026-10-18]: 로컬 임베딩 백엔드로 네트워크 없이 처리량 측정
+
+동작:
+- --input 디렉토리의 문서(없으면 합성 한국어 텍스트)를 클리닝/청킹
+- local-hash-ngram 임베딩으로 벡터화하여 임시 디렉토리의 FAISS 인덱스에 추가
+- 단계별 소요 시간과 초당 청크 수 출력
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import random
+import tempfile
+import time
+from langchain.schema import Document
+from src.data_processing.chunker import TextChunker
+from src.data_processing.cleaner import TextCleaner
+from src.data_processing.loader import DocumentLoader
+from src.embedding.local_embeddings import HashingNgramEmbeddings
+from src.embedding.vectorstore import VectorStore
+
+WORDS = ["데이터베이스", "트랜잭션", "인덱스", "정규화", "관계", "모델", "검색", "질의",
+         "성능", "저장", "구조", "분석", "시스템", "설계", "테이블", "속성", "엔터티"]
+
+
+def synthetic_documents(count: int, words_per_document: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        Document(page_content=" ".join(rng.choice(WORDS) for _ in range(words_per_document)) + ".",
+                 metadata={"source": f"synthetic_{i}.txt"})
+        for i in range(count)
+    ]
+
+
+def timed(label: str, func, items: int = None):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    rate = f", {items / elapsed:,.0f} chunks/s" if items else ""
+    print(f"{label:<12} {elapsed:8.3f}s{rate}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ingest throughput benchmark")
+    parser.add_argument("--input", help="Directory of documents (default: synthetic text)")
+    parser.add_argument("--documents", type=int, default=200, help="Synthetic document count")
+    parser.add_argument("--words", type=int, default=2000, help="Words per synthetic document")
+    parser.add_argument("--dimension", type=int, default=1536)
+    args = parser.parse_args()
+
+    if args.input:
+        documents = timed("load", lambda: DocumentLoader().load_directory(args.input))
+    else:
+        documents = synthetic_documents(args.documents, args.words)
+
+    cleaned = timed("clean", lambda: TextCleaner().clean_documents(documents))
+    chunks = timed("chunk", lambda: TextChunker().split_documents(cleaned))
+
+    embeddings = HashingNgramEmbeddings(dimension=args.dimension)
+    texts = [chunk.page_content for chunk in chunks]
+    timed("embed", lambda: embeddings.embed_documents(texts), len(chunks))
+
+    with tempfile.TemporaryDirectory() as index_path:
+        store = VectorStore(store_type="faiss")
+        timed("embed+index", lambda: store.append_documents(chunks, embeddings, index_path), len(chunks))
+
+    print(f"Documents: {len(documents)}, chunks: {len(chunks)}, dimension: {args.dimension}")
+
+
+if __name__ == "__main__":
+    main()
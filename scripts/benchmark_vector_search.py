@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+벡터 검색 전송량 벤치마크
+CREATED [2026-10-18]: 전체 문서 조회 방식과 2단계 검색 방식의 전송 바이트 비교
+
+동작:
+- 임시 폴더에 합성 Document를 생성
+- 기존 방식(전체 문서 조회 후 Python 루프)과 2단계 검색을 실행
+- pymongo 명령 모니터링으로 응답 BSON 바이트 수를 집계
+- 종료 시 임시 폴더 삭제
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import time
+import numpy as np
+import bson
+from pymongo import monitoring
+from config.database_config import DatabaseConfig
+from config.settings import settings
+
+
+class ReplyBytesListener(monitoring.CommandListener):
+    """find/getMore 응답 크기 집계"""
+
+    def __init__(self):
+        self.bytes_received = 0
+        self.round_trips = 0
+
+    def reset(self):
+        self.bytes_received = 0
+        self.round_trips = 0
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        if event.command_name in ("find", "getMore"):
+            self.bytes_received += len(bson.encode(event.reply))
+            self.round_trips += 1
+
+    def failed(self, event):
+        pass
+
+
+def legacy_vector_search(db, query_embedding, folder_id, k):
+    """기존 구현: 모든 문서를 받아 Python 루프로 유사도 계산"""
+    documents = list(db.documents.find({
+        "folder_id": folder_id,
+        "text_embedding": {"$exists": True, "$ne": []}
+    }))
+
+    results = []
+    query_norm = np.linalg.norm(query_embedding)
+    for doc in documents:
+        doc_embedding = np.array(doc["text_embedding"])
+        doc_norm = np.linalg.norm(doc_embedding)
+        if doc_norm > 0 and query_norm > 0:
+            similarity = np.dot(query_embedding, doc_embedding) / (query_norm * doc_norm)
+            results.append({"document": doc, "similarity": float(similarity)})
+
+    results.sort(key=lambda x: x["similarity"], reverse=True)
+    return results[:k]
+
+
+def seed_documents(db, folder_id, count, dimension, text_length):
+    """합성 문서 생성"""
+    rng = np.random.default_rng(42)
+    text = "가나다라마바사아자차카타파하 " * (text_length // 15 + 1)
+    for start in range(0, count, 1000):
+        batch = []
+        for i in range(start, min(start + 1000, count)):
+            batch.append({
+                "folder_id": folder_id,
+                "chunk_sequence": f"bench_{i}",
+                "raw_text": text[:text_length],
+                "text_embedding": rng.normal(size=dimension).tolist(),
+                "metadata": {"source": "benchmark", "index": i}
+            })
+        db.documents.insert_many(batch)
+
+
+def measure(listener, label, func, repeat):
+    listener.reset()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = func()
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<28} {listener.bytes_received / repeat / 1024:>12.1f} KB "
+          f"{listener.round_trips / repeat:>8.1f} {elapsed * 1000:>10.1f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vector search transfer benchmark")
+    parser.add_argument("--documents", type=int, default=5000, help="Number of synthetic documents")
+    parser.add_argument("--dimension", type=int, default=1536, help="Embedding dimension")
+    parser.add_argument("--text-length", type=int, default=1000, help="Characters of raw_text per document")
+    parser.add_argument("--k", type=int, default=5, help="Top-k")
+    parser.add_argument("--repeat", type=int, default=3, help="Queries per measurement")
+    args = parser.parse_args()
+
+    listener = ReplyBytesListener()
+    monitoring.register(listener)
+
+    # 모니터링 등록 후 클라이언트 생성
+    from src.utils.database_v2 import MongoDBClientV2
+    from src.utils.vector_cache import EmbeddingMatrixCache
+
+    db = MongoDBClientV2(settings.mongodb_uri, DatabaseConfig(vector_cache_enabled=False))
+    folder_id = db.create_folder(title="vector search benchmark", folder_type="benchmark")
+
+    try:
+        print(f"Seeding {args.documents} documents (dim={args.dimension}, text={args.text_length} chars)...")
+        seed_documents(db, folder_id, args.documents, args.dimension, args.text_length)
+        query = np.random.default_rng(7).normal(size=args.dimension).tolist()
+
+        print(f"\n{'method':<28} {'bytes/query':>15} {'trips':>8} {'latency':>13}")
+        legacy = measure(listener, "legacy (full documents)", lambda: legacy_vector_search(db, query, folder_id, args.k), args.repeat)
+        streamed = measure(listener, "two-phase (streaming)", lambda: db.vector_search(query, folder_id, args.k), args.repeat)
+
+        db.vector_cache = EmbeddingMatrixCache(max_bytes=1 << 32)
+        db.vector_search(query, folder_id, args.k)
+        measure(listener, "two-phase (cached matrix)", lambda: db.vector_search(query, folder_id, args.k), args.repeat)
+
+        same_order = [r["document"]["_id"] for r in legacy] == [r["document"]["_id"] for r in streamed]
+        print(f"\nSame top-{args.k} order as legacy: {same_order}")
+    finally:
+        db.delete_folder(folder_id, recursive=True)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+FAISS docstore 변환 스크립트
+CREATED [2026-10-18]: 피클 docstore(index.pkl) → 컬럼형 docstore
+
+- CURRENT가 가리키는 버전(또는 기존 단일 디렉토리)을 제자리에서 변환
+- index.pkl은 신뢰할 수 있는 인덱스에 대해서만 이 스크립트로 한 번 읽음
+- 변환 후 index.pkl 삭제 (--keep-pickle로 보존 가능)
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import logging
+import os
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+from config.settings import settings
+from src.embedding.docstore import LEGACY_PICKLE_FILE, has_columnar_docstore, write_docstore
+from src.embedding.index_versions import VersionedIndexStore
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def convert_docstore(index_path: str, keep_pickle: bool = False) -> bool:
+    """index.pkl을 읽어 같은 디렉토리에 컬럼형 docstore 저장"""
+    versions = VersionedIndexStore(index_path)
+    with versions.lock():
+        directory = versions.current_path()
+        if directory is None:
+            raise FileNotFoundError(f"No FAISS index found in {index_path}")
+
+        pickle_path = os.path.join(directory, LEGACY_PICKLE_FILE)
+        if has_columnar_docstore(directory):
+            logger.info(f"✅ 이미 컬럼형 docstore: {directory}")
+            return False
+
+        # 임베딩 함수는 검색에만 쓰이므로 변환에는 차원만 맞는 가짜 임베딩 사용
+        store = FAISS.load_local(directory, FakeEmbeddings(size=1))
+        write_docstore(store, directory)
+        logger.info(f"✅ 변환 완료: {directory} ({store.index.ntotal}개 문서)")
+
+        if not keep_pickle:
+            os.remove(pickle_path)
+            logger.info(f"🗑️ {pickle_path} 삭제")
+        return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a pickled FAISS docstore to the columnar format")
+    parser.add_argument("--index-path", default=settings.faiss_index_path, help="FAISS index root")
+    parser.add_argument("--keep-pickle", action="store_true", help="Keep index.pkl after conversion")
+
+    args = parser.parse_args()
+    convert_docstore(args.index_path, args.keep_pickle)
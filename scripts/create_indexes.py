@@ -9,6 +9,7 @@ sys.path.append('.')
 
 from pymongo import MongoClient, TEXT, ASCENDING, DESCENDING
 from config.settings import settings
+from src.utils.text_codec import decode_text, search_terms
 import logging
 
 # 로깅 설정
@@ -34,7 +35,10 @@ def create_indexes():
         documents.create_index([("folder_id", ASCENDING)])
         documents.create_index([("chunk_sequence", ASCENDING)])
         documents.create_index([("created_at", DESCENDING)])
+        documents.create_index([("folder_id", ASCENDING), ("updated_at", ASCENDING)])
         documents.create_index([("raw_text", TEXT)])
+        documents.create_index([("source_id", ASCENDING)], sparse=True)
+        documents.create_index([("metadata.upload_job_id", ASCENDING)], sparse=True)
         logger.info("✅ Document 인덱스 생성 완료")
         
         # Labels 컬렉션 인덱스
@@ -63,6 +67,34 @@ def create_indexes():
         folders.create_index([("last_accessed_at", DESCENDING)])
         logger.info("✅ Folder 인덱스 생성 완료")
         
+        # Sources 컬렉션 인덱스 (span 청크 원문, 텍스트 검색은 search_terms)
+        logger.info("Sources 컬렉션 인덱스 생성...")
+        db.Sources.create_index([("folder_id", ASCENDING)])
+        db.Sources.create_index([("search_terms", TEXT)])
+        backfilled = 0
+        for source in db.Sources.find({"search_terms": {"$exists": False}}, {"text": 1, "text_encoding": 1}):
+            db.Sources.update_one({"_id": source["_id"]}, {"$set": {
+                "search_terms": search_terms(decode_text(source["text"], source["text_encoding"]))
+            }})
+            backfilled += 1
+        logger.info(f"✅ Sources 인덱스 생성 완료 (search_terms 채움: {backfilled}개)")
+        
+        # FileManifest 컬렉션 인덱스 (디렉토리 동기화)
+        logger.info("FileManifest 컬렉션 인덱스 생성...")
+        db.FileManifest.create_index([("root", ASCENDING)])
+        logger.info("✅ FileManifest 인덱스 생성 완료")
+        
+        # ChunkSignatures 컬렉션 인덱스 (근접 중복 제거 LSH 키)
+        logger.info("ChunkSignatures 컬렉션 인덱스 생성...")
+        db.ChunkSignatures.create_index([("folder_id", ASCENDING), ("bands", ASCENDING)])
+        logger.info("✅ ChunkSignatures 인덱스 생성 완료")
+        
+        # UploadJobs 컬렉션 인덱스 (대기 작업 가져오기, 중단된 작업 복구)
+        logger.info("UploadJobs 컬렉션 인덱스 생성...")
+        db.UploadJobs.create_index([("status", ASCENDING), ("created_at", ASCENDING)])
+        db.UploadJobs.create_index([("status", ASCENDING), ("heartbeat_at", ASCENDING)])
+        logger.info("✅ UploadJobs 인덱스 생성 완료")
+        
         logger.info("🎉 모든 인덱스 생성 완료!")
         
     except Exception as e:
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+임베딩 스냅샷 내보내기 스크립트
+CREATED [2026-10-18]: 폴더별 Document 임베딩을 .npy 스냅샷으로 저장
+
+- API 워커는 vector_snapshot_enabled=True일 때 스냅샷을 mmap으로 열고
+  스냅샷 이후 갱신된 문서만 MongoDB에서 읽음
+- 주기적으로(예: cron) 다시 실행하면 따라잡을 변경분이 줄어듦
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import logging
+from bson import ObjectId
+from config.database_config import default_db_config
+from config.settings import settings
+from src.utils.database_v2 import MongoDBClientV2
+from src.utils.embedding_snapshot import export_folder_snapshot, snapshot_dimension
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def export_snapshots(db: MongoDBClientV2, root: str, dimension: int, folder_ids=None) -> int:
+    """지정한 폴더(없으면 임베딩이 있는 모든 폴더)의 스냅샷 저장"""
+    if not folder_ids:
+        folder_ids = db.documents.distinct(
+            "folder_id", {"text_embedding": {"$exists": True, "$ne": []}}
+        )
+
+    total = 0
+    for folder_id in folder_ids:
+        total += export_folder_snapshot(db, folder_id, root, dimension)
+
+    logger.info(f"🎉 스냅샷 내보내기 완료: 폴더 {len(folder_ids)}개, 문서 {total}개")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export per-folder embedding snapshots")
+    parser.add_argument("--folder-id", action="append", default=[], help="Folder to export (repeatable)")
+    parser.add_argument("--path", default=default_db_config.vector_snapshot_path, help="Snapshot root directory")
+    parser.add_argument("--dimension", type=int, default=None,
+                        help="Embedding dimension (default: active projection output_dim or vector_dimension)")
+
+    args = parser.parse_args()
+    db = MongoDBClientV2(settings.mongodb_uri)
+    try:
+        try:
+            dimension = snapshot_dimension(db.config, args.dimension)
+        except ValueError as e:
+            parser.error(str(e))
+        export_snapshots(db, args.path, dimension, [ObjectId(f) for f in args.folder_id])
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+임베딩 차원 축소 투영 생성 스크립트
+CREATED [2026-10-18]: Document 표본으로 PCA 학습(또는 절단 투영 생성) 후 버전별 저장
+
+- 저장 후 출력되는 버전을 DatabaseConfig.embedding_projection_version에 설정하면
+  MongoVectorStore가 저장/검색 임베딩에 같은 투영을 적용
+- --reproject: 투영되지 않은 기존 문서를 새 버전으로 변환
+  (원본 임베딩을 덮어쓰므로 다른 투영을 다시 학습하려면 재임베딩 필요)
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import logging
+from bson import ObjectId
+from config.database_config import default_db_config
+from config.settings import settings
+from src.utils.database_v2 import MongoDBClientV2
+from src.utils.embedding_codec import decode_document_embedding
+from src.utils.embedding_projection import (
+    EmbeddingProjection, embedding_version_filter, fit_pca, sample_document_embeddings,
+    save_projection, truncation
+)
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def reproject_documents(db: MongoDBClientV2, projection: EmbeddingProjection,
+                        folder_id: ObjectId = None, batch_size: int = 1000) -> int:
+    """투영되지 않은 문서의 임베딩을 projection 버전으로 변환 (변환한 문서 수 반환)"""
+    query = {"text_embedding": {"$exists": True, "$ne": []}, **embedding_version_filter(None)}
+    if folder_id:
+        query["folder_id"] = folder_id
+
+    cursor = db.documents.find(query, {"text_embedding": 1, "embedding_encoding": 1},
+                               batch_size=batch_size)
+    converted = 0
+    for doc in cursor:
+        vector = decode_document_embedding(doc)
+        if vector is None or len(vector) != projection.input_dim:
+            continue
+        db.update_document_embedding(doc["_id"], projection.transform(vector)[0].tolist(),
+                                     projection.version)
+        converted += 1
+        if converted % batch_size == 0:
+            logger.info(f"진행 상황: {converted}개 문서 변환 완료")
+
+    logger.info(f"✅ 문서 {converted}개를 {projection.version}로 변환")
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit and store an embedding projection")
+    parser.add_argument("--method", choices=("pca", "truncate"), default="pca")
+    parser.add_argument("--dimension", type=int, default=512, help="Output dimension")
+    parser.add_argument("--sample-size", type=int, default=20000, help="Documents sampled for PCA")
+    parser.add_argument("--folder-id", help="Sample (and reproject) only this folder")
+    parser.add_argument("--path", default=default_db_config.embedding_projection_path)
+    parser.add_argument("--reproject", action="store_true", help="Convert existing raw documents")
+
+    args = parser.parse_args()
+    folder_id = ObjectId(args.folder_id) if args.folder_id else None
+    db = MongoDBClientV2(settings.mongodb_uri)
+    try:
+        sample = sample_document_embeddings(db, args.sample_size, folder_id)
+        if sample.size == 0:
+            sys.exit("투영을 만들 원본 임베딩이 없습니다")
+
+        if args.method == "pca":
+            projection = fit_pca(sample, args.dimension)
+            logger.info(f"설명 분산 비율: {projection.metadata['explained_variance_ratio']:.3f} "
+                        f"(표본 {sample.shape[0]}개)")
+        else:
+            projection = truncation(sample.shape[1], args.dimension)
+
+        path = save_projection(projection, args.path)
+        logger.info(f"✅ 투영 저장: {path}")
+        print(f"embedding_projection_version={projection.version}")
+
+        if args.reproject:
+            reproject_documents(db, projection, folder_id)
+    finally:
+        db.close()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+임베딩 저장 형식 마이그레이션 스크립트
+CREATED [2026-10-18]: Document.text_embedding 배열 → BSON Binary 변환
+
+- _id 순서로 배치 단위 변환 (중단 후 재실행 시 남은 배열 문서만 처리)
+- 배열 형식인 문서만 갱신하므로 변환 중 새로 저장된 Binary 문서는 건드리지 않음
+- vector_search는 변환 중에도 두 형식을 모두 읽음
+"""
+
+import sys
+sys.path.append('.')
+
+import argparse
+import logging
+from pymongo import UpdateOne
+from config.database_config import default_db_config
+from config.settings import settings
+from src.utils.database_v2 import MongoDBClientV2
+from src.utils.embedding_codec import EMBEDDING_FORMATS, encode_embedding
+
+# 로깅 설정
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_embeddings(db: MongoDBClientV2, storage_format: str, batch_size: int,
+                       dry_run: bool = False) -> int:
+    """배열 형식 임베딩을 Binary 형식으로 변환"""
+    if storage_format == "array":
+        raise ValueError("Target format must be a binary format")
+
+    array_query = {"text_embedding": {"$type": "array", "$ne": []}}
+    remaining = db.documents.count_documents(array_query)
+    logger.info(f"📊 변환 대상 Document: {remaining}개 (형식: {storage_format})")
+
+    if dry_run:
+        return 0
+
+    converted = 0
+    last_id = None
+
+    while True:
+        query = dict(array_query)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        batch = list(db.documents.find(query, {"text_embedding": 1})
+                     .sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+
+        operations = []
+        for doc in batch:
+            value, encoding = encode_embedding(doc["text_embedding"], storage_format)
+            operations.append(UpdateOne(
+                {"_id": doc["_id"], "text_embedding": {"$type": "array"}},
+                {"$set": {"text_embedding": value, "embedding_encoding": encoding}}
+            ))
+
+        result = db.documents.bulk_write(operations, ordered=False)
+        converted += result.modified_count
+        last_id = batch[-1]["_id"]
+        logger.info(f"진행 상황: {converted}/{remaining} 변환 완료")
+
+    # 값은 동일하지만 형식이 바뀌었으므로 이 프로세스의 캐시는 비움
+    db.invalidate_vector_cache()
+
+    logger.info(f"✅ 임베딩 형식 변환 완료: {converted}개")
+    return converted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert array embeddings to BSON Binary")
+    parser.add_argument("--format", default="float32",
+                        choices=[f for f in EMBEDDING_FORMATS if f != "array"],
+                        help="Target storage format")
+    parser.add_argument("--batch-size", type=int, default=default_db_config.batch_size,
+                        help="Documents per bulk write")
+    parser.add_argument("--dry-run", action="store_true", help="Only count documents to convert")
+
+    args = parser.parse_args()
+
+    db_client = MongoDBClientV2(settings.mongodb_uri)
+    try:
+        migrate_embeddings(db_client, args.format, args.batch_size, args.dry_run)
+    finally:
+        db_client.close()
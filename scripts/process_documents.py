@@ -3,9 +3,12 @@ import sys
 sys.path.append('.')
 
 import argparse
-from src.data_processing.loader import DocumentLoader
+from collections import defaultdict
 from src.data_processing.cleaner import TextCleaner
-from src.data_processing.chunker import TextChunker
+from src.data_processing.dedup import ChunkDeduplicator, deduplicator_from_settings
+from src.data_processing.loader import DocumentLoader
+from src.data_processing.manifest import FileManifest
+from src.data_processing.pipeline import FaissSink, build_ingest_pipeline
 from src.embedding.embedder import Embedder
 from src.embedding.vectorstore import VectorStore
 from src.labeling.auto_labeler import AutoLabeler
@@ -13,62 +16,140 @@ from src.labeling.qa_generator import QAGenerator
 from src.utils.database import MongoDBClient
 from config.settings import settings
 
-def process_documents(input_dir: str, output_dir: str):
-    """문서 처리 파이프라인"""
-    print(f"Processing documents from {input_dir}...")
+def ingest_files(file_paths, output_dir: str, embedder: Embedder, rebuild: bool = False,
+                 deduplicator: ChunkDeduplicator = None):
+    """파일들을 스트리밍 파이프라인으로 처리 (deduplicator: 근접 중복 청크 제외)
     
-    # 1. 문서 로드
+    반환: (파일별 청크 id, 라벨링/QA용 앞쪽 청크, 실패한 파일 경로)
+    """
+    # 로드 → 클리닝 → 청킹 → 임베딩 → 벡터 스토어 (단계별 스트리밍)
+    # (기본: 기존 인덱스에 추가, --rebuild: 이번 청크로 새로 구축)
+    sink = FaissSink(
+        VectorStore(), embedder.embeddings, f"{output_dir}/faiss",
+        keep_versions=settings.faiss_keep_versions, publish_every=settings.faiss_publish_every,
+        replace=rebuild
+    )
+    # PDF/Markdown 파싱과 클렌징은 프로세스 풀에서 진행하고 끝나는 문서부터 파이프라인에 투입
     loader = DocumentLoader()
-    documents = loader.load_directory(input_dir)
-    print(f"Loaded {len(documents)} documents")
+    pipeline = build_ingest_pipeline(embedder.embeddings, sink.add, loader=loader, load_stage=False,
+                                     clean_stage=False, deduplicator=deduplicator)
     
-    # 2. 클리닝
-    cleaner = TextCleaner()
-    cleaned_docs = cleaner.clean_documents(documents)
-    print(f"Cleaned {len(cleaned_docs)} documents")
-    
-    # 3. 청킹
-    chunker = TextChunker()
-    chunks = chunker.split_documents(cleaned_docs)
-    print(f"Created {len(chunks)} chunks")
-    
-    # 4. 임베딩 생성
-    embedder = Embedder()
-    print("Creating embeddings...")
+    chunk_ids = defaultdict(list)
+    chunks = []
+    for chunk in pipeline.stream(loader.load_files_parallel(file_paths, cleaner=TextCleaner())):
+        chunk_ids[chunk.metadata.get("source")].append(chunk.metadata["chunk_id"])
+        if len(chunks) < 10:
+            chunks.append(chunk)
+    version = sink.close()
     
-    # 5. 벡터 스토어 생성
-    vectorstore = VectorStore()
-    vectorstore.create_vectorstore(chunks, embedder.embeddings)
-    vectorstore.save(f"{output_dir}/faiss")
-    print("Vector store created and saved")
+    for file_path, error in loader.failed_files:
+        print(f"  skipped {file_path}: {error}")
+    if deduplicator is not None:
+        print(f"  skipped {deduplicator.duplicates}/{deduplicator.seen} near-duplicate chunks")
+    for name, stage_stats in pipeline.stats().items():
+        print(f"  {name:<6} in={stage_stats['items_in']:<7} out={stage_stats['items_out']:<7} "
+              f"{stage_stats['items_per_second']:.1f} items/s")
+    print(f"Vector store saved (version: {version})")
     
-    # 6. 라벨링
+    return chunk_ids, chunks, {file_path for file_path, _ in loader.failed_files}
+
+def label_chunks(chunks, db_client: MongoDBClient):
+    """앞쪽 청크 라벨링/QA 생성 후 MongoDB 저장"""
     labeler = AutoLabeler()
     print("Generating labels...")
     labels = labeler.label_documents(chunks[:10])  # 처음 10개만
     
-    # 7. QA 생성
     qa_generator = QAGenerator()
     print("Generating QA pairs...")
     qa_data = qa_generator.generate_qa_batch(chunks[:5])  # 처음 5개만
     
-    # 8. MongoDB 저장
-    db_client = MongoDBClient(settings.mongodb_uri)
-    
-    for label in labels:
-        db_client.insert_labels(label)
+    db_client.insert_labels_bulk(labels)
+    db_client.insert_qa_pairs_bulk(qa_data)
+
+def process_documents(input_dir: str, output_dir: str, rebuild: bool = False):
+    """문서 처리 파이프라인"""
+    print(f"Processing documents from {input_dir}...")
     
-    for qa in qa_data:
-        db_client.insert_qa_pairs(qa)
+    embedder = Embedder()
+    db_client = MongoDBClient(settings.mongodb_uri)
+    deduplicator = deduplicator_from_settings(db_client.v2.db)
+    if deduplicator is not None and rebuild:
+        # 새 인덱스에 없는 청크를 원본으로 삼지 않도록 서명 색인도 초기화
+        deduplicator.clear()
+    _, chunks, _ = ingest_files(list(DocumentLoader().iter_files(input_dir)), output_dir, embedder,
+                                rebuild, deduplicator)
     
+    label_chunks(chunks, db_client)
     db_client.close()
     
     print("Processing completed!")
 
+def sync_documents(input_dir: str, output_dir: str):
+    """새 파일/변경된 파일만 처리하고 변경/삭제된 파일의 산출물 삭제"""
+    print(f"Syncing documents from {input_dir}...")
+    
+    db_client = MongoDBClient(settings.mongodb_uri)
+    manifest = FileManifest(db_client.v2.db.FileManifest, input_dir)
+    plan = manifest.plan()
+    print(f"Plan: {plan.summary()}")
+    
+    for file_path, info in plan.touched.items():
+        manifest.touch(file_path, info)
+    
+    embedder = Embedder()
+    deduplicator = deduplicator_from_settings(db_client.v2.db)
+    
+    # 변경/삭제된 파일의 청크 벡터, Document, Labels, QAPairs, 중복 서명 삭제
+    stale = plan.stale_entries
+    if stale:
+        stale_chunk_ids = [chunk_id for entry in stale for chunk_id in entry.get("chunk_ids", [])]
+        deleted_vectors = VectorStore().delete_by_metadata(
+            "chunk_id", stale_chunk_ids,
+            embedder.embeddings, f"{output_dir}/faiss", keep_versions=settings.faiss_keep_versions
+        )
+        if deduplicator is not None:
+            deduplicator.remove(stale_chunk_ids)
+        deleted_documents = db_client.v2.delete_documents(
+            [doc_id for entry in stale for doc_id in entry.get("document_ids", [])], cascade=True
+        )
+        manifest.remove(list(plan.removed))
+        print(f"Removed {deleted_vectors} vectors and {deleted_documents} documents of stale files")
+    
+    if plan.to_process:
+        chunk_ids, chunks, failed = ingest_files(plan.to_process, output_dir, embedder,
+                                                 deduplicator=deduplicator)
+        label_chunks(chunks, db_client)
+        
+        # 라벨/QA용으로 생성된 Document (chunk_sequence = 청크 id)
+        documents = {
+            doc["chunk_sequence"]: doc["_id"]
+            for doc in db_client.v2.documents.find(
+                {"chunk_sequence": {"$in": [chunk.metadata["chunk_id"] for chunk in chunks]}},
+                {"chunk_sequence": 1}
+            )
+        }
+        
+        # 실패한 파일은 기록하지 않아 다음 동기화에서 다시 처리
+        files = {**plan.new, **plan.changed}
+        for file_path in plan.to_process:
+            if file_path in failed:
+                continue
+            ids = chunk_ids.get(file_path, [])
+            manifest.record(file_path, files[file_path], ids,
+                            [documents[chunk_id] for chunk_id in ids if chunk_id in documents])
+    
+    db_client.close()
+    print("Sync completed!")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Process documents for RAG system")
     parser.add_argument("--input", default="data/raw", help="Input directory")
     parser.add_argument("--output", default="data/processed", help="Output directory")
+    parser.add_argument("--rebuild", action="store_true", help="Replace the index with only these documents")
+    parser.add_argument("--sync", action="store_true", help="Process only new/changed files and remove stale outputs")
     
     args = parser.parse_args()
-    process_documents(args.input, args.output)
+    if args.sync:
+        sync_documents(args.input, args.output)
+    else:
+        process_documents(args.input, args.output, args.rebuild)
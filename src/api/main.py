@@ -1,15 +1,25 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.routes import router
-from src.api.schemas import QueryRequest, QueryResponse
+from src.api.schemas import QueryRequest, QueryResponse, BatchQueryRequest, BatchQueryResponse
 from src.retrieval.rag_engine import RAGEngine
 from src.retrieval.retriever import Retriever
+from src.retrieval.index_registry import IndexRegistry
 from src.embedding.vectorstore import VectorStore
+from src.embedding.vectorstore_v2 import MongoVectorStore
 from src.embedding.embedder import Embedder
 from src.utils.database import MongoDBClient
+from src.utils.job_queue import JobQueue, JobWorkerPool
+from src.api.upload_jobs import UPLOAD_JOB, abandon_upload, process_upload
+from src.data_processing.file_registry import FileRegistry
 from config.settings import settings
 import uvicorn
 import logging
+import signal
+from bson import ObjectId
+from bson.errors import InvalidId
+from contextlib import asynccontextmanager
 
 # 로깅 설정
 logging.basicConfig(level=logging.DEBUG)
@@ -21,17 +31,36 @@ try:
     embedder = Embedder()
     vectorstore = VectorStore()
     db_client = MongoDBClient(settings.mongodb_uri)
+    index_registry = IndexRegistry(
+        settings.faiss_index_path,
+        embedder.embeddings,
+        poll_interval=settings.index_reload_interval
+    )
     
-    # 벡터 스토어 로드 시도
+    # 벡터 스토어 로드 시도 (이후 새 버전은 레지스트리가 백그라운드에서 교체)
     try:
         logger.debug("Loading vector store...")
-        vectorstore.load("./data/embeddings/faiss", embedder.embeddings)
+        vectorstore = index_registry.load_current().vectorstore
         logger.debug("Vector store loaded successfully")
     except Exception as e:
         logger.warning(f"Vector store initialization failed, continuing in basic mode: {str(e)}")
 
-    retriever = Retriever(vectorstore, db_client)
+    mongo_vectorstore = MongoVectorStore(db_client.v2)
+    retriever = Retriever(vectorstore, db_client, index_registry=index_registry)
+    index_registry.retriever = retriever
     rag_engine = RAGEngine(retriever)
+    
+    # 업로드 작업 큐 (MongoDB UploadJobs 컬렉션, 재시작해도 대기 중인 작업 유지)
+    upload_jobs = JobQueue(db_client.v2.db.UploadJobs, max_attempts=settings.upload_job_max_attempts)
+    file_registry = FileRegistry(db_client.v2)
+    upload_workers = JobWorkerPool(
+        upload_jobs,
+        {UPLOAD_JOB: lambda job, progress: process_upload(job, progress, index_registry)},
+        workers=settings.upload_workers,
+        poll_interval=settings.upload_job_poll_interval,
+        stale_seconds=settings.upload_job_stale_seconds,
+        on_abandoned={UPLOAD_JOB: abandon_upload}
+    )
     logger.debug("Global objects initialized successfully")
 except Exception as e:
     logger.error(f"Error initializing global objects: {str(e)}")
@@ -39,13 +68,41 @@ except Exception as e:
     try:
         embedder = Embedder()
         vectorstore = None
+        index_registry = None
         db_client = None
+        mongo_vectorstore = None
         retriever = None
         rag_engine = None
+        upload_jobs = None
+        upload_workers = None
+        file_registry = None
         logger.warning("Running in fallback mode with LLM only")
     except Exception as e2:
         logger.error(f"Complete initialization failure: {str(e2)}")
+        index_registry = None
+        mongo_vectorstore = None
         rag_engine = None
+        upload_jobs = None
+        upload_workers = None
+        file_registry = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """인덱스 버전 감시와 업로드 워커 시작/종료 (SIGHUP 수신 시 즉시 재로드)"""
+    if index_registry is not None:
+        index_registry.start()
+        try:
+            signal.signal(signal.SIGHUP, lambda signum, frame: index_registry.request_reload())
+        except (AttributeError, ValueError):
+            # Windows 또는 메인 스레드가 아닌 경우
+            logger.debug("SIGHUP reload handler not installed")
+    if upload_workers is not None:
+        upload_workers.start()
+    yield
+    if upload_workers is not None:
+        upload_workers.stop()
+    if index_registry is not None:
+        index_registry.stop()
 
 # FastAPI 앱 생성
 logger.debug("Creating FastAPI application...")
@@ -55,7 +112,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # CORS 미들웨어 설정
@@ -71,6 +129,10 @@ app.add_middleware(
 # API 라우터 추가
 logger.debug("Adding API router...")
 app.include_router(router)
+app.state.index_registry = index_registry
+app.state.upload_jobs = upload_jobs
+app.state.upload_workers = upload_workers
+app.state.file_registry = file_registry
 
 @app.get("/")
 async def root():
@@ -86,6 +148,37 @@ async def health_check():
         "mode": "rag" if rag_engine is not None else "llm_only"
     }
 
+@app.get("/admin/index")
+async def index_status():
+    """현재 서비스 중인 벡터 인덱스 버전"""
+    if index_registry is None:
+        raise HTTPException(status_code=503, detail="Index registry not initialized")
+    return index_registry.status()
+
+@app.post("/admin/index/reload")
+async def reload_index():
+    """새 인덱스 버전 확인 요청 (로드는 백그라운드에서 진행)"""
+    if index_registry is None:
+        raise HTTPException(status_code=503, detail="Index registry not initialized")
+    index_registry.request_reload()
+    return {"reload_requested": True, **index_registry.status()}
+
+@app.get("/admin/embedding-cache")
+async def embedding_cache_status():
+    """임베딩 캐시 적중/미스 통계"""
+    stats = embedder.cache_stats() if embedder is not None else None
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Embedding cache not enabled")
+    return stats
+
+@app.get("/admin/query-cache")
+async def query_cache_status():
+    """쿼리 임베딩 캐시 통계"""
+    stats = embedder.query_cache_stats() if embedder is not None else None
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Query cache not enabled")
+    return stats
+
 @app.post("/query", response_model=QueryResponse)
 async def query_endpoint(request: QueryRequest):
     """사용자 질문 처리"""
@@ -130,6 +223,45 @@ async def query_endpoint(request: QueryRequest):
         logger.error(f"Error processing query: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def batch_query_endpoint(request: BatchQueryRequest):
+    """여러 질문을 한 번에 검색 (답변 생성 없이 출처만 반환, 평가/QA 생성용)"""
+    if mongo_vectorstore is None:
+        raise HTTPException(status_code=503, detail="MongoDB vector store not initialized")
+    
+    try:
+        folder_id = ObjectId(request.folder_id) if request.folder_id else None
+    except InvalidId:
+        raise HTTPException(status_code=400, detail=f"Invalid folder_id: {request.folder_id}")
+    
+    try:
+        # 문서 임베딩 캐시 대신 쿼리 캐시를 거치도록 쿼리 경로 사용
+        query_embeddings = await run_in_threadpool(embedder.embed_queries, request.queries)
+        # Mongo 조회와 행렬 곱이 이벤트 루프를 막지 않도록 스레드풀에서 검색
+        batch_documents = await run_in_threadpool(
+            mongo_vectorstore.similarity_search_batch,
+            query_embeddings, folder_id, k=request.k, exact=request.exact
+        )
+        
+        return BatchQueryResponse(
+            results=[{
+                "query": query,
+                "sources": [{
+                    "chunk_id": doc.metadata["document_id"],
+                    "text": doc.page_content[:200] + "...",
+                    "score": doc.metadata["similarity"]
+                } for doc in documents]
+            } for query, documents in zip(request.queries, batch_documents)],
+            metadata={
+                "total_queries": len(request.queries),
+                "folder_id": request.folder_id,
+                "k": request.k
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error processing batch query: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     logger.info("Starting server...")
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,21 +1,43 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional
 from src.api.schemas import EmbedRequest, EmbedResponse, DocumentInfo
-from src.data_processing.loader import DocumentLoader
+from src.api.upload_jobs import UPLOAD_JOB
+from src.api.upload_stream import StreamedUpload, UploadSlots, stream_upload
 from src.data_processing.cleaner import TextCleaner
-from src.data_processing.chunker import TextChunker
+from src.data_processing.chunker import create_chunker
+from src.data_processing.file_registry import FileRegistry
 from src.embedding.embedder import Embedder
-from src.embedding.vectorstore import VectorStore
-from src.labeling.auto_labeler import AutoLabeler
-from src.labeling.qa_generator import QAGenerator
 from src.utils.database import MongoDBClient
 from config.settings import settings
-import tempfile
+from bson import ObjectId
+from bson.errors import InvalidId
+import datetime
 import os
+import uuid
 import logging
 
 router = APIRouter()
 
+# 동시에 수신 중인 업로드 수 제한
+upload_slots = UploadSlots(settings.upload_max_concurrency)
+
+# 본문을 직접 파싱하므로 문서(/docs)용 요청 스키마를 따로 지정
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"]
+                }
+            }
+        }
+    }
+}
+
 @router.post("/embed", response_model=EmbedResponse)
 async def embed_documents(request: EmbedRequest):
     """문서 임베딩 생성"""
@@ -24,8 +46,8 @@ async def embed_documents(request: EmbedRequest):
         cleaner = TextCleaner()
         cleaned_text = cleaner.clean_text(request.text)
         
-        # 청킹
-        chunker = TextChunker()
+        # 청킹 (CHUNK_STRATEGY)
+        chunker = create_chunker()
         chunks = chunker.split_text(cleaned_text)
         
         # 임베딩 생성
@@ -40,173 +62,142 @@ async def embed_documents(request: EmbedRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/upload")
-async def upload_document(file: UploadFile = File(...)):
-    """문서 업로드 및 처리"""
+@router.post("/upload", status_code=202, openapi_extra=UPLOAD_OPENAPI)
+async def upload_document(request: Request, response: Response,
+                          folder_id: Optional[str] = None, force: bool = False):
+    """문서 업로드: 파일을 디스크로 스트리밍 저장하고 처리 작업을 큐에 넣은 뒤 작업 id 반환
+    
+    같은 내용의 파일이 이미 처리되었으면 (force=true가 아닌 한) 작업 없이 기존 결과를 반환하고,
+    folder_id가 다른 폴더면 기존 Document/라벨/QA를 그 폴더에 연결합니다.
+    """
     logger = logging.getLogger(__name__)
+    job_queue = getattr(request.app.state, "upload_jobs", None)
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Upload job queue not initialized")
+    file_registry = getattr(request.app.state, "file_registry", None)
     
-    tmp_path = None
-    db_client = None
+    folder = None
+    if folder_id:
+        try:
+            folder = ObjectId(folder_id)
+        except InvalidId:
+            raise HTTPException(status_code=400, detail=f"Invalid folder_id: {folder_id}")
+        if file_registry is not None and await run_in_threadpool(file_registry.db.get_folder, folder) is None:
+            raise HTTPException(status_code=404, detail=f"Folder not found: {folder_id}")
     
+    # 작업이 재시작 후에도 파일을 찾을 수 있도록 임시 디렉토리가 아닌 UPLOAD_DIR에 저장
+    upload_slots.acquire()
     try:
-        logger.info(f"Starting upload process for file: {file.filename}")
-        
-        # 임시 파일 저장
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}") as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        logger.info(f"Temporary file saved: {tmp_path}")
-        
-        # 문서 로드
-        try:
-            loader = DocumentLoader()
-            documents = loader.load_file(tmp_path)
-            logger.info(f"Loaded {len(documents)} documents")
-        except Exception as e:
-            logger.error(f"Document loading failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Document loading failed: {str(e)}")
-        
-        # 클리닝
-        try:
-            cleaner = TextCleaner()
-            cleaned_docs = cleaner.clean_documents(documents)
-            logger.info(f"Cleaned {len(cleaned_docs)} documents")
-        except Exception as e:
-            logger.error(f"Text cleaning failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Text cleaning failed: {str(e)}")
-        
-        # 청킹
-        try:
-            chunker = TextChunker()
-            chunks = chunker.split_documents(cleaned_docs)
-            logger.info(f"Created {len(chunks)} chunks")
-        except Exception as e:
-            logger.error(f"Text chunking failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Text chunking failed: {str(e)}")
-        
-        # 임베딩 생성 및 벡터 스토어 저장
-        try:
-            embedder = Embedder()
-            vectorstore = VectorStore()
-            vectorstore.create_vectorstore(chunks, embedder.embeddings)
-            vectorstore.save("./data/embeddings/faiss")
-            logger.info("Vector store created and saved")
-        except Exception as e:
-            logger.error(f"Vector store creation failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Vector store creation failed: {str(e)}")
-        
-        # 라벨링
-        try:
-            labeler = AutoLabeler()
-            labels = labeler.label_documents(chunks)
-            logger.info(f"Generated {len(labels)} labels")
-        except Exception as e:
-            logger.error(f"Labeling failed: {str(e)}")
-            # 라벨링 실패는 치명적이지 않으므로 빈 리스트로 계속 진행
-            labels = []
-            logger.warning("Continuing without labels")
-        
-        # QA 생성
-        try:
-            qa_generator = QAGenerator()
-            qa_pairs = qa_generator.generate_qa_batch(chunks[:5])  # 처음 5개만
-            logger.info(f"Generated {len(qa_pairs)} QA pairs")
-        except Exception as e:
-            logger.error(f"QA generation failed: {str(e)}")
-            # QA 생성 실패는 치명적이지 않으므로 빈 리스트로 계속 진행
-            qa_pairs = []
-            logger.warning("Continuing without QA pairs")
-        
-        # MongoDB에 데이터 저장
-        try:
-            db_client = MongoDBClient(settings.mongodb_uri)
-            
-            # 청크 데이터 저장
-            chunk_ids = []
-            for i, chunk in enumerate(chunks):
-                chunk_data = {
-                    "chunk_id": f"chunk_{i}",
-                    "text": chunk.page_content,
-                    "metadata": chunk.metadata,
-                    "filename": file.filename
-                }
-                result = db_client.insert_chunk(chunk_data)
-                chunk_ids.append(str(result.inserted_id))  # ObjectId를 문자열로 변환
-            
-            # 라벨 데이터 저장
-            label_ids = []
-            for label in labels:
-                result = db_client.insert_labels(label)
-                label_ids.append(str(result.inserted_id))  # ObjectId를 문자열로 변환
-            
-            # QA 데이터 저장
-            qa_ids = []
-            for qa in qa_pairs:
-                result = db_client.insert_qa_pairs(qa)
-                qa_ids.append(str(result.inserted_id))  # ObjectId를 문자열로 변환
-            
-            logger.info("Data saved to MongoDB")
-            
-        except Exception as e:
-            logger.error(f"MongoDB operations failed: {str(e)}")
-            raise HTTPException(status_code=500, detail=f"Database save failed: {str(e)}")
-        
-        finally:
-            if db_client:
-                db_client.close()
-        
-        # 임시 파일 삭제
-        if tmp_path and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-            logger.info("Temporary file deleted")
-        
-        # ObjectId가 포함되지 않은 안전한 응답 데이터 생성
-        safe_labels = []
-        for label in labels[:3]:
-            if isinstance(label, dict):
-                # ObjectId 제거하고 안전한 데이터만 포함
-                safe_label = {k: v for k, v in label.items() if k != '_id' and not str(type(v)).startswith("<class 'bson")}
-                safe_labels.append(safe_label)
-            else:
-                safe_labels.append(str(label))
-        
-        safe_qa_pairs = []
-        for qa in qa_pairs[:2]:
-            if isinstance(qa, dict):
-                # ObjectId 제거하고 안전한 데이터만 포함
-                safe_qa = {k: v for k, v in qa.items() if k != '_id' and not str(type(v)).startswith("<class 'bson")}
-                safe_qa_pairs.append(safe_qa)
-            else:
-                safe_qa_pairs.append(str(qa))
-        
-        return {
-            "filename": file.filename,
-            "num_chunks": len(chunks),
-            "labels": safe_labels,
-            "qa_samples": safe_qa_pairs,
-            "vector_store_saved": True,
-            "mongodb_saved": True
-        }
-        
-    except HTTPException:
-        # HTTPException은 다시 raise
-        raise
+        upload = await stream_upload(request, settings.upload_dir, settings.upload_max_mb * 1024 * 1024)
+    finally:
+        upload_slots.release()
+    
+    job_id = uuid.uuid4().hex
+    if file_registry is not None:
+        existing = await run_in_threadpool(
+            file_registry.reserve, upload.sha256, job_id, upload.filename, upload.size, folder, force
+        )
+        if existing is not None:
+            existing_job = (await run_in_threadpool(job_queue.get, existing["job_id"])
+                            if existing["status"] == "queued" else None)
+            if existing["status"] == "completed" or not _is_abandoned(existing, existing_job):
+                os.unlink(upload.path)
+                return await _reuse_upload(file_registry, existing, folder, upload, response)
+            # 처리 중이던 작업이 실패로 끝났거나 등록되지 못한 채 방치되었으면 새로 처리
+            await run_in_threadpool(
+                file_registry.reserve, upload.sha256, job_id, upload.filename, upload.size, folder, True
+            )
+    
+    try:
+        await run_in_threadpool(job_queue.enqueue, UPLOAD_JOB, {
+            "path": upload.path,
+            "filename": upload.filename,
+            "size": upload.size,
+            "content_hash": upload.sha256,
+            "folder_id": folder_id
+        }, job_id=job_id)
     except Exception as e:
-        logger.error(f"Unexpected error in upload: {str(e)}")
-        # 임시 파일 정리
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
-        if db_client:
-            try:
-                db_client.close()
-            except:
-                pass
+        logger.error(f"Failed to enqueue upload {upload.filename}: {str(e)}")
+        os.unlink(upload.path)
+        if file_registry is not None:
+            await run_in_threadpool(file_registry.fail, upload.sha256, job_id)
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    workers = getattr(request.app.state, "upload_workers", None)
+    if workers is not None:
+        workers.notify()
+    logger.info(f"Queued upload job {job_id} for file: {upload.filename} ({upload.size} bytes)")
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "deduplicated": False,
+        "filename": upload.filename,
+        "size": upload.size,
+        "content_hash": upload.sha256
+    }
+
+def _is_abandoned(entry: Dict[str, Any], job: Optional[Dict[str, Any]]) -> bool:
+    """처리 중 기록의 작업이 실패했는지 (작업이 아직 없으면 UPLOAD_JOB_STALE_SECONDS가 지난 경우만)
+
+    reserve와 enqueue 사이에는 작업 문서가 없으므로, 작업이 없다고 바로 다시 처리하면
+    같은 파일을 두 작업이 처리하고 먼저 끝난 작업의 결과가 레지스트리에 기록되지 않습니다.
+    """
+    if job is not None:
+        return job["status"] == "failed"
+    age = datetime.datetime.utcnow() - entry["updated_at"]
+    return age.total_seconds() > settings.upload_job_stale_seconds
+
+async def _reuse_upload(file_registry: FileRegistry, entry: Dict[str, Any], folder: Optional[ObjectId],
+                        upload: StreamedUpload, response: Response):
+    """이미 처리된(또는 처리 중인) 같은 내용의 파일 결과 반환
+
+    처리 중인 파일은 요청한 폴더를 기록해 두고 처리가 끝날 때 연결합니다.
+    """
+    if entry["status"] == "queued" and folder is not None:
+        if not await run_in_threadpool(file_registry.add_pending_link, entry, folder):
+            # 그 사이 처리가 끝났으면 완료된 기록으로 바로 연결
+            entry = await run_in_threadpool(file_registry.lookup, entry["_id"]) or entry
+    if entry["status"] == "completed":
+        if folder is not None:
+            entry = await run_in_threadpool(file_registry.link, entry, folder)
+        response.status_code = 200
+    logging.getLogger(__name__).info(f"Reused upload {entry['_id'][:12]} ({entry['status']}) for {upload.filename}")
+    return {
+        "job_id": entry["job_id"],
+        "status": entry["status"],
+        "deduplicated": True,
+        "filename": upload.filename,
+        "size": upload.size,
+        "content_hash": upload.sha256,
+        "folder_ids": [str(folder_id) for folder_id in entry["folder_ids"]],
+        "pending_folder_ids": [str(folder)] if entry["status"] == "queued" and folder is not None else [],
+        "result": entry["result"]
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_job(request: Request, job_id: str):
+    """업로드 작업 상태와 단계별 진행 상황/소요 시간"""
+    job_queue = getattr(request.app.state, "upload_jobs", None)
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Upload job queue not initialized")
+    
+    job = await run_in_threadpool(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    
+    return {
+        "job_id": job["_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "filename": job["payload"].get("filename"),
+        "attempts": job["attempts"],
+        "stages": job["stages"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"]
+    }
 
 @router.get("/documents", response_model=List[DocumentInfo])
 async def list_documents():
@@ -17,6 +17,20 @@ class QueryResponse(BaseModel):
     sources: List[Source]
     metadata: Dict[str, Any]
 
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+    k: int = Field(default=5)
+    folder_id: Optional[str] = Field(default=None)
+    exact: bool = Field(default=False)
+
+class BatchQueryResult(BaseModel):
+    query: str
+    sources: List[Source]
+
+class BatchQueryResponse(BaseModel):
+    results: List[BatchQueryResult]
+    metadata: Dict[str, Any]
+
 class EmbedRequest(BaseModel):
     text: str
     chunk_size: int = Field(default=500)
@@ -0,0 +1,227 @@
+"""
+업로드 작업 처리
+CREATED [2026-10-18]: POST /upload가 큐에 넣은 작업을 백그라운드 워커에서 처리
+
+단계 (작업 문서 stages에 진행 상황/소요 시간 기록):
+- ingest: 로드 → 클리닝 → 청킹 → 임베딩 → 저장 (FAISS 새 버전 게시, 청크는 MongoDB에 저장)
+- labeling: 청크별 LLM 라벨링 (실패해도 계속 진행)
+- qa: QA 생성 (실패해도 계속 진행)
+- save: 라벨/QA MongoDB 저장
+
+작업이 만든 Document/원문/FAISS 벡터는 metadata["upload_job_id"]로 표시하여, 재시도 전과
+마지막 시도 실패 후에 이전 시도가 남긴 결과를 지웁니다 (재시도해도 청크가 중복되지 않음).
+워커 프로세스가 중단되어 시도 횟수를 다 쓴 작업은 abandon_upload(on_abandoned 훅)가 같은 방식으로 정리합니다.
+"""
+
+from typing import Any, Dict
+import logging
+import os
+import threading
+from bson import ObjectId
+from src.data_processing.dedup import deduplicator_from_settings
+from src.data_processing.file_registry import FileRegistry
+from src.data_processing.pipeline import FaissSink, build_ingest_pipeline
+from src.embedding.embedder import Embedder
+from src.embedding.vectorstore import VectorStore
+from src.labeling.auto_labeler import AutoLabeler
+from src.labeling.qa_generator import QAGenerator
+from src.utils.database import MongoDBClient
+from src.utils.job_queue import JobProgress
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_JOB = "upload"
+
+# 업로드용 FAISS 인덱스 (한 번 로드한 뒤 새 청크만 추가)
+faiss_writer = VectorStore()
+# 여러 워커가 같은 인덱스에 새 버전을 게시하지 않도록 직렬화
+_faiss_lock = threading.Lock()
+
+
+def _safe_sample(items, limit: int):
+    """ObjectId가 포함되지 않은 응답용 샘플"""
+    samples = []
+    for item in items[:limit]:
+        if isinstance(item, dict):
+            samples.append({k: v for k, v in item.items()
+                            if k != '_id' and not str(type(v)).startswith("<class 'bson")})
+        else:
+            samples.append(str(item))
+    return samples
+
+
+def _purge_job_output(job_id: str, db_client: MongoDBClient, embeddings) -> int:
+    """이전 시도가 이 폴더에 남긴 Document(Labels/QAPairs/서명 포함), 원문, FAISS 벡터 삭제"""
+    document_ids = [doc["_id"] for doc in db_client.v2.documents.find(
+        {"metadata.upload_job_id": job_id, "folder_id": db_client.folder_id}, {"_id": 1}
+    )]
+    if document_ids:
+        db_client.v2.delete_documents(document_ids, cascade=True)
+    db_client.v2.sources.delete_many({"metadata.upload_job_id": job_id, "folder_id": db_client.folder_id})
+    with _faiss_lock:
+        faiss_writer.delete_by_metadata("upload_job_id", [job_id], embeddings, settings.faiss_index_path,
+                                        keep_versions=settings.faiss_keep_versions)
+    return len(document_ids)
+
+
+def _remove_upload(file_path: str):
+    if os.path.exists(file_path):
+        os.unlink(file_path)
+
+
+def _clean_up_failed_upload(job_id: str, payload: Dict[str, Any], db_client: MongoDBClient, embeddings):
+    """더 이상 재시도하지 않는 작업의 결과, 레지스트리 기록, 업로드 파일 정리"""
+    try:
+        _purge_job_output(job_id, db_client, embeddings)
+    except Exception as e:
+        logger.warning(f"Failed to clean up output of upload job {job_id}: {str(e)}")
+    if payload.get("content_hash"):
+        FileRegistry(db_client.v2).fail(payload["content_hash"], job_id)
+    _remove_upload(payload["path"])
+
+
+def abandon_upload(job: Dict[str, Any]):
+    """워커 프로세스가 중단되어 마지막 시도가 failed로 처리된 업로드 작업 정리 (JobWorkerPool.on_abandoned)"""
+    payload = job["payload"]
+    folder_id = ObjectId(payload["folder_id"]) if payload.get("folder_id") else None
+    db_client = MongoDBClient(settings.mongodb_uri, folder_id=folder_id)
+    try:
+        _clean_up_failed_upload(job["_id"], payload, db_client, Embedder().embeddings)
+    finally:
+        db_client.close()
+
+
+def process_upload(job: Dict[str, Any], progress: JobProgress, index_registry=None) -> Dict[str, Any]:
+    """업로드 작업 하나 처리 (업로드 파일은 성공하거나 마지막 시도가 실패했을 때만 삭제)
+
+    payload의 folder_id가 있으면 그 폴더에 저장하고, content_hash가 있으면 결과를
+    Files 레지스트리에 기록하여 같은 파일의 재업로드가 결과를 재사용하게 합니다.
+    """
+    job_id = job["_id"]
+    payload = job["payload"]
+    file_path = payload["path"]
+    filename = payload["filename"]
+    content_hash = payload.get("content_hash")
+    folder_id = ObjectId(payload["folder_id"]) if payload.get("folder_id") else None
+    db_client = MongoDBClient(settings.mongodb_uri, folder_id=folder_id)
+    file_registry = FileRegistry(db_client.v2) if content_hash else None
+
+    embedder = Embedder()
+    try:
+        if job.get("attempts", 1) > 1:
+            purged = _purge_job_output(job_id, db_client, embedder.embeddings)
+            logger.info(f"Retrying upload job {job_id}: removed {purged} documents from the previous attempt")
+
+        with progress.stage("ingest"):
+            sink = FaissSink(
+                faiss_writer, embedder.embeddings, settings.faiss_index_path,
+                keep_versions=settings.faiss_keep_versions, publish_every=settings.faiss_publish_every
+            )
+            document_ids = []
+            duplicates = []
+
+            def store(pairs):
+                for chunk, _ in pairs:
+                    chunk.metadata["upload_job_id"] = job_id
+                # publish_every개가 모이면 add 안에서 새 버전을 게시하므로 잠금 안에서 호출
+                with _faiss_lock:
+                    sink.add(pairs)
+                document_ids.extend(db_client.insert_chunks_bulk([{
+                    "chunk_id": chunk.metadata["chunk_id"],
+                    "text": chunk.page_content,
+                    "metadata": chunk.metadata,
+                    "filename": filename
+                } for chunk, _ in pairs]))
+                progress.update("ingest", chunks=len(document_ids))
+
+            pipeline = build_ingest_pipeline(
+                embedder.embeddings, store,
+                deduplicator=deduplicator_from_settings(db_client.v2.db, db_client.folder_id),
+                on_duplicate=duplicates.append,
+                on_source=(lambda document: db_client.insert_source(
+                    document.page_content, {**document.metadata, "upload_job_id": job_id}))
+                if settings.chunk_spans_enabled else None
+            )
+            chunks = list(pipeline.stream([file_path]))
+
+            # 중복 청크는 임베딩 없이 원본 Document에 연결 (같은 업로드의 원본이 저장된 뒤)
+            orphans = []
+            for chunk in duplicates:
+                chunk.metadata["upload_job_id"] = job_id
+                try:
+                    inserted = db_client.insert_duplicate_chunk({
+                        "chunk_id": chunk.metadata["chunk_id"],
+                        "text": chunk.page_content,
+                        "metadata": chunk.metadata,
+                        "filename": filename
+                    }, chunk.metadata["duplicate_of"])
+                except ValueError:
+                    orphans.append(chunk)
+                    continue
+                document_ids.append(inserted.inserted_id)
+
+            # 그 사이 원본이 삭제된 청크는 일반 청크로 임베딩하여 저장
+            if orphans:
+                for chunk in orphans:
+                    chunk.metadata.pop("duplicate_of", None)
+                store(list(zip(orphans, embedder.embeddings.embed_documents(
+                    [chunk.page_content for chunk in orphans]))))
+                orphan_ids = {chunk.metadata["chunk_id"] for chunk in orphans}
+                duplicates = [chunk for chunk in duplicates if chunk.metadata["chunk_id"] not in orphan_ids]
+
+            with _faiss_lock:
+                vector_store_version = sink.close()
+
+            progress.update("ingest", chunks=len(chunks), duplicates=len(duplicates),
+                            vector_store_version=vector_store_version, pipeline=pipeline.stats())
+            logger.info(f"Created and stored {len(chunks)} chunks for {filename} "
+                        f"(version: {vector_store_version}, duplicates: {len(duplicates)})")
+
+            # 쿼리용 인덱스 레지스트리에 새 버전 알림
+            if index_registry is not None:
+                index_registry.request_reload()
+
+        # 라벨링 (실패는 치명적이지 않으므로 빈 리스트로 계속 진행)
+        labels = []
+        try:
+            with progress.stage("labeling"):
+                labels = AutoLabeler().label_documents(chunks)
+                progress.update("labeling", labels=len(labels))
+        except Exception as e:
+            logger.warning(f"Labeling failed, continuing without labels: {str(e)}")
+
+        # QA 생성 (처음 5개 청크만, 실패해도 계속 진행)
+        qa_pairs = []
+        try:
+            with progress.stage("qa"):
+                qa_pairs = QAGenerator().generate_qa_batch(chunks[:5])
+                progress.update("qa", qa_pairs=len(qa_pairs))
+        except Exception as e:
+            logger.warning(f"QA generation failed, continuing without QA pairs: {str(e)}")
+
+        with progress.stage("save"):
+            db_client.insert_labels_bulk(labels)
+            db_client.insert_qa_pairs_bulk(qa_pairs)
+
+        result = {
+            "filename": filename,
+            "num_chunks": len(chunks),
+            "num_duplicates": len(duplicates),
+            "labels": _safe_sample(labels, 3),
+            "qa_samples": _safe_sample(qa_pairs, 2),
+            "vector_store_saved": True,
+            "vector_store_version": vector_store_version,
+            "mongodb_saved": True
+        }
+        if file_registry is not None:
+            file_registry.complete(content_hash, job_id, db_client.folder_id, document_ids, result)
+        _remove_upload(file_path)
+        return result
+    except Exception:
+        # 재시도가 남았으면 업로드 파일과 레지스트리 기록을 그대로 두고, 이번 시도의 결과는 재시도 전에 정리
+        if progress.final_attempt:
+            _clean_up_failed_upload(job_id, payload, db_client, embedder.embeddings)
+        raise
+    finally:
+        db_client.close()
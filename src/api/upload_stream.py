@@ -0,0 +1,152 @@
+"""
+업로드 스트리밍 수신
+CREATED [2026-10-18]: multipart 요청 본문을 메모리에 모으지 않고 디스크로 바로 복사
+
+동작:
+- request.stream()으로 받은 조각을 python-multipart 파서에 넣고, 파일 파트 데이터를
+  aiofiles로 즉시 기록 (업로드 하나의 메모리 사용량은 파일 크기와 무관)
+- 기록하면서 sha256과 크기를 계산하고, max_bytes를 넘는 순간 중단 (413)
+- 동시 업로드 수는 UploadSlots로 제한 (429)
+
+FastAPI의 UploadFile은 본문 전체를 먼저 파싱하므로 크기 제한을 중간에 적용할 수 없어
+엔드포인트에서 파일 파라미터 대신 Request를 직접 받습니다.
+"""
+
+from typing import Any, List, Tuple
+import hashlib
+import os
+import uuid
+import aiofiles
+from fastapi import HTTPException, Request
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# multipart 경계/헤더 등 본문에서 파일 외에 허용하는 여유분
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StreamedUpload:
+    """디스크에 기록된 업로드 파일"""
+
+    def __init__(self, path: str, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+
+class UploadSlots:
+    """동시 업로드 수 제한 (이벤트 루프 안에서만 사용)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+
+    def acquire(self):
+        if self.limit and self.active >= self.limit:
+            raise HTTPException(status_code=429, detail=f"Too many concurrent uploads (limit: {self.limit})",
+                                headers={"Retry-After": "5"})
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+
+
+class _PartEvents:
+    """파서 콜백이 남긴 이벤트 (파서 호출이 끝난 뒤 비동기로 처리)"""
+
+    def __init__(self):
+        self.header_field = b""
+        self.header_value = b""
+        self.headers: List[Tuple[bytes, bytes]] = []
+        self.events: List[Tuple[str, Any]] = []
+
+    def callbacks(self):
+        def on_part_begin():
+            self.headers = []
+
+        def on_header_field(data, start, end):
+            self.header_field += data[start:end]
+
+        def on_header_value(data, start, end):
+            self.header_value += data[start:end]
+
+        def on_header_end():
+            self.headers.append((self.header_field.lower(), self.header_value))
+            self.header_field, self.header_value = b"", b""
+
+        def on_headers_finished():
+            disposition = dict(self.headers).get(b"content-disposition", b"")
+            _, options = parse_options_header(disposition)
+            self.events.append(("begin", (options.get(b"name", b""), options.get(b"filename"))))
+
+        def on_part_data(data, start, end):
+            self.events.append(("data", bytes(data[start:end])))
+
+        def on_part_end():
+            self.events.append(("end", None))
+
+        return {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end
+        }
+
+
+async def stream_upload(request: Request, directory: str, max_bytes: int,
+                        field_name: str = "file") -> StreamedUpload:
+    """multipart 본문의 field_name 파일 파트를 directory에 기록 (다른 필드는 무시)"""
+    content_type, params = parse_options_header(request.headers.get("content-type"))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data with a boundary")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + _MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+
+    state = _PartEvents()
+    parser = MultipartParser(params[b"boundary"], state.callbacks())
+    os.makedirs(directory, exist_ok=True)
+
+    path, filename, output = None, None, None
+    writing, finished = False, False
+    digest, size = hashlib.sha256(), 0
+    try:
+        async for body in request.stream():
+            parser.write(body)
+            events, state.events = state.events, []
+            for kind, data in events:
+                if kind == "begin":
+                    name, part_filename = data
+                    writing = not finished and name.decode() == field_name and bool(part_filename)
+                    if writing:
+                        filename = part_filename.decode("utf-8", errors="replace")
+                        path = os.path.join(directory, f"{uuid.uuid4().hex}_{os.path.basename(filename)}")
+                        output = await aiofiles.open(path, "wb")
+                elif kind == "data" and writing:
+                    size += len(data)
+                    if size > max_bytes:
+                        raise HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+                    digest.update(data)
+                    await output.write(data)
+                elif kind == "end" and writing:
+                    await output.close()
+                    output, writing, finished = None, False, True
+        parser.finalize()
+
+        if not finished:
+            raise HTTPException(status_code=400, detail=f"Missing file field: {field_name}")
+        return StreamedUpload(path, filename, size, digest.hexdigest())
+    except Exception as e:
+        # 중단된 업로드는 부분 파일을 남기지 않음
+        if output is not None:
+            await output.close()
+        if path and os.path.exists(path):
+            os.unlink(path)
+        if isinstance(e, MultipartParseError):
+            raise HTTPException(status_code=400, detail=f"Malformed multipart body: {str(e)}")
+        raise
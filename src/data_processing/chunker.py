@@ -1,7 +1,13 @@
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from typing import List
+from typing import Callable, List, Optional, Tuple
 from langchain.schema import Document
 from config.settings import settings
+from src.utils.token_counter import get_token_counter, tokenizer_name
+import re
+
+# 문장 끝: 종결 부호(+닫는 따옴표/괄호) 뒤 공백, 또는 줄바꿈 (3.5 같은 소수점은 제외)
+_SENTENCE_END = re.compile(r'[.!?…。？！]+["\'”’」』)\]]*(?=\s)|\n')
+_WORD = re.compile(r'\S+')
 
 class TextChunker:
     def __init__(self, chunk_size: int = None, overlap: int = None):
@@ -21,3 +27,152 @@ class TextChunker:
     def split_text(self, text: str) -> List[str]:
         """텍스트를 청크로 분할"""
         return self.splitter.split_text(text)
+    
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """텍스트를 청크 (시작, 끝) 위치로 분할 (text[start:end]가 split_text의 청크와 같음)"""
+        spans = []
+        search_from = 0
+        for chunk in self.splitter.split_text(text):
+            start = text.find(chunk, search_from)
+            if start < 0:
+                # 겹침이 청크 크기에 가까우면 앞 청크보다 먼저 시작할 수 있으므로 가장 가까운 앞쪽 위치
+                start = text.rfind(chunk, 0, search_from + len(chunk))
+            spans.append((start, start + len(chunk)))
+            # 다음 청크는 겹침 구간 안에서 시작할 수 있음
+            search_from = max(start + len(chunk) - self.overlap, start + 1)
+        return spans
+    
+    def split_document_spans(self, document: Document, source_id: str = None) -> List[Document]:
+        """원문 위치(span_start, span_end, source_id)를 metadata에 기록한 청크로 분할
+        
+        page_content는 임베딩용으로만 채우며, 저장 시에는 원문과 위치만 남길 수 있습니다.
+        """
+        text = document.page_content
+        chunks = []
+        for start, end in self.split_spans(text):
+            metadata = {**document.metadata, "span_start": start, "span_end": end}
+            if source_id is not None:
+                metadata["source_id"] = source_id
+            chunks.append(Document(page_content=text[start:end], metadata=metadata))
+        return chunks
+
+
+class KoreanSentenceChunker:
+    """한국어 문장 경계에서 나누고 토큰 수로 크기를 맞추는 청커
+    
+    문장(너무 긴 문장은 어절, 어절도 길면 글자 단위)을 chunk_tokens 이하로 묶고
+    마지막 문장들을 overlap_tokens 이하만큼 다음 청크와 겹칩니다. 청크의 토큰 수는
+    metadata["token_count"]에, 센 토크나이저는 metadata["token_model"]에 기록되어 같은
+    토크나이저를 쓰는 임베딩 배치 구성과 컨텍스트 조립에서 재사용됩니다.
+    token_counter를 직접 주면 token_model도 함께 주어야 토큰 수가 재사용됩니다.
+    """
+    
+    def __init__(self, chunk_tokens: int = None, overlap_tokens: int = None,
+                 token_counter: Callable[[str], int] = None, token_model: Optional[str] = None):
+        self.chunk_tokens = chunk_tokens or settings.chunk_tokens
+        self.overlap_tokens = settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+        self.count_tokens = token_counter or get_token_counter(settings.embedding_model)
+        self.token_model = token_model if token_counter is not None else tokenizer_name(settings.embedding_model)
+    
+    def split_sentences(self, text: str) -> List[Tuple[int, int]]:
+        """문장 (시작, 끝) 위치 (앞뒤 공백 제외)"""
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(text):
+            self._add_trimmed(text, start, match.end(), sentences)
+            start = match.end()
+        self._add_trimmed(text, start, len(text), sentences)
+        return sentences
+    
+    @staticmethod
+    def _add_trimmed(text: str, start: int, end: int, spans: List[Tuple[int, int]]):
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            spans.append((start, end))
+    
+    def _units(self, text: str) -> List[Tuple[int, int, int]]:
+        """청크를 구성할 (시작, 끝, 토큰 수) 단위 (chunk_tokens보다 큰 문장은 더 잘게)"""
+        units = []
+        for start, end in self.split_sentences(text):
+            tokens = self.count_tokens(text[start:end])
+            if tokens <= self.chunk_tokens:
+                units.append((start, end, tokens))
+                continue
+            for match in _WORD.finditer(text, start, end):
+                word_tokens = self.count_tokens(match.group())
+                if word_tokens <= self.chunk_tokens:
+                    units.append((match.start(), match.end(), word_tokens))
+                    continue
+                # 띄어쓰기 없이 긴 어절: 토큰 비율로 글자 단위 분할
+                step = max(1, len(match.group()) * self.chunk_tokens // word_tokens)
+                for piece in range(match.start(), match.end(), step):
+                    piece_end = min(piece + step, match.end())
+                    units.append((piece, piece_end, self.count_tokens(text[piece:piece_end])))
+        return units
+    
+    def split_spans_with_counts(self, text: str) -> List[Tuple[int, int, int]]:
+        """청크 (시작, 끝, 토큰 수) 목록"""
+        units = self._units(text)
+        chunks = []
+        i = 0
+        while i < len(units):
+            j, tokens = i, 0
+            while j < len(units) and (j == i or tokens + units[j][2] <= self.chunk_tokens):
+                tokens += units[j][2]
+                j += 1
+            start, end = units[i][0], units[j - 1][1]
+            chunks.append((start, end, self.count_tokens(text[start:end])))
+            if j >= len(units):
+                break
+            
+            # 끝쪽 단위들을 overlap_tokens 이하만큼 다음 청크에 포함 (항상 앞으로 진행)
+            k, overlap = j, 0
+            while k - 1 > i and overlap + units[k - 1][2] <= self.overlap_tokens:
+                overlap += units[k - 1][2]
+                k -= 1
+            # 겹침만으로 채워진 청크가 생기지 않도록 다음 단위가 들어갈 자리 확보
+            while k < j and overlap + units[j][2] > self.chunk_tokens:
+                overlap -= units[k][2]
+                k += 1
+            i = k
+        return chunks
+    
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        return [(start, end) for start, end, _ in self.split_spans_with_counts(text)]
+    
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+    
+    def _split_document(self, document: Document, spans: bool, source_id: str = None) -> List[Document]:
+        text = document.page_content
+        chunks = []
+        for start, end, tokens in self.split_spans_with_counts(text):
+            metadata = {**document.metadata, "token_count": tokens}
+            if self.token_model is not None:
+                metadata["token_model"] = self.token_model
+            if spans:
+                metadata["span_start"], metadata["span_end"] = start, end
+                if source_id is not None:
+                    metadata["source_id"] = source_id
+            chunks.append(Document(page_content=text[start:end], metadata=metadata))
+        return chunks
+    
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        """문서를 청크로 분할 (metadata["token_count"] 포함)"""
+        return [chunk for document in documents for chunk in self._split_document(document, False)]
+    
+    def split_document_spans(self, document: Document, source_id: str = None) -> List[Document]:
+        """TextChunker.split_document_spans와 같은 형식 (metadata["token_count"] 포함)"""
+        return self._split_document(document, True, source_id)
+
+
+def create_chunker():
+    """CHUNK_STRATEGY 설정에 맞는 청커 (character: 글자 수, korean_sentence: 문장/토큰 수)"""
+    if settings.chunk_strategy == "korean_sentence":
+        return KoreanSentenceChunker()
+    if settings.chunk_strategy != "character":
+        raise ValueError(f"Unsupported chunk strategy: {settings.chunk_strategy}")
+    return TextChunker()
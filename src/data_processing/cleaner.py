@@ -1,9 +1,47 @@
 import re
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
 from langchain.schema import Document
 
+# 기본 규칙: (패턴 이름, 치환 문자열)을 순서대로 적용한 뒤 공백 정리
+DEFAULT_RULES = (("ads", ""), ("html", ""), ("urls", ""))
+
+# 스트리밍 클리닝에서 줄바꿈을 못 찾아도 이 길이를 넘으면 공백에서 자름
+_MAX_CARRY = 1024 * 1024
+
+
+@lru_cache(maxsize=32)
+def _compile_passes(rules: Tuple[Tuple[str, str], ...]) -> Tuple[Tuple[re.Pattern, str], ...]:
+    """연속된 규칙 중 치환 문자열이 같은 것은 alternation 하나로 병합하여 컴파일"""
+    groups: List[Tuple[List[str], str]] = []
+    for pattern, replacement in rules:
+        if groups and groups[-1][1] == replacement:
+            groups[-1][0].append(pattern)
+        else:
+            groups.append(([pattern], replacement))
+    return tuple(
+        (re.compile("|".join(f"(?:{pattern})" for pattern in patterns)), replacement)
+        for patterns, replacement in groups
+    )
+
+
+def _clean_in_worker(cleaner: "TextCleaner", texts: List[str]) -> List[str]:
+    """프로세스 풀 워커에서 실행 (모듈 수준 함수여야 pickle 가능)"""
+    return [cleaner.clean_text(text) for text in texts]
+
+
 class TextCleaner:
-    def __init__(self):
+    """규칙 기반 텍스트 클렌징
+
+    규칙은 처음 사용할 때 한 번 컴파일되고(프로세스 공용 캐시), 치환 문자열이 같은
+    연속 규칙은 한 번의 패스로 처리합니다. 병합된 패스에서는 왼쪽에서 먼저 맞는
+    규칙이 적용되므로, 앞 규칙의 삭제로 새로 생기는 매치까지 지우던 순차 적용과는
+    드물게 결과가 다를 수 있습니다. 다중 공백 정리는 정규식 대신 str.split으로 처리합니다.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str]] = DEFAULT_RULES,
+                 collapse_whitespace: bool = True):
         self.patterns = {
             'ads': r'이 기사에는 광고가 포함될 수 있습니다\.',
             'html': r'<[^>]+>',
@@ -11,30 +49,99 @@ class TextCleaner:
             'multiple_spaces': r'\s+',
             'urls': r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
         }
-    
+        self.rules = tuple(rules)
+        self.collapse_whitespace = collapse_whitespace
+
+    @property
+    def passes(self) -> Tuple[Tuple[re.Pattern, str], ...]:
+        return _compile_passes(tuple((self.patterns[name], replacement) for name, replacement in self.rules))
+
+    def _apply(self, text: str) -> str:
+        for pattern, replacement in self.passes:
+            text = pattern.sub(replacement, text)
+        return text
+
     def clean_text(self, text: str) -> str:
-        """텍스트 클렌징"""
-        # 광고 제거
-        text = re.sub(self.patterns['ads'], '', text)
-        
-        # HTML 태그 제거
-        text = re.sub(self.patterns['html'], '', text)
-        
-        # URL 제거
-        text = re.sub(self.patterns['urls'], '', text)
-        
-        # 다중 공백 제거
-        text = re.sub(self.patterns['multiple_spaces'], ' ', text)
-        
+        """텍스트 클렌징 (광고, HTML 태그, URL 제거 후 다중 공백 정리)"""
+        text = self._apply(text)
+        if self.collapse_whitespace:
+            return " ".join(text.split())
         return text.strip()
-    
+
+    def clean_document(self, document: Document) -> Optional[Document]:
+        """클렌징한 새 Document 반환 (원본은 변경하지 않음, 내용이 비면 None)"""
+        cleaned_text = self.clean_text(document.page_content)
+        if not cleaned_text:
+            return None
+        return Document(page_content=cleaned_text, metadata=dict(document.metadata))
+
     def clean_documents(self, documents: List[Document]) -> List[Document]:
-        """문서 리스트 클렌징"""
-        cleaned_docs = []
-        for doc in documents:
-            cleaned_text = self.clean_text(doc.page_content)
-            if cleaned_text:  # 빈 문자열이 아닌 경우만 포함
-                doc.page_content = cleaned_text
-                cleaned_docs.append(doc)
-        
-        return cleaned_docs
+        """문서 리스트 클렌징 (빈 문서 제외, 원본은 변경하지 않음)"""
+        return [cleaned for cleaned in map(self.clean_document, documents) if cleaned is not None]
+
+    def clean_stream(self, blocks: Iterable[str]) -> Iterator[str]:
+        """큰 텍스트를 블록 단위로 클렌징
+
+        줄바꿈에서 끊어 처리하고(열린 '<'가 있으면 그 앞 줄바꿈까지), 나머지는 다음
+        블록에 이어 붙입니다. 반환 조각을 이어 붙이면 clean_text(전체 텍스트)와 같습니다.
+        (collapse_whitespace=True 기준, 한 줄이 _MAX_CARRY보다 길면 공백에서 자름)
+        """
+        carry = ""
+        started = False
+        pending_space = False
+
+        def emit(piece: str):
+            nonlocal started, pending_space
+            cleaned = self._apply(piece)
+            words = " ".join(cleaned.split())
+            if not words:
+                pending_space = pending_space or bool(cleaned)
+                return None
+            separator = " " if started and (pending_space or cleaned[:1].isspace()) else ""
+            started = True
+            pending_space = cleaned[-1:].isspace()
+            return separator + words
+
+        for block in blocks:
+            buffer = carry + block
+            cut = self._safe_cut(buffer)
+            if cut == 0:
+                carry = buffer
+                continue
+            carry = buffer[cut:]
+            piece = emit(buffer[:cut])
+            if piece:
+                yield piece
+
+        if carry:
+            piece = emit(carry)
+            if piece:
+                yield piece
+
+    def _safe_cut(self, buffer: str) -> int:
+        """규칙 매치가 걸치지 않는 자르기 위치 (없으면 0)
+
+        광고 문구와 URL은 줄바꿈을 포함하지 않고, HTML 태그는 닫히지 않은 '<'가 없으면 안전합니다.
+        """
+        cut = buffer.rfind("\n")
+        while cut >= 0:
+            tag_start = buffer.rfind("<", 0, cut)
+            if tag_start <= buffer.rfind(">", 0, cut):
+                return cut + 1
+            cut = buffer.rfind("\n", 0, tag_start)
+
+        if len(buffer) > _MAX_CARRY:
+            space = max(buffer.rfind(" ", 0, len(buffer) - 1), buffer.rfind("\t", 0, len(buffer) - 1))
+            return space + 1 if space >= 0 else len(buffer)
+        return 0
+
+    def clean_texts_parallel(self, texts: List[str], max_workers: Optional[int] = None,
+                             batch_size: int = 16) -> List[str]:
+        """여러 텍스트를 프로세스 풀로 나눠 클렌징 (입력 순서 유지)"""
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        if max_workers == 1 or len(batches) <= 1:
+            return [self.clean_text(text) for text in texts]
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(_clean_in_worker, [self] * len(batches), batches)
+            return [text for batch in results for text in batch]
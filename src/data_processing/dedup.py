@@ -0,0 +1,216 @@
+"""
+근접 중복 청크 제거
+CREATED [2026-10-18]: 청킹과 임베딩 사이에서 MinHash/LSH로 거의 같은 청크를 걸러냄
+
+동작:
+- 정규화한 텍스트의 문자 n-gram(shingle)으로 MinHash 서명 계산 (한국어는 띄어쓰기가 달라도 잡히도록 문자 단위)
+- 서명을 밴드로 나눈 LSH 키로 후보를 찾고, 서명 일치 비율(추정 Jaccard)이 임계값 이상이면 중복
+- 서명은 MongoDB ChunkSignatures 컬렉션에 저장되어 업로드/실행이 달라도 중복을 찾음
+- 중복 청크는 임베딩/저장하지 않고 metadata["duplicate_of"]에 원본 청크 id를 기록
+
+서명은 청크가 저장된 뒤(commit) 컬렉션에 기록하므로 임베딩이 실패한 청크가
+이후 업로드를 막지 않습니다. 저장 전 청크는 메모리에서 비교합니다.
+서명에는 folder_id를 함께 저장하고 같은 폴더의 서명만 후보로 봅니다. documents
+컬렉션을 주면 원본 Document가 그 폴더에 남아 있는 후보만 중복으로 인정합니다.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import datetime
+import hashlib
+import threading
+import uuid
+import zlib
+import numpy as np
+from bson import Binary, ObjectId
+from langchain.schema import Document
+from config.settings import settings
+from src.embedding.embedding_cache import normalize_text
+
+# 2^32보다 큰 소수 (a*x + b가 uint64 범위를 넘지 않음)
+_PRIME = np.uint64(4294967311)
+
+
+class MinHasher:
+    """문자 shingle 기반 MinHash 서명"""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """shingle 해시 (crc32, 프로세스가 달라도 같은 값)"""
+        normalized = normalize_text(text).lower()
+        size = self.shingle_size
+        if len(normalized) <= size:
+            grams = {normalized}
+        else:
+            grams = {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+        return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams),
+                           dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = self.shingles(text)
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0).astype(np.uint32)
+
+
+def similarity(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    """서명 일치 비율 (Jaccard 유사도 추정)"""
+    return float(np.mean(signature_a == signature_b))
+
+
+class ChunkDeduplicator:
+    """ChunkSignatures 컬렉션 기반 근접 중복 필터
+
+    filter()는 한 스레드에서, commit()은 다른 스레드(저장 단계)에서 호출할 수 있습니다.
+    """
+
+    def __init__(self, collection, threshold: float = 0.8, num_perm: int = 128,
+                 bands: int = 16, shingle_size: int = 5,
+                 folder_id: Optional[ObjectId] = None, documents=None):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.collection = collection
+        self.folder_id = folder_id
+        self.documents = documents
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+        self.seen = 0
+        self.duplicates = 0
+        # 아직 컬렉션에 기록하지 않은 서명 (청크 id → 서명, LSH 키 → 청크 id)
+        self._pending: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+        self._pending_keys: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def band_keys(self, signature: np.ndarray) -> List[str]:
+        return [
+            f"{band}:{hashlib.blake2b(signature[band * self.rows:(band + 1) * self.rows].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(self.bands)
+        ]
+
+    def _candidates(self, keys_by_chunk: List[List[str]]) -> Tuple[Dict[str, List[str]], Dict[str, np.ndarray]]:
+        """(LSH 키 → 키가 같은 기존 청크 id, 청크 id → 서명) 메모리 → 컬렉션 순서로 조회"""
+        keys = {key for chunk_keys in keys_by_chunk for key in chunk_keys}
+        index: Dict[str, List[str]] = {}
+        signatures: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                for chunk_id in self._pending_keys.get(key, ()):
+                    index.setdefault(key, []).append(chunk_id)
+                    signatures[chunk_id] = self._pending[chunk_id][0]
+        if not keys:
+            return index, signatures
+
+        stored = {
+            doc["_id"]: doc for doc in self.collection.find(
+                {"bands": {"$in": list(keys)}, "folder_id": self.folder_id}, {"bands": 1, "signature": 1}
+            ) if doc["_id"] not in signatures
+        }
+        if stored and self.documents is not None:
+            # 원본 Document가 삭제된 서명은 후보에서 빼고 정리
+            live = set(self.documents.distinct(
+                "chunk_sequence", {"chunk_sequence": {"$in": list(stored)}, "folder_id": self.folder_id}
+            ))
+            stale = [chunk_id for chunk_id in stored if chunk_id not in live]
+            if stale:
+                self.collection.delete_many({"_id": {"$in": stale}, "folder_id": self.folder_id})
+                for chunk_id in stale:
+                    del stored[chunk_id]
+        for chunk_id, doc in stored.items():
+            signatures[chunk_id] = np.frombuffer(doc["signature"], dtype=np.uint32)
+            for key in doc["bands"]:
+                if key in keys:
+                    index.setdefault(key, []).append(chunk_id)
+        return index, signatures
+
+    def filter(self, chunks: List[Document]) -> Tuple[List[Document], List[Document]]:
+        """(새 청크, 중복 청크) 반환
+
+        모든 청크에 metadata["chunk_id"]를 부여하고, 중복 청크에는 metadata["duplicate_of"]에
+        원본 청크 id를 기록합니다.
+        """
+        signatures = [self.hasher.signature(chunk.page_content) for chunk in chunks]
+        keys_by_chunk = [self.band_keys(signature) for signature in signatures]
+        index, known = self._candidates(keys_by_chunk)
+
+        unique, duplicates = [], []
+        for chunk, signature, keys in zip(chunks, signatures, keys_by_chunk):
+            chunk_id = chunk.metadata.setdefault("chunk_id", uuid.uuid4().hex)
+            best_id, best_score = None, self.threshold
+            for candidate in {candidate for key in keys for candidate in index.get(key, ())}:
+                score = similarity(signature, known[candidate])
+                if score >= best_score:
+                    best_id, best_score = candidate, score
+
+            if best_id is not None:
+                chunk.metadata["duplicate_of"] = best_id
+                duplicates.append(chunk)
+                continue
+
+            with self._lock:
+                self._pending[chunk_id] = (signature, keys)
+                for key in keys:
+                    self._pending_keys.setdefault(key, []).append(chunk_id)
+            # 같은 배치의 뒤쪽 청크와도 비교
+            known[chunk_id] = signature
+            for key in keys:
+                index.setdefault(key, []).append(chunk_id)
+            unique.append(chunk)
+
+        self.seen += len(chunks)
+        self.duplicates += len(duplicates)
+        return unique, duplicates
+
+    def commit(self, chunk_ids: Iterable[str]):
+        """저장이 끝난 청크의 서명을 컬렉션에 기록"""
+        with self._lock:
+            entries = [(chunk_id, self._pending[chunk_id]) for chunk_id in chunk_ids
+                       if chunk_id in self._pending]
+        if not entries:
+            return
+
+        now = datetime.datetime.utcnow()
+        self.collection.insert_many([
+            {"_id": chunk_id, "folder_id": self.folder_id, "bands": keys,
+             "signature": Binary(signature.tobytes()), "created_at": now}
+            for chunk_id, (signature, keys) in entries
+        ], ordered=False)
+
+        with self._lock:
+            for chunk_id, (_, keys) in entries:
+                self._pending.pop(chunk_id, None)
+                for key in keys:
+                    pending = self._pending_keys.get(key)
+                    if pending is not None:
+                        pending.remove(chunk_id)
+                        if not pending:
+                            del self._pending_keys[key]
+
+    def remove(self, chunk_ids: List[str]):
+        """삭제된 청크의 서명 제거 (같은 내용이 다시 들어오면 새로 저장되도록)"""
+        if chunk_ids:
+            self.collection.delete_many({"_id": {"$in": list(chunk_ids)}, "folder_id": self.folder_id})
+
+    def clear(self):
+        """이 범위(folder_id)의 서명 전체 삭제 (인덱스를 새로 구축할 때)"""
+        self.collection.delete_many({"folder_id": self.folder_id})
+        with self._lock:
+            self._pending.clear()
+            self._pending_keys.clear()
+
+
+def deduplicator_from_settings(db, folder_id: Optional[ObjectId] = None) -> Optional[ChunkDeduplicator]:
+    """DEDUP_* 설정에 따른 중복 필터 (비활성화면 None)
+
+    folder_id를 주면 그 폴더 안에서만 중복을 찾고 원본 Document가 남아 있는지 확인합니다
+    (중복 청크를 원본 Document에 연결하는 업로드 경로). 없으면 FAISS 인덱스 단위(CLI)입니다.
+    """
+    if not settings.dedup_enabled:
+        return None
+    return ChunkDeduplicator(db.ChunkSignatures, threshold=settings.dedup_threshold,
+                             num_perm=settings.dedup_num_perm, bands=settings.dedup_bands,
+                             folder_id=folder_id, documents=db.Document if folder_id is not None else None)
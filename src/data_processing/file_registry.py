@@ -0,0 +1,137 @@
+"""
+업로드 파일 레지스트리
+CREATED [2026-10-18]: 같은 내용의 파일을 다시 업로드하면 임베딩/라벨링/QA 없이 기존 결과 재사용
+
+기록 항목 (MongoDB Files 컬렉션, _id = 파일 내용 sha256):
+- 처리 상태 (queued → completed / failed)와 처리한 업로드 작업 id
+- 폴더별로 파일에서 만든 Document _id (다른 폴더로 다시 올리면 Document/Labels/QAPairs 복사)
+- 업로드 작업 결과 (청크 수, 라벨/QA 샘플 등)
+- 처리 중에 다른 폴더로 다시 올린 요청 (pending_folder_ids, 처리가 끝나면 complete에서 연결)
+
+Document가 모두 삭제된 기록은 없는 것으로 보고 다시 처리합니다.
+"""
+
+from typing import Any, Dict, List, Optional
+import datetime
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from src.utils.database_v2 import MongoDBClientV2
+
+
+class FileRegistry:
+    """파일 내용 해시 → 업로드 처리 결과"""
+
+    def __init__(self, db_client: MongoDBClientV2):
+        self.db = db_client
+        self.collection = db_client.db.Files
+
+    def _live_folder(self, entry: Dict[str, Any]) -> Optional[str]:
+        """파일의 Document가 아직 남아 있는 폴더 id (없으면 None)"""
+        document_ids = [doc_id for ids in entry.get("document_ids", {}).values() for doc_id in ids]
+        if not document_ids:
+            return None
+        document = self.db.documents.find_one({"_id": {"$in": document_ids}}, {"folder_id": 1})
+        return str(document["folder_id"]) if document else None
+
+    def _is_reusable(self, entry: Dict[str, Any]) -> bool:
+        if entry["status"] == "failed":
+            return False
+        return entry["status"] != "completed" or self._live_folder(entry) is not None
+
+    def lookup(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """재사용할 수 있는 기록 (처리 중이거나 Document가 남아 있는 완료 기록)"""
+        entry = self.collection.find_one({"_id": content_hash})
+        return entry if entry is not None and self._is_reusable(entry) else None
+
+    def reserve(self, content_hash: str, job_id: str, filename: str, size: int,
+                folder_id: Optional[ObjectId] = None, force: bool = False) -> Optional[Dict[str, Any]]:
+        """새 처리 기록 등록 (재사용할 기존 기록이 있으면 등록하지 않고 그 기록 반환)
+
+        force=True면 기존 기록과 관계없이 새 작업으로 교체합니다.
+        """
+        now = datetime.datetime.utcnow()
+        entry = {
+            "_id": content_hash,
+            "filename": filename,
+            "size": size,
+            "status": "queued",
+            "job_id": job_id,
+            "folder_id": folder_id,
+            "folder_ids": [],
+            "pending_folder_ids": [],
+            "document_ids": {},
+            "result": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        if not force:
+            try:
+                self.collection.insert_one(entry)
+                return None
+            except DuplicateKeyError:
+                existing = self.collection.find_one({"_id": content_hash})
+                if existing is not None and self._is_reusable(existing):
+                    return existing
+        self.collection.replace_one({"_id": content_hash}, entry, upsert=True)
+        return None
+
+    def add_pending_link(self, entry: Dict[str, Any], folder_id: ObjectId) -> bool:
+        """처리 중인 파일을 처리가 끝난 뒤 folder_id에도 연결하도록 기록
+
+        그 사이 처리가 끝나 기록하지 못했으면 False (호출자가 완료된 기록으로 link)
+        """
+        result = self.collection.update_one(
+            {"_id": entry["_id"], "job_id": entry["job_id"], "status": "queued"},
+            {"$addToSet": {"pending_folder_ids": folder_id}}
+        )
+        return result.matched_count > 0
+
+    def complete(self, content_hash: str, job_id: str, folder_id: ObjectId,
+                 document_ids: List[ObjectId], result: Dict[str, Any]):
+        """처리 결과 기록 후 처리 중에 요청된 다른 폴더에도 연결
+
+        그 사이 force 업로드로 교체된 기록은 건드리지 않습니다.
+        """
+        self.collection.update_one(
+            {"_id": content_hash, "job_id": job_id},
+            {"$set": {"status": "completed", "result": result,
+                      f"document_ids.{folder_id}": document_ids,
+                      "updated_at": datetime.datetime.utcnow()},
+             "$addToSet": {"folder_ids": folder_id}}
+        )
+        # 완료로 바뀐 뒤에는 add_pending_link가 기록하지 않으므로 여기서 읽은 목록이 전부
+        entry = self.collection.find_one({"_id": content_hash})
+        if entry is None or entry["job_id"] != job_id:
+            return
+        for pending in entry.get("pending_folder_ids", []):
+            if pending != folder_id:
+                entry = self.link(entry, pending)
+        if entry.get("pending_folder_ids"):
+            self.collection.update_one({"_id": content_hash}, {"$set": {"pending_folder_ids": []}})
+
+    def fail(self, content_hash: str, job_id: str):
+        self.collection.update_one(
+            {"_id": content_hash, "job_id": job_id},
+            {"$set": {"status": "failed", "updated_at": datetime.datetime.utcnow()}}
+        )
+
+    def link(self, entry: Dict[str, Any], folder_id: ObjectId) -> Dict[str, Any]:
+        """완료된 파일을 다른 폴더에 연결 (Document/Labels/QAPairs 복사, LLM/임베딩 호출 없음)"""
+        if str(folder_id) in entry["document_ids"]:
+            return entry
+        source_folder = self._live_folder(entry)
+        if source_folder is None:
+            raise ValueError(f"No documents left for file {entry['_id']}")
+
+        id_map = self.db.copy_documents_to_folder(entry["document_ids"][source_folder], folder_id)
+        document_ids = list(id_map.values())
+        self.collection.update_one(
+            {"_id": entry["_id"]},
+            {"$set": {f"document_ids.{folder_id}": document_ids, "updated_at": datetime.datetime.utcnow()},
+             "$addToSet": {"folder_ids": folder_id}}
+        )
+        return {
+            **entry,
+            "folder_ids": entry["folder_ids"] + [folder_id],
+            "document_ids": {**entry["document_ids"], str(folder_id): document_ids}
+        }
@@ -1,9 +1,85 @@
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
 from langchain_community.document_loaders.pdf import PyPDFLoader as PDFLoader
 from langchain_community.document_loaders.unstructured import UnstructuredFileLoader
-from typing import List
+from collections import deque
+from multiprocessing import connection
+from typing import Iterator, List, Optional, Tuple
 from langchain.schema import Document
+import logging
+import multiprocessing
 import os
+import time
+from config.settings import settings
+from src.data_processing.cleaner import TextCleaner
+
+logger = logging.getLogger(__name__)
+
+# 워커 프로세스가 비정상 종료했을 때 실행 중이던 파일을 다시 시도하는 횟수
+_MAX_FILE_ATTEMPTS = 2
+
+
+def _load_in_worker(loader: "DocumentLoader", file_path: str,
+                    cleaner: Optional[TextCleaner] = None) -> List[Document]:
+    """프로세스 풀 워커에서 실행 (모듈 수준 함수여야 pickle 가능)"""
+    documents = loader.load_file(file_path)
+    if cleaner is not None:
+        documents = cleaner.clean_documents(documents)
+    return documents
+
+
+def _worker_main(loader: "DocumentLoader", cleaner: Optional[TextCleaner], conn):
+    """워커 프로세스 루프: 파일 경로를 받아 (True, 문서) 또는 (False, 오류)를 돌려줌 (None이면 종료)"""
+    while True:
+        try:
+            file_path = conn.recv()
+        except EOFError:
+            return
+        if file_path is None:
+            return
+        try:
+            conn.send((True, _load_in_worker(loader, file_path, cleaner)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {str(e)}"))
+
+
+class _LoaderWorker:
+    """파일을 하나씩 파싱하는 워커 프로세스
+
+    한 번에 한 파일만 맡기므로 submit 시각부터가 곧 그 파일의 실행 시간이며,
+    멈춘 파일은 이 프로세스만 종료하고 다른 워커는 그대로 둡니다.
+    """
+
+    def __init__(self, loader: "DocumentLoader", cleaner: Optional[TextCleaner]):
+        context = multiprocessing.get_context()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(loader, cleaner, child_conn), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task: Optional[Tuple[str, int]] = None  # (파일, 시도 횟수)
+        self.started_at = 0.0
+
+    def submit(self, file_path: str, attempts: int):
+        self.task = (file_path, attempts)
+        self.started_at = time.monotonic()
+        self.conn.send(file_path)
+
+    def release(self) -> Tuple[str, int]:
+        task, self.task = self.task, None
+        return task
+
+    def close(self):
+        """유휴 워커는 정상 종료, 작업 중인 워커는 강제 종료"""
+        if self.task is None and self.process.is_alive():
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
 
 class DocumentLoader:
     def __init__(self):
@@ -12,6 +88,14 @@ class DocumentLoader:
             '.pdf': PDFLoader,
             '.md': UnstructuredFileLoader
         }
+        self.failed_files: List[Tuple[str, str]] = []  # 병렬 로드에서 실패한 (파일, 오류)
+    
+    def iter_files(self, path: str) -> Iterator[str]:
+        """디렉토리에서 지원하는 파일 경로를 하나씩 반환"""
+        for root, dirs, files in os.walk(path):
+            for file in sorted(files):
+                if os.path.splitext(file)[1].lower() in self.loaders:
+                    yield os.path.join(root, file)
     
     def load_directory(self, path: str) -> List[Document]:
         """디렉토리에서 문서 로드"""
@@ -27,6 +111,105 @@ class DocumentLoader:
         
         return documents
     
+    def load_directory_parallel(self, path: str, max_workers: Optional[int] = None,
+                                file_timeout: Optional[float] = None) -> Iterator[Document]:
+        """프로세스 풀로 파일을 나눠 파싱하고 끝나는 대로 문서를 반환 (큰 파일 먼저)
+        
+        파싱 오류, 시간 초과(file_timeout초), 워커 비정상 종료는 해당 파일만
+        실패로 처리하고 나머지는 계속 진행합니다. 실패 목록은 self.failed_files에 남습니다.
+        """
+        return self.load_files_parallel(list(self.iter_files(path)), max_workers, file_timeout)
+    
+    def load_files_parallel(self, file_paths: List[str], max_workers: Optional[int] = None,
+                            file_timeout: Optional[float] = None,
+                            cleaner: Optional[TextCleaner] = None) -> Iterator[Document]:
+        """지정한 파일들을 프로세스 풀로 파싱 (load_directory_parallel 참고)
+        
+        cleaner(TextCleaner)를 주면 워커에서 파싱 직후 클렌징까지 처리합니다.
+        """
+        max_workers = max_workers or settings.loader_workers or os.cpu_count() or 1
+        file_timeout = file_timeout or settings.loader_file_timeout
+        files = sorted(file_paths, key=os.path.getsize, reverse=True)
+        pending = deque((file_path, 0) for file_path in files)
+        self.failed_files = []
+        
+        yield from self._run_workers(pending, max_workers, file_timeout, cleaner)
+    
+    def _fail_file(self, file_path: str, error: str):
+        logger.warning(f"⚠️ 파일 로드 실패 ({file_path}): {error}")
+        self.failed_files.append((file_path, error))
+    
+    def _run_workers(self, pending: deque, max_workers: int,
+                     file_timeout: Optional[float],
+                     cleaner: Optional[TextCleaner] = None) -> Iterator[Document]:
+        """워커 프로세스들로 pending을 처리
+        
+        끝난 결과는 시간 초과 검사보다 먼저 수거하므로, 소비자가 yield에서 멈춰 있던
+        동안 끝난 파일은 시간 초과로 처리되지 않습니다. 시간 초과/비정상 종료는 해당
+        워커만 교체합니다.
+        """
+        workers: List[_LoaderWorker] = []
+        try:
+            while True:
+                for worker in workers:
+                    if worker.task is None and pending:
+                        worker.submit(*pending.popleft())
+                while pending and len(workers) < max_workers:
+                    worker = _LoaderWorker(self, cleaner)
+                    worker.submit(*pending.popleft())
+                    workers.append(worker)
+                
+                busy = [worker for worker in workers if worker.task is not None]
+                if not busy:
+                    break
+                connection.wait([worker.conn for worker in busy] + [worker.process.sentinel for worker in busy],
+                                timeout=0.5)
+                
+                results = []
+                for worker in busy:
+                    status, value = self._poll_worker(worker, file_timeout)
+                    if status == "running":
+                        continue
+                    if status in ("timed_out", "crashed"):
+                        # 멈추거나 죽은 워커는 강제 종료하고 필요할 때 새로 띄움
+                        worker.close()
+                        workers.remove(worker)
+                    file_path, attempts = worker.release()
+                    if status == "done":
+                        results.append(value)
+                    elif status == "failed":
+                        self._fail_file(file_path, value)
+                    elif status == "timed_out":
+                        self._fail_file(file_path, f"timed out after {file_timeout}s")
+                    elif attempts + 1 >= _MAX_FILE_ATTEMPTS:
+                        self._fail_file(file_path, "worker process terminated")
+                    else:
+                        pending.append((file_path, attempts + 1))
+                
+                for documents in results:
+                    yield from documents
+        finally:
+            for worker in workers:
+                worker.close()
+    
+    @staticmethod
+    def _poll_worker(worker: _LoaderWorker, file_timeout: Optional[float]) -> Tuple[str, object]:
+        """워커 상태: running / done(문서) / failed(오류) / timed_out / crashed
+        
+        결과가 와 있으면 시간과 관계없이 done/failed로 처리합니다.
+        """
+        if worker.conn.poll():
+            try:
+                ok, value = worker.conn.recv()
+                return ("done" if ok else "failed"), value
+            except (EOFError, OSError):
+                return "crashed", None
+        if not worker.process.is_alive():
+            return "crashed", None
+        if file_timeout and time.monotonic() - worker.started_at > file_timeout:
+            return "timed_out", None
+        return "running", None
+    
     def load_file(self, file_path: str) -> List[Document]:
         """단일 파일 로드"""
         ext = os.path.splitext(file_path)[1].lower()
@@ -0,0 +1,125 @@
+"""
+파일 매니페스트
+CREATED [2026-10-18]: 디렉토리 증분 동기화용 파일별 처리 기록 (MongoDB FileManifest 컬렉션)
+
+기록 항목:
+- 경로, 크기, mtime, 내용 sha256
+- 파일에서 만든 청크 id (FAISS 메타데이터 chunk_id / Document.chunk_sequence)
+- 라벨/QA용으로 만든 Document _id
+
+크기와 mtime이 같으면 해시를 계산하지 않으므로 변경 없는 코퍼스는
+디렉토리 탐색과 매니페스트 조회 한 번으로 끝납니다.
+"""
+
+from typing import Any, Dict, List
+import datetime
+import hashlib
+import os
+from bson import ObjectId
+from src.data_processing.loader import DocumentLoader
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_hash(file_path: str) -> str:
+    """파일 내용 sha256 (hex)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SyncPlan:
+    """동기화 계획 (경로 → 파일 정보)"""
+
+    def __init__(self):
+        self.new: Dict[str, Dict[str, Any]] = {}
+        self.changed: Dict[str, Dict[str, Any]] = {}
+        self.touched: Dict[str, Dict[str, Any]] = {}  # mtime만 바뀌고 내용은 같음
+        self.removed: Dict[str, Dict[str, Any]] = {}
+        self.unchanged = 0
+
+    @property
+    def to_process(self) -> List[str]:
+        return list(self.new) + list(self.changed)
+
+    @property
+    def stale_entries(self) -> List[Dict[str, Any]]:
+        """산출물을 지워야 하는 기존 기록 (변경/삭제된 파일)"""
+        return [info["entry"] for info in self.changed.values()] + list(self.removed.values())
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "new": len(self.new),
+            "changed": len(self.changed),
+            "touched": len(self.touched),
+            "removed": len(self.removed),
+            "unchanged": self.unchanged
+        }
+
+
+class FileManifest:
+    """root 디렉토리의 파일별 처리 기록"""
+
+    def __init__(self, collection, root: str, loader: DocumentLoader = None):
+        self.collection = collection
+        self.root = os.path.abspath(root)
+        self.loader = loader or DocumentLoader()
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        return {entry["_id"]: entry for entry in self.collection.find({"root": self.root})}
+
+    def plan(self) -> SyncPlan:
+        """현재 디렉토리와 매니페스트를 비교하여 동기화 계획 작성"""
+        plan = SyncPlan()
+        entries = self.entries()
+
+        for file_path in self.loader.iter_files(self.root):
+            stat = os.stat(file_path)
+            info = {"size": stat.st_size, "mtime": stat.st_mtime}
+            entry = entries.pop(file_path, None)
+
+            if entry is None:
+                info["content_hash"] = file_hash(file_path)
+                plan.new[file_path] = info
+            elif entry["size"] == info["size"] and entry["mtime"] == info["mtime"]:
+                plan.unchanged += 1
+            else:
+                info["content_hash"] = file_hash(file_path)
+                info["entry"] = entry
+                if info["content_hash"] == entry["content_hash"]:
+                    plan.touched[file_path] = info
+                else:
+                    plan.changed[file_path] = info
+
+        plan.removed = entries
+        return plan
+
+    def record(self, file_path: str, info: Dict[str, Any], chunk_ids: List[str],
+               document_ids: List[ObjectId]):
+        """처리 완료한 파일 기록 (계획 시점의 크기/mtime/해시 사용)"""
+        self.collection.replace_one(
+            {"_id": file_path},
+            {
+                "root": self.root,
+                "size": info["size"],
+                "mtime": info["mtime"],
+                "content_hash": info["content_hash"],
+                "chunk_ids": chunk_ids,
+                "document_ids": document_ids,
+                "synced_at": datetime.datetime.utcnow()
+            },
+            upsert=True
+        )
+
+    def touch(self, file_path: str, info: Dict[str, Any]):
+        """내용이 같은 파일의 크기/mtime만 갱신"""
+        self.collection.update_one(
+            {"_id": file_path},
+            {"$set": {"size": info["size"], "mtime": info["mtime"]}}
+        )
+
+    def remove(self, file_paths: List[str]):
+        if file_paths:
+            self.collection.delete_many({"_id": {"$in": list(file_paths)}})
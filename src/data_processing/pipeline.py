@@ -0,0 +1,367 @@
+"""
+스트리밍 수집 파이프라인
+CREATED [2026-10-18]: load → clean → chunk → embed → store 단계를 크기 제한 큐로 연결
+
+기능:
+- 단계마다 워커 스레드 수와 배치 크기 지정 (임베딩은 배치, 나머지는 항목 단위)
+- 단계 사이 큐가 가득 차면 앞 단계가 대기 (backpressure) → 메모리가 코퍼스 크기와 무관
+- 파일 파싱, 임베딩 API 호출, DB/인덱스 쓰기가 동시에 진행
+- 단계별 처리량 카운터 (입력/출력 수, 작업 시간, 초당 처리량, 큐 길이)
+- 한 단계에서 예외가 나면 전체를 멈추고 호출한 쪽에서 같은 예외 발생
+- 선택적 dedup 단계 (chunk → dedup → embed, 근접 중복 청크는 임베딩하지 않음)
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import logging
+import queue
+import threading
+import time
+import uuid
+import numpy as np
+from langchain.schema import Document
+from config.settings import settings
+from src.data_processing.chunker import KoreanSentenceChunker, TextChunker, create_chunker
+from src.data_processing.cleaner import TextCleaner
+from src.data_processing.dedup import ChunkDeduplicator
+from src.data_processing.loader import DocumentLoader
+from src.utils.token_counter import remember_token_counts
+
+logger = logging.getLogger(__name__)
+
+# 단계 종료 표시
+_DONE = object()
+
+# 정지 신호를 확인하는 주기 (초)
+_POLL_SECONDS = 0.1
+
+
+class StageStats:
+    """단계별 처리량 카운터 (스레드 안전)"""
+
+    def __init__(self):
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, items_in: int, items_out: int, seconds: float):
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at or time.monotonic()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            return {
+                "items_in": self.items_in,
+                "items_out": self.items_out,
+                "busy_seconds": round(self.busy_seconds, 3),
+                "elapsed_seconds": round(elapsed, 3),
+                "items_per_second": self.items_in / elapsed if elapsed > 0 else 0.0
+            }
+
+
+class Stage:
+    """파이프라인 단계
+
+    batch_size가 1이면 func(item), 1보다 크면 func(items)를 호출하며
+    func는 다음 단계로 보낼 항목들(iterable)을 반환합니다.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Iterable[Any]],
+                 workers: int = 1, batch_size: int = 1, batch_timeout: float = 0.05):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_timeout = batch_timeout
+        self.stats = StageStats()
+
+
+class StreamingPipeline:
+    """단계들을 크기 제한 큐로 연결해 스레드로 실행"""
+
+    def __init__(self, stages: List[Stage], queue_size: int = 64):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+        self._queues: List[queue.Queue] = []
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._error_lock = threading.Lock()
+
+    # ---------- 큐 연산 (정지 신호 확인) ----------
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue, timeout: Optional[float] = None):
+        """항목 하나 (timeout 안에 없으면 queue.Empty, 정지되면 _DONE)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stop.is_set():
+            wait = _POLL_SECONDS if deadline is None else min(_POLL_SECONDS, deadline - time.monotonic())
+            if wait <= 0:
+                raise queue.Empty
+            try:
+                return source.get(timeout=wait)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: BaseException):
+        with self._error_lock:
+            if self._error is None:
+                self._error = error
+        self._stop.set()
+
+    # ---------- 스레드 ----------
+
+    def _feed(self, source: Iterable[Any]):
+        items = iter(source)
+        try:
+            for item in items:
+                if not self._put(self._queues[0], item):
+                    return
+            for _ in range(self.stages[0].workers):
+                self._put(self._queues[0], _DONE)
+        except Exception as e:
+            logger.error(f"❌ 파이프라인 입력 실패: {str(e)}")
+            self._fail(e)
+        finally:
+            # 제너레이터 입력은 중간에 멈춰도 정리 코드(finally)가 실행되도록 닫음
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    def _work(self, index: int, remaining: List[int], remaining_lock: threading.Lock):
+        stage = self.stages[index]
+        inbox, outbox = self._queues[index], self._queues[index + 1]
+        # 마지막 단계의 출력 큐는 소비자(stream) 하나가 읽음
+        downstream_workers = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+
+        try:
+            finished = False
+            while not finished:
+                item = self._get(inbox)
+                if item is _DONE:
+                    break
+
+                batch = [item]
+                while len(batch) < stage.batch_size:
+                    try:
+                        item = self._get(inbox, stage.batch_timeout)
+                    except queue.Empty:
+                        break
+                    if item is _DONE:
+                        finished = True
+                        break
+                    batch.append(item)
+
+                started = time.monotonic()
+                outputs = list(stage.func(batch) if stage.batch_size > 1 else stage.func(batch[0]))
+                stage.stats.record(len(batch), len(outputs), time.monotonic() - started)
+
+                for output in outputs:
+                    if not self._put(outbox, output):
+                        return
+        except Exception as e:
+            logger.error(f"❌ 파이프라인 단계 실패 ({stage.name}): {str(e)}")
+            self._fail(e)
+            return
+
+        # 단계의 마지막 워커가 다음 단계 워커 수만큼 종료 표시 전달
+        with remaining_lock:
+            remaining[index] -= 1
+            last = remaining[index] == 0
+        if last:
+            stage.stats.finished_at = time.monotonic()
+            for _ in range(downstream_workers):
+                self._put(outbox, _DONE)
+
+    def stream(self, source: Iterable[Any]) -> Iterator[Any]:
+        """source를 흘려보내며 마지막 단계의 출력을 순서대로 반환 (완료 순서)"""
+        self._stop.clear()
+        self._error = None
+        self._queues = [
+            queue.Queue(maxsize=max(self.queue_size, stage.workers * stage.batch_size))
+            for stage in self.stages
+        ] + [queue.Queue(maxsize=self.queue_size)]
+
+        remaining = [stage.workers for stage in self.stages]
+        remaining_lock = threading.Lock()
+        threads = [threading.Thread(target=self._feed, args=(source,), name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            stage.stats = StageStats()
+            stage.stats.started_at = time.monotonic()
+            threads.extend(
+                threading.Thread(target=self._work, args=(index, remaining, remaining_lock),
+                                 name=f"pipeline-{stage.name}-{worker}", daemon=True)
+                for worker in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(self._queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # 소비자가 중간에 멈춘 경우에도 스레드 정리
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+        if self._error is not None:
+            raise self._error
+
+    def run(self, source: Iterable[Any]) -> int:
+        """끝까지 실행하고 마지막 단계 출력 수 반환"""
+        return sum(1 for _ in self.stream(source))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """단계별 처리량과 현재 입력 큐 길이"""
+        stats = {}
+        for index, stage in enumerate(self.stages):
+            stats[stage.name] = {
+                **stage.stats.snapshot(),
+                "workers": stage.workers,
+                "queue_depth": self._queues[index].qsize() if self._queues else 0
+            }
+        return stats
+
+
+# ==================== 문서 수집 파이프라인 ====================
+
+def iter_files(path: str, loader: DocumentLoader = None) -> Iterator[str]:
+    """디렉토리에서 로더가 지원하는 파일 경로를 하나씩 반환"""
+    return (loader or DocumentLoader()).iter_files(path)
+
+
+def build_ingest_pipeline(embeddings, store: Callable[[List[Tuple[Document, Any]]], None],
+                          loader: DocumentLoader = None, cleaner: TextCleaner = None,
+                          chunker: Union[TextChunker, KoreanSentenceChunker] = None,
+                          load_workers: int = None, embed_workers: int = None,
+                          embed_batch_size: int = None, store_batch_size: int = None,
+                          queue_size: int = None, load_stage: bool = True, clean_stage: bool = True,
+                          deduplicator: ChunkDeduplicator = None,
+                          on_duplicate: Callable[[Document], None] = None,
+                          on_source: Callable[[Document], Any] = None) -> StreamingPipeline:
+    """파일 경로 → 청크 임베딩 저장 파이프라인
+
+    store는 (청크, 임베딩) 목록을 받아 저장하며 한 스레드에서만 호출됩니다.
+    파이프라인 출력은 저장이 끝난 청크이며 metadata["chunk_id"]에 고정 id가 있습니다. load_stage=False면 입력은
+    이미 로드된 Document입니다 (예: DocumentLoader.load_directory_parallel). clean_stage=False면 입력이
+    이미 클렌징된 것으로 보고 클리닝 단계를 생략합니다 (예: load_files_parallel(cleaner=...)).
+    deduplicator가 있으면 청킹 뒤에 근접 중복 청크를 걸러 on_duplicate로 넘기고 임베딩하지 않습니다.
+    on_source가 있으면 클렌징된 원문마다 한 번 호출하여 받은 id를 청크 metadata["source_id"]에,
+    원문 내 위치를 span_start/span_end에 기록합니다 (청크 본문 대신 위치만 저장하는 모드).
+    """
+    loader = loader or DocumentLoader()
+    cleaner = cleaner or TextCleaner()
+    chunker = chunker or create_chunker()
+
+    def clean(document: Document) -> List[Document]:
+        cleaned = cleaner.clean_document(document)
+        return [cleaned] if cleaned is not None else []
+
+    def embed(chunks: List[Document]) -> List[Tuple[Document, Any]]:
+        texts = [chunk.page_content for chunk in chunks]
+        # 청커가 센 토큰 수는 임베딩 배치 구성에서 다시 세지 않음
+        remember_token_counts(texts, [chunk.metadata.get("token_count") for chunk in chunks],
+                              [chunk.metadata.get("token_model") for chunk in chunks])
+        vectors = embeddings.embed_documents(texts)
+        # float 리스트 대신 float32 배열로 보관하여 큐에 있는 동안의 메모리 절감
+        return [(chunk, np.asarray(vector, dtype=np.float32)) for chunk, vector in zip(chunks, vectors)]
+
+    def dedup(chunks: List[Document]) -> List[Document]:
+        unique, duplicates = deduplicator.filter(chunks)
+        if on_duplicate is not None:
+            for chunk in duplicates:
+                on_duplicate(chunk)
+        return unique
+
+    def save(pairs: List[Tuple[Document, Any]]) -> List[Document]:
+        # FAISS docstore id는 저장 시 행 번호로 바뀌므로 청크마다 고정 id 부여
+        for chunk, _ in pairs:
+            chunk.metadata.setdefault("chunk_id", uuid.uuid4().hex)
+        store(pairs)
+        chunks = [chunk for chunk, _ in pairs]
+        if deduplicator is not None:
+            deduplicator.commit(chunk.metadata["chunk_id"] for chunk in chunks)
+        return chunks
+
+    def chunk(document: Document) -> List[Document]:
+        if on_source is None:
+            return chunker.split_documents([document])
+        return chunker.split_document_spans(document, str(on_source(document)))
+
+    stages = [
+        Stage("chunk", chunk),
+        Stage("embed", embed, workers=embed_workers or settings.pipeline_embed_workers,
+              batch_size=embed_batch_size or settings.pipeline_embed_batch_size),
+        Stage("store", save, batch_size=store_batch_size or settings.pipeline_store_batch_size)
+    ]
+    if deduplicator is not None:
+        # 서명 색인이 일관되도록 워커 하나, 컬렉션 조회를 묶기 위해 임베딩 배치 크기 사용
+        stages.insert(1, Stage("dedup", dedup, batch_size=embed_batch_size or settings.pipeline_embed_batch_size))
+    if clean_stage:
+        stages.insert(0, Stage("clean", clean))
+    if load_stage:
+        stages.insert(0, Stage("load", loader.load_file,
+                               workers=load_workers or settings.pipeline_load_workers))
+    return StreamingPipeline(stages, queue_size=queue_size or settings.pipeline_queue_size)
+
+
+class FaissSink:
+    """파이프라인 저장 단계용 FAISS 버퍼
+
+    add()로 받은 임베딩을 모아 두었다가 publish_every개마다(기본 FAISS_PUBLISH_EVERY,
+    0이면 close 시 한 번) VectorStore.append_embeddings로 새 인덱스 버전을 게시합니다.
+    버퍼가 publish_every개를 넘지 않으므로 큰 디렉토리도 메모리 사용량이 일정합니다.
+    """
+
+    def __init__(self, vector_store, embeddings, path: str, keep_versions: int = 3,
+                 publish_every: Optional[int] = None, replace: bool = False):
+        self.vector_store = vector_store
+        self.embeddings = embeddings
+        self.path = path
+        self.keep_versions = keep_versions
+        self.publish_every = settings.faiss_publish_every if publish_every is None else publish_every
+        self.replace = replace
+        self.version: Optional[str] = None
+        self._pending: List[Tuple[Document, Any]] = []
+
+    def add(self, pairs: List[Tuple[Document, Any]]):
+        self._pending.extend(pairs)
+        if self.publish_every and len(self._pending) >= self.publish_every:
+            self.flush()
+
+    def flush(self) -> Optional[str]:
+        if not self._pending:
+            return self.version
+        documents = [chunk for chunk, _ in self._pending]
+        vectors = [vector for _, vector in self._pending]
+        self.version = self.vector_store.append_embeddings(
+            documents, vectors, self.embeddings, self.path,
+            keep_versions=self.keep_versions, replace=self.replace
+        )
+        # 첫 게시 이후에는 같은 실행에서 만든 인덱스에 추가
+        self.replace = False
+        self._pending = []
+        return self.version
+
+    def close(self) -> Optional[str]:
+        return self.flush()
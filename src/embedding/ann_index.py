@@ -0,0 +1,414 @@
+"""
+폴더 단위 ANN(근사 최근접 이웃) 인덱스
+CREATED [2026-10-18]: MongoVectorStore용 FAISS HNSW/IVF-Flat 백엔드
+
+기능:
+- folder_id별 FAISS 인덱스를 Document.text_embedding으로 구축
+- add_documents/delete_documents 시 증분 반영 (HNSW는 삭제 표시 후 재구축)
+- 인덱스 파일과 updated_at 기준점을 기록한 manifest를 디스크에 저장
+- 로드 시 기준점 이후 변경분만 MongoDB에서 따라잡기
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+import faiss
+import numpy as np
+from bson import ObjectId
+from config.database_config import DatabaseConfig, default_db_config
+from src.utils.embedding_codec import decode_document_embedding
+from src.utils.embedding_projection import embedding_version_filter
+
+logger = logging.getLogger(__name__)
+
+ANN_INDEX_TYPES = ("hnsw", "ivf_flat")
+MANIFEST_VERSION = 1
+
+# 삭제 표시 비율이 이 값을 넘으면 HNSW 인덱스를 재구축
+_TOMBSTONE_REBUILD_RATIO = 0.2
+
+# 문서가 적어 인덱스를 만들지 않은 폴더를 다시 세어 보는 주기 (다른 프로세스의 추가 반영)
+_SMALL_FOLDER_RECHECK_SECONDS = 60.0
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class FolderANNIndex:
+    """단일 폴더의 FAISS ANN 인덱스
+
+    FAISS 라벨은 0부터 증가하는 정수이며 self.ids[label]이 Document _id입니다.
+    제거된 라벨은 self.removed에 남깁니다 (HNSW는 검색 시 걸러내는 삭제 표시).
+    """
+
+    def __init__(self, folder_id: ObjectId, dimension: int, config: DatabaseConfig):
+        self.folder_id = folder_id
+        self.dimension = dimension
+        self.config = config
+        self.index_type = config.ann_index_type
+        self.index = None
+        self.ids: List[ObjectId] = []
+        self.labels: Dict[ObjectId, int] = {}
+        self.removed: set = set()
+        self.high_water_mark: Optional[datetime.datetime] = None
+        self.unsaved_changes = 0
+        self.lock = threading.RLock()
+
+    # ---------- 구축 / 갱신 ----------
+
+    def _create_index(self, training_vectors: np.ndarray):
+        metric = faiss.METRIC_INNER_PRODUCT
+        if self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dimension, self.config.ann_hnsw_m, metric)
+            index.hnsw.efSearch = self.config.ann_ef_search
+            return faiss.IndexIDMap2(index)
+
+        nlist = max(1, min(self.config.ann_ivf_nlist, int(np.sqrt(len(training_vectors)))))
+        quantizer = faiss.IndexFlatIP(self.dimension)
+        index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, metric)
+        index.train(training_vectors)
+        index.nprobe = min(self.config.ann_nprobe, nlist)
+        return index
+
+    def build(self, ids: List[ObjectId], vectors: np.ndarray,
+              high_water_mark: Optional[datetime.datetime] = None):
+        """전체 재구축"""
+        vectors = _normalize_rows(vectors)
+        with self.lock:
+            self.index = self._create_index(vectors)
+            self.ids = []
+            self.labels = {}
+            self.removed = set()
+            self._add_vectors(ids, vectors)
+            self.high_water_mark = high_water_mark
+            self.unsaved_changes += len(ids)
+
+    def _add_vectors(self, ids: List[ObjectId], vectors: np.ndarray):
+        start = len(self.ids)
+        labels = np.arange(start, start + len(ids), dtype=np.int64)
+        for doc_id, label in zip(ids, labels):
+            self.ids.append(doc_id)
+            self.labels[doc_id] = int(label)
+        if len(ids):
+            self.index.add_with_ids(vectors, labels)
+
+    def add(self, ids: List[ObjectId], vectors: np.ndarray,
+            high_water_mark: Optional[datetime.datetime] = None):
+        """문서 추가 (이미 있는 _id는 교체, high_water_mark가 더 최신이면 기준점 이동)"""
+        with self.lock:
+            if ids:
+                self.remove([doc_id for doc_id in ids if doc_id in self.labels])
+                self._add_vectors(list(ids), _normalize_rows(vectors))
+                self.unsaved_changes += len(ids)
+            if high_water_mark is not None and (self.high_water_mark is None
+                                                or high_water_mark > self.high_water_mark):
+                self.high_water_mark = high_water_mark
+
+    def remove(self, ids: Iterable[ObjectId]) -> int:
+        """문서 제거 (IVF는 즉시 제거, HNSW는 삭제 표시)"""
+        with self.lock:
+            labels = [self.labels.pop(doc_id) for doc_id in ids if doc_id in self.labels]
+            if not labels:
+                return 0
+            self.removed.update(labels)
+            if self.index_type != "hnsw":
+                self.index.remove_ids(np.asarray(labels, dtype=np.int64))
+            self.unsaved_changes += len(labels)
+            return len(labels)
+
+    @property
+    def live_count(self) -> int:
+        return len(self.labels)
+
+    def needs_rebuild(self) -> bool:
+        if self.index_type != "hnsw" or self.index is None or self.index.ntotal == 0:
+            return False
+        return len(self.removed) / self.index.ntotal > _TOMBSTONE_REBUILD_RATIO
+
+    def live_vectors(self) -> Tuple[List[ObjectId], np.ndarray]:
+        """삭제되지 않은 벡터 복원 (재구축용)"""
+        with self.lock:
+            ids = list(self.labels.keys())
+            if not ids:
+                return ids, np.empty((0, self.dimension), dtype=np.float32)
+            if self.index_type != "hnsw":
+                self.index.make_direct_map()
+            vectors = np.vstack([self.index.reconstruct(self.labels[doc_id]) for doc_id in ids])
+            return ids, vectors
+
+    # ---------- 검색 ----------
+
+    def search(self, query_vector: np.ndarray, k: int) -> List[Tuple[ObjectId, float]]:
+        """정규화된 쿼리 벡터로 상위 k개 (_id, score) 검색"""
+        with self.lock:
+            if self.index is None or self.live_count == 0:
+                return []
+            tombstones = len(self.removed) if self.index_type == "hnsw" else 0
+            fetch_k = min(k + tombstones, self.index.ntotal)
+            scores, labels = self.index.search(query_vector.reshape(1, -1).astype(np.float32), fetch_k)
+
+            hits = []
+            for score, label in zip(scores[0], labels[0]):
+                if label < 0 or label in self.removed:
+                    continue
+                hits.append((self.ids[label], float(score)))
+                if len(hits) >= k:
+                    break
+            return hits
+
+    # ---------- 저장 / 로드 ----------
+
+    def save(self, directory: str):
+        """인덱스, _id 배열, manifest를 원자적으로 저장"""
+        with self.lock:
+            os.makedirs(directory, exist_ok=True)
+            index_path = os.path.join(directory, "index.faiss")
+            ids_path = os.path.join(directory, "ids.npy")
+            manifest_path = os.path.join(directory, "manifest.json")
+
+            faiss.write_index(self.index, index_path + ".tmp")
+            with open(ids_path + ".tmp", "wb") as f:
+                raw_ids = np.frombuffer(b"".join(doc_id.binary for doc_id in self.ids), dtype=np.uint8)
+                np.save(f, raw_ids.reshape(-1, 12))
+
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "folder_id": str(self.folder_id),
+                "index_type": self.index_type,
+                "dimension": self.dimension,
+                "embedding_version": self.config.embedding_projection_version,
+                "count": self.live_count,
+                "removed_labels": sorted(int(label) for label in self.removed),
+                "updated_at_high_water_mark": (
+                    self.high_water_mark.isoformat() if self.high_water_mark else None
+                ),
+                "saved_at": datetime.datetime.utcnow().isoformat()
+            }
+            with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+            # manifest를 마지막에 교체하여 불완전한 저장본이 읽히지 않도록 함
+            os.replace(index_path + ".tmp", index_path)
+            os.replace(ids_path + ".tmp", ids_path)
+            os.replace(manifest_path + ".tmp", manifest_path)
+            self.unsaved_changes = 0
+
+    @classmethod
+    def load(cls, folder_id: ObjectId, directory: str,
+             config: DatabaseConfig) -> Optional["FolderANNIndex"]:
+        """디스크에서 로드 (없거나 설정과 맞지 않으면 None)"""
+        manifest_path = os.path.join(directory, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if (manifest.get("version") != MANIFEST_VERSION
+                or manifest.get("index_type") != config.ann_index_type
+                or manifest.get("embedding_version") != config.embedding_projection_version):
+            logger.info(f"ANN 인덱스 설정 변경으로 재구축 필요: {folder_id}")
+            return None
+
+        ann_index = cls(folder_id, manifest["dimension"], config)
+        ann_index.index = faiss.read_index(os.path.join(directory, "index.faiss"))
+        if ann_index.index_type == "hnsw":
+            faiss.downcast_index(ann_index.index.index).hnsw.efSearch = config.ann_ef_search
+
+        raw_ids = np.load(os.path.join(directory, "ids.npy"))
+        ann_index.ids = [ObjectId(row.tobytes()) for row in raw_ids]
+        ann_index.removed = set(manifest.get("removed_labels", []))
+        ann_index.labels = {
+            doc_id: label for label, doc_id in enumerate(ann_index.ids)
+            if label not in ann_index.removed
+        }
+
+        high_water_mark = manifest.get("updated_at_high_water_mark")
+        ann_index.high_water_mark = (
+            datetime.datetime.fromisoformat(high_water_mark) if high_water_mark else None
+        )
+        return ann_index
+
+class ANNIndexManager:
+    """폴더별 ANN 인덱스 관리 (구축, 따라잡기, 저장)"""
+
+    def __init__(self, db_client, config: DatabaseConfig = None, index_path: str = None):
+        self.db_client = db_client
+        self.config = config or default_db_config
+        self.index_path = index_path or self.config.ann_index_path
+        self._indexes: Dict[ObjectId, FolderANNIndex] = {}
+        # 인덱스를 만들지 않은 작은 폴더: folder_id → [확인 시점 문서 수(이후 추가분 포함), 확인 시각]
+        self._small_folders: Dict[ObjectId, List[float]] = {}
+        self._lock = threading.Lock()
+
+        if self.config.ann_index_type not in ANN_INDEX_TYPES:
+            raise ValueError(f"Unsupported ANN index type: {self.config.ann_index_type}")
+
+    def _folder_dir(self, folder_id: ObjectId) -> str:
+        return os.path.join(self.index_path, str(folder_id))
+
+    def _fetch_embeddings(self, query: Dict[str, Any]):
+        """조건에 맞는 문서의 (_id, 임베딩, updated_at) 조회"""
+        cursor = self.db_client.documents.find(
+            query, {"text_embedding": 1, "embedding_encoding": 1, "updated_at": 1}
+        )
+        ids, vectors, high_water_mark = [], [], None
+        for doc in cursor:
+            vector = decode_document_embedding(doc)
+            if vector is None:
+                continue
+            ids.append(doc["_id"])
+            vectors.append(vector)
+            updated_at = doc.get("updated_at")
+            if updated_at and (high_water_mark is None or updated_at > high_water_mark):
+                high_water_mark = updated_at
+        return ids, vectors, high_water_mark
+
+    def _embedding_query(self, folder_id: ObjectId) -> Dict[str, Any]:
+        return {
+            "folder_id": folder_id,
+            "text_embedding": {"$exists": True, "$ne": []},
+            **embedding_version_filter(self.config.embedding_projection_version)
+        }
+
+    def build(self, folder_id: ObjectId) -> Optional[FolderANNIndex]:
+        """MongoDB에서 폴더 전체를 읽어 인덱스 구축 (문서가 적으면 None)"""
+        ids, vectors, high_water_mark = self._fetch_embeddings(self._embedding_query(folder_id))
+        if len(ids) < self.config.ann_min_documents:
+            return None
+
+        dimension = len(vectors[0])
+        keep = [i for i, vector in enumerate(vectors) if len(vector) == dimension]
+        matrix = np.vstack([vectors[i] for i in keep])
+
+        ann_index = FolderANNIndex(folder_id, dimension, self.config)
+        ann_index.build([ids[i] for i in keep], matrix, high_water_mark)
+        ann_index.save(self._folder_dir(folder_id))
+        logger.info(f"✅ ANN 인덱스 구축 완료: {folder_id} ({ann_index.live_count}개, {self.config.ann_index_type})")
+        return ann_index
+
+    def catch_up(self, ann_index: FolderANNIndex) -> int:
+        """manifest 기준점 이후 갱신된 문서 반영"""
+        query = self._embedding_query(ann_index.folder_id)
+        if ann_index.high_water_mark is not None:
+            query["updated_at"] = {"$gt": ann_index.high_water_mark}
+
+        ids, vectors, high_water_mark = self._fetch_embeddings(query)
+        keep = [i for i, vector in enumerate(vectors) if len(vector) == ann_index.dimension]
+        ann_index.add([ids[i] for i in keep],
+                      np.vstack([vectors[i] for i in keep]) if keep else None, high_water_mark)
+        return len(keep)
+
+    def _is_small(self, folder_id: ObjectId) -> bool:
+        """최근 확인에서 문서가 적었고 그 뒤로도 ann_min_documents에 못 미친 폴더인지"""
+        small = self._small_folders.get(folder_id)
+        if small is None:
+            return False
+        count, checked_at = small
+        if count < self.config.ann_min_documents and time.monotonic() - checked_at < _SMALL_FOLDER_RECHECK_SECONDS:
+            return True
+        del self._small_folders[folder_id]
+        return False
+
+    def get(self, folder_id: ObjectId) -> Optional[FolderANNIndex]:
+        """폴더 인덱스 조회 (메모리 → 디스크 + 따라잡기 → 신규 구축)"""
+        with self._lock:
+            if folder_id in self._indexes:
+                return self._indexes[folder_id]
+            if self._is_small(folder_id):
+                return None
+
+            ann_index = FolderANNIndex.load(folder_id, self._folder_dir(folder_id), self.config)
+            if ann_index is not None:
+                caught_up = self.catch_up(ann_index)
+                expected = self.db_client.documents.count_documents(self._embedding_query(folder_id))
+                if ann_index.live_count != expected or ann_index.needs_rebuild():
+                    # 다른 프로세스의 삭제 등으로 어긋난 경우 재구축
+                    ann_index = self.build(folder_id)
+                elif caught_up:
+                    ann_index.save(self._folder_dir(folder_id))
+            else:
+                ann_index = self.build(folder_id)
+
+            if ann_index is None:
+                count = self.db_client.documents.count_documents(self._embedding_query(folder_id))
+                self._small_folders[folder_id] = [count, time.monotonic()]
+            else:
+                self._indexes[folder_id] = ann_index
+            return ann_index
+
+    def add(self, folder_id: ObjectId, ids: List[ObjectId], embeddings: List[List[float]]):
+        """add_documents 증분 반영 (로드된 인덱스만, 작은 폴더는 문서 수만 누적)
+
+        삽입이 끝난 뒤 호출되므로 현재 시각까지를 반영한 것으로 보고 기준점을 옮깁니다.
+        그 사이 다른 프로세스가 쓴 문서는 다음 로드 시 문서 수 비교로 재구축됩니다.
+        """
+        if not ids:
+            return
+        written_at = datetime.datetime.utcnow()
+        with self._lock:
+            small = self._small_folders.get(folder_id)
+            if small is not None:
+                small[0] += len(ids)
+                return
+            ann_index = self._indexes.get(folder_id)
+        if ann_index is None:
+            return
+        vectors = [np.asarray(e, dtype=np.float32) for e in embeddings]
+        keep = [i for i, vector in enumerate(vectors) if len(vector) == ann_index.dimension]
+        ann_index.add([ids[i] for i in keep],
+                      np.vstack([vectors[i] for i in keep]) if keep else None, written_at)
+        self._maybe_save(ann_index)
+
+    def update(self, document_embeddings: Dict[ObjectId, List[float]]):
+        """임베딩이 바뀐 문서를 로드된 인덱스에서 교체"""
+        for ann_index in list(self._indexes.values()):
+            ids = [doc_id for doc_id in document_embeddings
+                   if doc_id in ann_index.labels
+                   and len(document_embeddings[doc_id]) == ann_index.dimension]
+            if ids:
+                ann_index.add(ids, np.vstack([
+                    np.asarray(document_embeddings[doc_id], dtype=np.float32) for doc_id in ids
+                ]))
+                self._maybe_save(ann_index)
+
+    def remove(self, document_ids: List[ObjectId]):
+        """delete_documents 증분 반영"""
+        for ann_index in list(self._indexes.values()):
+            if ann_index.remove(document_ids):
+                if ann_index.needs_rebuild():
+                    ids, vectors = ann_index.live_vectors()
+                    ann_index.build(ids, vectors, ann_index.high_water_mark)
+                self._maybe_save(ann_index)
+
+    def _maybe_save(self, ann_index: FolderANNIndex):
+        if ann_index.unsaved_changes >= self.config.ann_autosave_every:
+            ann_index.save(self._folder_dir(ann_index.folder_id))
+
+    def save_all(self):
+        """변경된 인덱스 모두 저장"""
+        for ann_index in list(self._indexes.values()):
+            if ann_index.unsaved_changes:
+                ann_index.save(self._folder_dir(ann_index.folder_id))
+
+    def invalidate(self, folder_id: ObjectId):
+        """메모리의 폴더 인덱스 제거 (다음 조회 시 디스크/MongoDB에서 다시 로드)"""
+        with self._lock:
+            self._indexes.pop(folder_id, None)
+            self._small_folders.pop(folder_id, None)
+
+    def search(self, folder_id: ObjectId, query_vector: np.ndarray,
+               k: int) -> Optional[List[Tuple[ObjectId, float]]]:
+        """ANN 검색 (인덱스를 쓸 수 없으면 None → 호출자가 정확 검색 사용)"""
+        ann_index = self.get(folder_id)
+        if ann_index is None or ann_index.dimension != query_vector.shape[0]:
+            return None
+        return ann_index.search(query_vector, k)
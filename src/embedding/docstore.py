@@ -0,0 +1,270 @@
+"""
+컬럼형 FAISS 문서 저장소
+CREATED [2026-10-18]: 피클(index.pkl) 대신 오프셋 + 메모리 매핑 텍스트 파일로 docstore 저장
+
+디렉토리 구조:
+    index.faiss                 FAISS 인덱스
+    docstore.json               매니페스트 (문서 수, 거리 방식, 정규화 여부)
+    docstore.offsets.npy        텍스트 시작 위치 (int64, N+1개)
+    docstore.text.bin           UTF-8 텍스트를 이어 붙인 파일 (mmap)
+    docstore.meta.offsets.npy   메타데이터 시작 위치 (int64, N+1개)
+    docstore.meta.bin           문서별 메타데이터 (compact JSON, mmap)
+
+로드 시에는 파일을 매핑만 하고, 검색 결과로 선택된 행의 텍스트만 Document로 만듭니다.
+행 i의 docstore id는 str(i)이며 로드 이후 추가된 문서만 메모리에 보관합니다.
+"""
+
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Union
+import json
+import logging
+import mmap
+import os
+import numpy as np
+from langchain.schema import Document
+from langchain_community.docstore.base import AddableMixin, Docstore
+
+logger = logging.getLogger(__name__)
+
+DOCSTORE_FORMAT = "columnar-v1"
+MANIFEST_FILE = "docstore.json"
+TEXT_OFFSETS_FILE = "docstore.offsets.npy"
+TEXT_FILE = "docstore.text.bin"
+META_OFFSETS_FILE = "docstore.meta.offsets.npy"
+META_FILE = "docstore.meta.bin"
+LEGACY_PICKLE_FILE = "index.pkl"
+
+
+def _open_blob(path: str):
+    """읽기 전용 mmap (빈 파일은 mmap할 수 없으므로 b"")"""
+    if os.path.getsize(path) == 0:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class MmapDocstore(Docstore, AddableMixin):
+    """메모리 매핑 파일 기반 docstore (저장된 행 + 메모리 추가분)"""
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self._count = 0
+        self._text_offsets = None
+        self._text = b""
+        self._meta_offsets = None
+        self._meta = b""
+        self._added: Dict[str, Document] = {}
+        self._deleted = set()
+
+        if directory is not None:
+            with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+                self._count = int(json.load(f)["count"])
+            self._text_offsets = np.load(os.path.join(directory, TEXT_OFFSETS_FILE), mmap_mode="r")
+            self._meta_offsets = np.load(os.path.join(directory, META_OFFSETS_FILE), mmap_mode="r")
+            self._text = _open_blob(os.path.join(directory, TEXT_FILE))
+            self._meta = _open_blob(os.path.join(directory, META_FILE))
+
+    @property
+    def stored_count(self) -> int:
+        """파일에 저장된 행 수"""
+        return self._count
+
+    def __len__(self) -> int:
+        return self._count - len(self._deleted) + len(self._added)
+
+    def _row(self, doc_id: str) -> Optional[int]:
+        if doc_id in self._deleted or not doc_id.isdigit():
+            return None
+        row = int(doc_id)
+        return row if row < self._count else None
+
+    def _read_row(self, row: int) -> Document:
+        start, end = int(self._text_offsets[row]), int(self._text_offsets[row + 1])
+        text = bytes(self._text[start:end]).decode("utf-8")
+        start, end = int(self._meta_offsets[row]), int(self._meta_offsets[row + 1])
+        metadata = json.loads(bytes(self._meta[start:end])) if end > start else {}
+        return Document(page_content=text, metadata=metadata)
+
+    def metadata(self, doc_id: str) -> Dict[str, Any]:
+        """id로 메타데이터만 조회 (본문은 디코딩하지 않음, 없으면 빈 dict)"""
+        if doc_id in self._added:
+            return self._added[doc_id].metadata
+        row = self._row(doc_id)
+        if row is None:
+            return {}
+        start, end = int(self._meta_offsets[row]), int(self._meta_offsets[row + 1])
+        return json.loads(bytes(self._meta[start:end])) if end > start else {}
+
+    def search(self, search: str) -> Union[str, Document]:
+        """id로 문서 조회 (저장된 행은 이때 처음 디코딩)"""
+        if search in self._added:
+            return self._added[search]
+        row = self._row(search)
+        if row is None:
+            return f"ID {search} not found."
+        return self._read_row(row)
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        overlapping = [doc_id for doc_id in texts
+                       if doc_id in self._added or self._row(doc_id) is not None]
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {set(overlapping)}")
+        self._added.update(texts)
+
+    def delete(self, ids: List) -> None:
+        existing = [doc_id for doc_id in ids
+                    if doc_id in self._added or self._row(doc_id) is not None]
+        if not existing:
+            raise ValueError(f"Tried to delete ids that does not  exist: {ids}")
+        for doc_id in existing:
+            if self._added.pop(doc_id, None) is None:
+                self._deleted.add(doc_id)
+
+
+class RowIdMapping(MutableMapping):
+    """FAISS 행 번호 → docstore id 매핑
+
+    저장된 행(0..N-1)은 str(행 번호)로 계산하고 이후 추가된 행만 dict에 보관하므로
+    로드 시 N개짜리 dict를 만들지 않습니다.
+    """
+
+    def __init__(self, stored_count: int = 0):
+        self._stored_count = stored_count
+        self._extra: Dict[int, str] = {}
+
+    def __getitem__(self, key: int) -> str:
+        if isinstance(key, (int, np.integer)) and 0 <= key < self._stored_count:
+            return str(int(key))
+        return self._extra[key]
+
+    def __setitem__(self, key: int, value: str):
+        if 0 <= key < self._stored_count:
+            if value == str(int(key)):
+                return
+            raise KeyError(f"Stored row {key} cannot be remapped")
+        self._extra[int(key)] = value
+
+    def __delitem__(self, key: int):
+        if 0 <= key < self._stored_count:
+            raise KeyError(f"Stored row {key} cannot be removed")
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[int]:
+        yield from range(self._stored_count)
+        yield from self._extra
+
+    def __len__(self) -> int:
+        return self._stored_count + len(self._extra)
+
+    def __contains__(self, key: Any) -> bool:
+        if isinstance(key, (int, np.integer)) and 0 <= key < self._stored_count:
+            return True
+        return key in self._extra
+
+
+def has_columnar_docstore(directory: str) -> bool:
+    return os.path.exists(os.path.join(directory, MANIFEST_FILE))
+
+
+def write_docstore(store, directory: str):
+    """FAISS 스토어의 docstore를 행 순서대로 컬럼형 파일에 저장
+
+    행 i의 문서가 docstore id str(i)가 되므로 다시 로드하면 id가 행 번호로 바뀝니다.
+    """
+    count = store.index.ntotal
+    text_offsets = np.zeros(count + 1, dtype=np.int64)
+    meta_offsets = np.zeros(count + 1, dtype=np.int64)
+
+    # 같은 디렉토리에 다시 저장해도 매핑 중인 기존 파일을 덮어쓰지 않도록 임시 파일 후 교체
+    def tmp(name):
+        return os.path.join(directory, f"{name}.tmp")
+
+    with open(tmp(TEXT_FILE), "wb") as text_file, open(tmp(META_FILE), "wb") as meta_file:
+        for row in range(count):
+            doc = store.docstore.search(store.index_to_docstore_id[row])
+            if not isinstance(doc, Document):
+                raise ValueError(f"Could not find document for row {row}: {doc}")
+
+            text = doc.page_content.encode("utf-8")
+            meta = json.dumps(doc.metadata, ensure_ascii=False, separators=(",", ":"),
+                              default=str).encode("utf-8") if doc.metadata else b""
+            text_file.write(text)
+            meta_file.write(meta)
+            text_offsets[row + 1] = text_offsets[row] + len(text)
+            meta_offsets[row + 1] = meta_offsets[row] + len(meta)
+
+    for name, offsets in ((TEXT_OFFSETS_FILE, text_offsets), (META_OFFSETS_FILE, meta_offsets)):
+        with open(tmp(name), "wb") as f:
+            np.save(f, offsets)
+    for name in (TEXT_FILE, META_FILE, TEXT_OFFSETS_FILE, META_OFFSETS_FILE):
+        os.replace(tmp(name), os.path.join(directory, name))
+
+    # 매니페스트를 마지막에 써서 완전히 저장된 디렉토리만 컬럼형으로 인식
+    manifest = {
+        "format": DOCSTORE_FORMAT,
+        "count": count,
+        "distance_strategy": getattr(store.distance_strategy, "value", str(store.distance_strategy)),
+        "normalize_L2": bool(getattr(store, "_normalize_L2", False)),
+    }
+    with open(tmp(MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp(MANIFEST_FILE), os.path.join(directory, MANIFEST_FILE))
+
+
+def save_faiss_store(store, directory: str):
+    """FAISS 인덱스 + 컬럼형 docstore 저장 (index.pkl 없음)"""
+    import faiss
+
+    os.makedirs(directory, exist_ok=True)
+    faiss.write_index(store.index, os.path.join(directory, "index.faiss"))
+    write_docstore(store, directory)
+
+    legacy_path = os.path.join(directory, LEGACY_PICKLE_FILE)
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+
+def load_faiss_store(directory: str, embeddings, allow_pickle: bool = False):
+    """컬럼형 FAISS 스토어 로드
+
+    컬럼형 docstore가 없고 allow_pickle=True일 때만 기존 index.pkl을 읽습니다.
+    """
+    import faiss
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.vectorstores.utils import DistanceStrategy
+
+    if not has_columnar_docstore(directory):
+        if not os.path.exists(os.path.join(directory, LEGACY_PICKLE_FILE)):
+            raise FileNotFoundError(f"No FAISS docstore found in {directory}")
+        if not allow_pickle:
+            raise ValueError(
+                f"{directory} only has a pickled docstore (index.pkl). "
+                "Convert it with scripts/convert_faiss_docstore.py "
+                "or set FAISS_ALLOW_PICKLE=true for a trusted index."
+            )
+        logger.warning(f"⚠️ 피클 docstore 로드: {directory}")
+        return FAISS.load_local(directory, embeddings)
+
+    with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != DOCSTORE_FORMAT:
+        raise ValueError(f"Unsupported docstore format: {manifest.get('format')}")
+
+    index = faiss.read_index(os.path.join(directory, "index.faiss"))
+    docstore = MmapDocstore(directory)
+    if index.ntotal != docstore.stored_count:
+        raise ValueError(
+            f"Index/docstore size mismatch in {directory}: "
+            f"{index.ntotal} vectors, {docstore.stored_count} documents"
+        )
+
+    return FAISS(
+        embeddings,
+        index,
+        docstore,
+        RowIdMapping(docstore.stored_count),
+        normalize_L2=manifest.get("normalize_L2", False),
+        distance_strategy=DistanceStrategy(
+            manifest.get("distance_strategy", DistanceStrategy.EUCLIDEAN_DISTANCE.value)
+        ),
+    )
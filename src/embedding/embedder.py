@@ -2,14 +2,68 @@ from langchain_openai import OpenAIEmbeddings
 from typing import List
 from langchain.schema import Document
 from config.settings import settings
+from src.embedding.embedding_cache import CachedEmbeddings, open_embedding_cache
+from src.embedding.local_embeddings import HashingNgramEmbeddings
+from src.embedding.query_cache import MongoQueryCacheBackend, QueryCachedEmbeddings, shared_query_cache
+from src.embedding.scheduler import EmbeddingScheduler, ScheduledEmbeddings
 import numpy as np
 
+# 네트워크 없이 동작하는 로컬 백엔드 (settings.embedding_model로 선택)
+LOCAL_EMBEDDING_MODELS = {
+    "local-hash-ngram": lambda: HashingNgramEmbeddings(dimension=settings.local_embedding_dimension)
+}
+
 class Embedder:
     def __init__(self):
+        self.scheduler = None
+        self.cache = None
+        self.query_cache = None
+        self.is_local = settings.embedding_model in LOCAL_EMBEDDING_MODELS
+        
+        if self.is_local:
+            # 로컬 백엔드는 계산이 캐시 조회보다 빠르므로 스케줄러/캐시 없이 사용
+            self.embeddings = LOCAL_EMBEDDING_MODELS[settings.embedding_model]()
+            return
+        
         self.embeddings = OpenAIEmbeddings(
             openai_api_key=settings.openai_api_key,
             model=settings.embedding_model
         )
+        
+        # 문서 임베딩은 토큰 기준 배치를 동시에 요청 (RPM/TPM 제한 준수)
+        if settings.embedding_scheduler_enabled:
+            self.scheduler = EmbeddingScheduler(
+                api_key=settings.openai_api_key,
+                model=settings.embedding_model,
+                base_url=settings.embedding_api_base,
+                max_concurrency=settings.embedding_max_concurrency,
+                requests_per_minute=settings.embedding_rpm,
+                tokens_per_minute=settings.embedding_tpm,
+                max_batch_tokens=settings.embedding_batch_tokens
+            )
+            self.embeddings = ScheduledEmbeddings(self.scheduler, self.embeddings)
+        
+        # 같은 텍스트는 디스크 캐시에서 재사용 (캐시 미스만 API 호출)
+        if settings.embedding_cache_enabled:
+            self.cache = open_embedding_cache(
+                settings.embedding_cache_path,
+                settings.embedding_cache_max_mb * 1024 * 1024
+            )
+            self.embeddings = CachedEmbeddings(self.embeddings, self.cache, settings.embedding_model)
+        
+        # 반복되는 질문은 쿼리 임베딩 캐시에서 재사용 (FAISS 검색 경로 포함)
+        if settings.query_cache_enabled:
+            backend_factory = None
+            if settings.query_cache_shared:
+                backend_factory = lambda: MongoQueryCacheBackend(
+                    settings.mongodb_uri, settings.query_cache_ttl_seconds
+                )
+            self.query_cache = shared_query_cache(
+                settings.query_cache_max_entries,
+                settings.query_cache_ttl_seconds,
+                backend_factory
+            )
+            self.embeddings = QueryCachedEmbeddings(self.embeddings, self.query_cache, settings.embedding_model)
     
     def embed_documents(self, documents: List[Document]) -> List[List[float]]:
         """문서 리스트를 임베딩 벡터로 변환"""
@@ -20,8 +74,20 @@ class Embedder:
         """쿼리를 임베딩 벡터로 변환"""
         return self.embeddings.embed_query(query)
     
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """여러 쿼리를 쿼리 경로(embed_query)로 변환 (쿼리 캐시/single-flight 적용, 중복 쿼리는 한 번만)"""
+        vectors = {}
+        for query in queries:
+            if query not in vectors:
+                vectors[query] = self.embed_query(query)
+        return [vectors[query] for query in queries]
+    
     def batch_embed_documents(self, documents: List[Document], batch_size: int = 100):
         """배치 처리로 문서 임베딩"""
+        if self.scheduler is not None:
+            # 스케줄러가 토큰 수 기준으로 배치를 나눠 동시에 요청
+            return self.embed_documents(documents)
+        
         all_embeddings = []
         
         for i in range(0, len(documents), batch_size):
@@ -30,3 +96,11 @@ class Embedder:
             all_embeddings.extend(embeddings)
         
         return all_embeddings
+    
+    def cache_stats(self):
+        """임베딩 캐시 적중/미스 통계 (캐시 비활성화 시 None)"""
+        return self.cache.stats() if self.cache is not None else None
+    
+    def query_cache_stats(self):
+        """쿼리 임베딩 캐시 통계 (캐시 비활성화 시 None)"""
+        return self.query_cache.stats() if self.query_cache is not None else None
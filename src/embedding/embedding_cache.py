@@ -0,0 +1,242 @@
+"""
+임베딩 캐시
+CREATED [2026-10-18]: 같은 텍스트를 다시 임베딩하지 않도록 디스크(SQLite)에 저장
+
+기능:
+- (embedding_model, sha256(정규화 텍스트)) 키로 float32 벡터 저장
+- 용량 상한 초과 시 마지막 사용 시각 기준(LRU)으로 축출
+- CachedEmbeddings: 배치에서 캐시 미스만 임베딩 API로 전송
+- 적중/미스 카운터 제공
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# 용량 상한 초과 시 이 비율까지 줄여서 축출이 매번 일어나지 않도록 함
+_EVICT_TARGET_RATIO = 0.9
+
+# SQLite 변수 개수 제한을 넘지 않도록 조회를 나누는 단위
+_LOOKUP_CHUNK = 500
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 텍스트 정규화 (유니코드 NFC + 공백 정리)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """SQLite 기반 임베딩 캐시 (스레드 안전, 여러 프로세스가 같은 파일 공유 가능)
+
+    DB 파일은 첫 조회/저장 시에 생성합니다.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model TEXT NOT NULL,"
+                " text_hash BLOB NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (model, text_hash)"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, model: str, hashes: Sequence[bytes]) -> Dict[bytes, List[float]]:
+        """캐시 조회 (적중한 항목은 마지막 사용 시각 갱신)"""
+        found: Dict[bytes, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                chunk = unique[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+                for key, vector in rows:
+                    found[bytes(key)] = np.frombuffer(vector, dtype=np.float32).tolist()
+
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, key) for key in found]
+                )
+                conn.commit()
+
+            hit_count = sum(1 for key in hashes if key in found)
+            self.hits += hit_count
+            self.misses += len(hashes) - hit_count
+        return found
+
+    def put_many(self, model: str, entries: Dict[bytes, List[float]]):
+        """캐시 저장 후 용량 상한을 넘으면 오래된 항목 축출"""
+        if not entries:
+            return
+        now = time.time()
+        rows = [
+            (model, key, np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in entries.items()
+        ]
+        with self._lock:
+            conn = self._connect()
+            total = self._current_bytes(conn)
+            for _, key, blob, _ in rows:
+                previous = conn.execute(
+                    "SELECT length(vector) FROM embeddings WHERE model = ? AND text_hash = ?",
+                    (model, key)
+                ).fetchone()
+                total += len(blob) + len(key) - (previous[0] + len(key) if previous else 0)
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)", rows
+            )
+            conn.commit()
+            self._total_bytes = total
+            if total > self.max_bytes:
+                self._evict(conn)
+
+    def _current_bytes(self, conn: sqlite3.Connection) -> int:
+        if self._total_bytes is None:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(length(vector) + length(text_hash)), 0) FROM embeddings"
+            ).fetchone()
+            self._total_bytes = int(row[0])
+        return self._total_bytes
+
+    def _evict(self, conn: sqlite3.Connection):
+        """마지막 사용 시각이 오래된 항목부터 목표 용량까지 삭제 (self._lock 보유 상태에서 호출)"""
+        target = int(self.max_bytes * _EVICT_TARGET_RATIO)
+        total = self._current_bytes(conn)
+        cursor = conn.execute(
+            "SELECT model, text_hash, length(vector) + length(text_hash) FROM embeddings "
+            "ORDER BY last_used"
+        )
+        victims = []
+        for model, key, size in cursor:
+            if total <= target:
+                break
+            victims.append((model, key))
+            total -= size
+        cursor.close()
+
+        conn.executemany("DELETE FROM embeddings WHERE model = ? AND text_hash = ?", victims)
+        conn.commit()
+        self._total_bytes = total
+        self.evictions += len(victims)
+        logger.debug(f"임베딩 캐시 축출: {len(victims)}개")
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        with self._lock:
+            conn = self._connect()
+            entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "path": self.path,
+                "entries": entries,
+                "total_bytes": self._current_bytes(conn),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class CachedEmbeddings(Embeddings):
+    """임베딩 캐시를 거치는 Embeddings 래퍼
+
+    embed_documents는 캐시 미스(배치 내 중복 제거)만 원래 임베딩으로 보내고,
+    embed_query는 그대로 전달합니다.
+    """
+
+    def __init__(self, underlying: Embeddings, cache: EmbeddingCache, model: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        hashes = [text_hash(text) for text in texts]
+        found = self.cache.get_many(self.model, hashes)
+
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(hashes, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = self.underlying.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, computed)
+            found.update(computed)
+
+        return [list(found[key]) for key in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.underlying.embed_query(text)
+
+    def __getattr__(self, name):
+        # model, chunk_size 등 원래 임베딩 객체의 속성 위임
+        if name == "underlying":
+            raise AttributeError(name)
+        return getattr(self.underlying, name)
+
+
+_shared_caches: Dict[str, EmbeddingCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def open_embedding_cache(path: str, max_bytes: int) -> EmbeddingCache:
+    """경로별 프로세스 공용 임베딩 캐시"""
+    key = os.path.abspath(path)
+    with _shared_caches_lock:
+        if key not in _shared_caches:
+            _shared_caches[key] = EmbeddingCache(path, max_bytes)
+        return _shared_caches[key]
@@ -0,0 +1,124 @@
+"""
+버전 관리되는 벡터 인덱스 디렉토리
+CREATED [2026-10-18]: FAISS 인덱스 추가 저장(append) 및 포인터 교체
+
+디렉토리 구조:
+    <root>/versions/<version>/   인덱스 파일 (버전별 불변)
+    <root>/CURRENT               현재 버전 이름
+    <root>/index.faiss           (기존 단일 디렉토리 형식, CURRENT가 없을 때만 사용)
+
+새 버전은 임시 디렉토리에 저장한 뒤 rename하고, CURRENT 파일을
+os.replace로 교체하므로 읽는 쪽은 항상 완전한 버전만 보게 됩니다.
+"""
+
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+import datetime
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+class VersionedIndexStore:
+    """버전 디렉토리와 CURRENT 포인터 관리"""
+
+    def __init__(self, root: str, keep_versions: int = 3):
+        self.root = root
+        self.keep_versions = max(keep_versions, 1)
+        self.versions_dir = os.path.join(root, VERSIONS_DIR)
+        self.pointer_path = os.path.join(root, CURRENT_FILE)
+
+    def current_version(self) -> Optional[str]:
+        """현재 버전 이름 (없으면 None)"""
+        try:
+            with open(self.pointer_path, encoding="utf-8") as f:
+                version = f.read().strip()
+            return version or None
+        except FileNotFoundError:
+            return None
+
+    def version_path(self, version: str) -> str:
+        return os.path.join(self.versions_dir, version)
+
+    def current_path(self) -> Optional[str]:
+        """현재 버전의 인덱스 디렉토리 (기존 단일 디렉토리 형식 포함)"""
+        version = self.current_version()
+        if version is not None:
+            return self.version_path(version)
+        if os.path.exists(os.path.join(self.root, "index.faiss")):
+            return self.root
+        return None
+
+    def list_versions(self) -> List[str]:
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.versions_dir)
+            if not name.endswith(".tmp") and os.path.isdir(self.version_path(name))
+        )
+
+    def publish(self, writer: Callable[[str], None]) -> str:
+        """writer(path)로 새 버전을 저장하고 CURRENT를 원자적으로 교체"""
+        os.makedirs(self.versions_dir, exist_ok=True)
+        version = datetime.datetime.utcnow().strftime("v%Y%m%d%H%M%S%f")
+        tmp_path = self.version_path(f"{version}-{uuid.uuid4().hex[:8]}.tmp")
+
+        try:
+            writer(tmp_path)
+            os.replace(tmp_path, self.version_path(version))
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        pointer_tmp = f"{self.pointer_path}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(pointer_tmp, "w", encoding="utf-8") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(pointer_tmp, self.pointer_path)
+
+        logger.info(f"✅ 인덱스 버전 교체: {version}")
+        self.prune()
+        return version
+
+    def prune(self):
+        """오래된 버전 정리 (현재 버전과 최근 keep_versions개 유지)"""
+        current = self.current_version()
+        versions = self.list_versions()
+        for version in versions[:-self.keep_versions]:
+            if version != current:
+                shutil.rmtree(self.version_path(version), ignore_errors=True)
+
+    @contextmanager
+    def lock(self):
+        """쓰기 잠금 (프로세스 내 스레드 + 파일 잠금)"""
+        os.makedirs(self.root, exist_ok=True)
+        key = os.path.abspath(self.root)
+        with _thread_locks_guard:
+            thread_lock = _thread_locks.setdefault(key, threading.Lock())
+
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.root, ".lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
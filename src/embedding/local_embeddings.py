@@ -0,0 +1,66 @@
+"""
+로컬 임베딩 백엔드
+CREATED [2026-10-18]: 네트워크 없이 쓰는 결정적 CPU 임베딩 (테스트/부하 테스트용)
+
+HashingNgramEmbeddings:
+- 문자 n-gram(기본 1~3)을 해싱 트릭으로 고정 차원에 누적 (부호 해싱)
+- 한국어는 음절 단위 n-gram이 형태소 분석 없이도 어휘 겹침을 잘 반영
+- n-gram 해시는 numpy로 벡터화하여 계산 (프로세스와 무관하게 항상 같은 결과)
+- 빈도는 log1p로 완화하고 L2 정규화
+"""
+
+from typing import List, Tuple
+import unicodedata
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_PRIME = np.uint64(1099511628211)  # FNV-1a 64bit prime
+_MIX = np.uint64(0xBF58476D1CE4E5B9)  # splitmix64 상수
+
+
+class HashingNgramEmbeddings(Embeddings):
+    """해싱 문자 n-gram 임베딩"""
+
+    def __init__(self, dimension: int = 1536, ngram_range: Tuple[int, int] = (1, 3)):
+        if dimension <= 0:
+            raise ValueError("dimension must be positive")
+        self.dimension = dimension
+        self.ngram_range = ngram_range
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        text = unicodedata.normalize("NFKC", text).lower()
+        # 앞뒤 공백으로 단어 경계 n-gram 포함
+        return f" {' '.join(text.split())} "
+
+    def _vectorize(self, text: str) -> np.ndarray:
+        codes = np.frombuffer(self._normalize(text).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        vector = np.zeros(self.dimension, dtype=np.float64)
+
+        with np.errstate(over="ignore"):
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                count = len(codes) - n + 1
+                if count <= 0:
+                    break
+                hashes = np.full(count, n, dtype=np.uint64)
+                for offset in range(n):
+                    hashes = hashes * _PRIME + codes[offset:offset + count]
+                hashes ^= hashes >> np.uint64(31)
+                hashes *= _MIX
+                hashes ^= hashes >> np.uint64(29)
+
+                indices = (hashes % np.uint64(self.dimension)).astype(np.int64)
+                signs = np.where(hashes >> np.uint64(63), -1.0, 1.0)
+                vector += np.bincount(indices, weights=signs, minlength=self.dimension)
+
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._vectorize(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._vectorize(text).tolist()
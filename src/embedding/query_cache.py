@@ -0,0 +1,233 @@
+"""
+쿼리 임베딩 캐시
+CREATED [2026-10-18]: 반복되는 질문의 embed_query 호출 줄이기
+
+기능:
+- (embedding_model, 정규화한 쿼리) 키의 프로세스 내 LRU + TTL 캐시
+- 동일 쿼리가 동시에 들어오면 임베딩 API 호출 한 번을 공유 (single-flight)
+- 선택적 공유 백엔드(MongoDB 컬렉션)로 여러 API 워커가 적중 결과 공유
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import datetime
+import hashlib
+import logging
+import threading
+import time
+from langchain_core.embeddings import Embeddings
+from src.embedding.embedding_cache import normalize_text
+from src.utils.embedding_codec import decode_embedding, encode_embedding
+
+logger = logging.getLogger(__name__)
+
+
+def query_key(model: str, query: str) -> str:
+    """캐시 키 (모델 + 정규화 쿼리의 sha256)"""
+    digest = hashlib.sha256(normalize_text(query).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
+
+
+class MongoQueryCacheBackend:
+    """MongoDB 컬렉션 기반 공유 백엔드 (TTL 인덱스로 만료)
+
+    백엔드 오류는 캐시 미스로 처리하고, 오류 후 retry_after초 동안은 사용하지 않습니다.
+    """
+
+    def __init__(self, uri: str, ttl_seconds: float, collection_name: str = "QueryEmbeddingCache",
+                 timeout_ms: int = 500, retry_after: float = 30.0):
+        self.uri = uri
+        self.ttl_seconds = ttl_seconds
+        self.collection_name = collection_name
+        self.timeout_ms = timeout_ms
+        self.retry_after = retry_after
+        self._collection = None
+        self._disabled_until = 0.0
+        self._lock = threading.Lock()
+
+    def _get_collection(self):
+        with self._lock:
+            if self._collection is None:
+                from pymongo import MongoClient
+                client = MongoClient(self.uri, serverSelectionTimeoutMS=self.timeout_ms,
+                                     socketTimeoutMS=self.timeout_ms)
+                collection = client.rag_system[self.collection_name]
+                collection.create_index("expires_at", expireAfterSeconds=0)
+                self._collection = collection
+            return self._collection
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def _disable(self, error: Exception):
+        self._disabled_until = time.monotonic() + self.retry_after
+        logger.warning(f"⚠️ 쿼리 캐시 공유 백엔드 사용 중지 ({self.retry_after}초): {str(error)}")
+
+    def get(self, key: str) -> Optional[List[float]]:
+        if not self._available():
+            return None
+        try:
+            doc = self._get_collection().find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.datetime.utcnow()}}
+            )
+        except Exception as e:
+            self._disable(e)
+            return None
+        if doc is None:
+            return None
+        return decode_embedding(doc["embedding"], doc.get("embedding_encoding")).tolist()
+
+    def set(self, key: str, embedding: List[float]):
+        if not self._available():
+            return
+        value, encoding = encode_embedding(embedding, "float32")
+        try:
+            self._get_collection().replace_one(
+                {"_id": key},
+                {
+                    "embedding": value,
+                    "embedding_encoding": encoding,
+                    "expires_at": datetime.datetime.utcnow() + datetime.timedelta(seconds=self.ttl_seconds)
+                },
+                upsert=True
+            )
+        except Exception as e:
+            self._disable(e)
+
+
+class QueryEmbeddingCache:
+    """프로세스 내 LRU + TTL 쿼리 임베딩 캐시 (스레드 안전)"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600,
+                 backend=None, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _get_local(self, key: str) -> Optional[List[float]]:
+        """self._lock 보유 상태에서 호출"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        vector, expires_at = entry
+        if self.clock() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return vector
+
+    def _put_local(self, key: str, vector: List[float]):
+        """self._lock 보유 상태에서 호출"""
+        self._entries[key] = (vector, self.clock() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_or_compute(self, model: str, query: str,
+                       compute: Callable[[str], List[float]]) -> List[float]:
+        """캐시 조회 후 없으면 compute(query) 호출 (동시 요청은 한 번만 호출)"""
+        key = query_key(model, query)
+
+        with self._lock:
+            vector = self._get_local(key)
+            if vector is not None:
+                self.hits += 1
+                return list(vector)
+
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return list(future.result())
+
+        try:
+            vector = self.backend.get(key) if self.backend is not None else None
+            shared_hit = vector is not None
+            if vector is None:
+                vector = compute(query)
+                if self.backend is not None:
+                    self.backend.set(key, vector)
+
+            with self._lock:
+                self._put_local(key, vector)
+                if shared_hit:
+                    self.shared_hits += 1
+                else:
+                    self.misses += 1
+            future.set_result(vector)
+            return list(vector)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        with self._lock:
+            total = self.hits + self.shared_hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "coalesced": self.coalesced,
+                "misses": self.misses,
+                "hit_rate": (total - self.misses) / total if total else 0.0,
+                "shared_backend": type(self.backend).__name__ if self.backend is not None else None
+            }
+
+
+class QueryCachedEmbeddings(Embeddings):
+    """embed_query만 쿼리 캐시를 거치는 Embeddings 래퍼 (embed_documents는 그대로 전달)"""
+
+    def __init__(self, underlying: Embeddings, cache: QueryEmbeddingCache, model: str):
+        self.underlying = underlying
+        self.cache = cache
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.underlying.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.cache.get_or_compute(self.model, text, self.underlying.embed_query)
+
+    def __getattr__(self, name):
+        if name == "underlying":
+            raise AttributeError(name)
+        return getattr(self.underlying, name)
+
+
+_shared_cache: Optional[QueryEmbeddingCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_query_cache(max_entries: int, ttl_seconds: float,
+                       backend_factory: Callable[[], Any] = None) -> QueryEmbeddingCache:
+    """프로세스 공용 쿼리 임베딩 캐시 (첫 호출의 설정으로 생성)"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            backend = backend_factory() if backend_factory is not None else None
+            _shared_cache = QueryEmbeddingCache(max_entries, ttl_seconds, backend)
+        return _shared_cache
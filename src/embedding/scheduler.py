@@ -0,0 +1,220 @@
+"""
+임베딩 요청 스케줄러
+CREATED [2026-10-18]: 여러 배치를 동시에 보내는 비동기 임베딩 클라이언트
+
+기능:
+- 항목 수 대신 토큰 수 기준으로 배치 구성
+- 분당 요청 수(RPM)와 분당 토큰 수(TPM)를 토큰 버킷으로 제한
+- 동시에 진행하는 요청 수 제한
+- 429/5xx 및 연결 오류 시 지터를 준 지수 백오프로 재시도 (Retry-After 우선)
+- 결과는 입력 순서대로 반환
+
+OpenAI 호환 /embeddings 엔드포인트를 사용하므로 base_url만 바꾸면
+로컬 스텁 서버로 테스트할 수 있습니다.
+"""
+
+from typing import Callable, List, Optional, Sequence
+import asyncio
+import concurrent.futures
+import logging
+import random
+import threading
+import time
+import httpx
+from langchain_core.embeddings import Embeddings
+from src.utils.token_counter import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """분당 허용량 기준 토큰 버킷
+
+    예약 방식이라 스레드/이벤트 루프에 상관없이 공유할 수 있습니다. 잔량보다 큰
+    요청은 잔량을 음수로 만들고, 그만큼 채워질 때까지 기다린 뒤 진행합니다.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated_at = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """amount를 예약하고 기다려야 하는 시간(초) 반환"""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self, amount: float = 1.0):
+        delay = self.reserve(amount)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def pack_batches(token_counts: Sequence[int], max_batch_tokens: int,
+                 max_batch_size: int) -> List[List[int]]:
+    """입력 순서를 유지하며 토큰 수/항목 수 상한에 맞춰 인덱스 배치 구성
+
+    상한보다 큰 단일 항목은 혼자 한 배치가 됩니다.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, tokens in enumerate(token_counts):
+        if current and (current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingScheduler:
+    """속도 제한을 지키며 임베딩 배치를 동시에 요청하는 스케줄러"""
+
+    def __init__(self, api_key: str, model: str,
+                 base_url: str = "https://api.openai.com/v1",
+                 max_concurrency: int = 4,
+                 requests_per_minute: int = 3000,
+                 tokens_per_minute: int = 1000000,
+                 max_batch_tokens: int = 20000,
+                 max_batch_size: int = 512,
+                 max_retries: int = 6,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 timeout: float = 60.0,
+                 token_counter: Callable[[str], int] = None):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._token_counter = token_counter
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+
+        self.requests_sent = 0
+        self.retries = 0
+
+    @property
+    def token_counter(self) -> Callable[[str], int]:
+        # tiktoken 인코딩은 첫 사용 시 로드
+        if self._token_counter is None:
+            self._token_counter = get_token_counter(self.model)
+        return self._token_counter
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """texts를 임베딩하여 입력 순서대로 반환"""
+        if not texts:
+            return []
+
+        token_counts = [self.token_counter(text) for text in texts]
+        batches = pack_batches(token_counts, self.max_batch_tokens, self.max_batch_size)
+
+        # 세마포어는 이벤트 루프마다 새로 생성 (속도 제한 버킷은 호출 간 공유)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        async with httpx.AsyncClient(
+            timeout=self.timeout,
+            headers={"Authorization": f"Bearer {self.api_key}"}
+        ) as client:
+            async def run(batch: List[int]):
+                async with semaphore:
+                    await self.request_bucket.acquire(1)
+                    await self.token_bucket.acquire(sum(token_counts[i] for i in batch))
+                    vectors = await self._request(client, [texts[i] for i in batch])
+                for i, vector in zip(batch, vectors):
+                    results[i] = vector
+
+            await asyncio.gather(*(run(batch) for batch in batches))
+
+        logger.info(f"✅ 임베딩 {len(texts)}개 완료 (배치 {len(batches)}개, 재시도 {self.retries}회)")
+        return results
+
+    async def _request(self, client: httpx.AsyncClient, inputs: List[str]) -> List[List[float]]:
+        """배치 하나 요청 (재시도 포함)"""
+        payload = {"model": self.model, "input": inputs}
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                self.requests_sent += 1
+                response = await client.post(f"{self.base_url}/embeddings", json=payload)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    response.raise_for_status()
+                    data = sorted(response.json()["data"], key=lambda item: item["index"])
+                    if len(data) != len(inputs):
+                        raise ValueError(f"Expected {len(inputs)} embeddings, got {len(data)}")
+                    return [item["embedding"] for item in data]
+
+                error = f"HTTP {response.status_code}"
+                retry_after = self._retry_after(response)
+            except (httpx.TransportError, httpx.TimeoutException) as e:
+                error = f"{type(e).__name__}: {str(e)}"
+
+            if attempt == self.max_retries:
+                raise RuntimeError(f"Embedding request failed after {attempt + 1} attempts: {error}")
+
+            self.retries += 1
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            logger.warning(f"⚠️ 임베딩 요청 재시도 {attempt + 1}/{self.max_retries} ({error}), {delay:.2f}초 후")
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt: int) -> float:
+        """지터를 준 지수 백오프"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("retry-after")
+        try:
+            return max(0.0, float(value)) if value is not None else None
+        except ValueError:
+            return None
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """동기 호출용 (실행 중인 이벤트 루프가 있으면 별도 스레드에서 실행)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aembed(texts))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.aembed(texts)).result()
+
+
+class ScheduledEmbeddings(Embeddings):
+    """문서 임베딩은 스케줄러로, 쿼리 임베딩은 기존 임베딩 객체로 처리"""
+
+    def __init__(self, scheduler: EmbeddingScheduler, query_embeddings: Embeddings):
+        self.scheduler = scheduler
+        self.query_embeddings = query_embeddings
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.scheduler.embed(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.scheduler.aembed(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.query_embeddings.embed_query(text)
@@ -1,14 +1,17 @@
 from langchain_community.vectorstores import FAISS, Chroma
 from langchain.schema import Document
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from config.settings import settings
+from src.embedding.docstore import load_faiss_store, save_faiss_store
+from src.embedding.index_versions import VersionedIndexStore
 import os
 
 class VectorStore:
     def __init__(self, store_type: str = None):
         self.store_type = store_type or settings.vector_db_type
         self.vectorstore = None
-        
+        self.version = None  # 로드/저장된 인덱스 버전 (버전 디렉토리 사용 시)
+    
     def create_vectorstore(self, documents: List[Document], embeddings):
         """벡터 스토어 생성"""
         if self.store_type == "faiss":
@@ -27,14 +30,19 @@ class VectorStore:
     def save(self, path: str):
         """벡터 스토어 저장"""
         if self.store_type == "faiss":
-            self.vectorstore.save_local(path)
+            save_faiss_store(self.vectorstore, path)
         elif self.store_type == "chroma":
             self.vectorstore.persist()
     
     def load(self, path: str, embeddings):
-        """벡터 스토어 로드"""
+        """벡터 스토어 로드 (FAISS는 CURRENT가 가리키는 버전 우선, 컬럼형 docstore는 mmap)"""
         if self.store_type == "faiss":
-            self.vectorstore = FAISS.load_local(path, embeddings)
+            versions = VersionedIndexStore(path)
+            current_path = versions.current_path() or path
+            self.vectorstore = load_faiss_store(
+                current_path, embeddings, allow_pickle=settings.faiss_allow_pickle
+            )
+            self.version = versions.current_version()
         elif self.store_type == "chroma":
             self.vectorstore = Chroma(
                 persist_directory=path,
@@ -43,6 +51,117 @@ class VectorStore:
         
         return self.vectorstore
     
+    def append_documents(self, documents: List[Document], embeddings, path: str,
+                         keep_versions: int = 3) -> Optional[str]:
+        """기존 인덱스에 새 문서만 추가하여 저장 (덮어쓰기 대신 추가)
+        
+        FAISS는 현재 버전을 한 번만 로드해 두고 새 벡터만 add_embeddings로 추가한 뒤
+        새 버전 디렉토리에 저장하고 CURRENT 포인터를 교체합니다. 다른 프로세스가
+        그 사이 새 버전을 게시했다면 다시 로드한 뒤 추가합니다.
+        """
+        if self.store_type == "chroma":
+            if self.vectorstore is None:
+                self.load(path, embeddings)
+            self.vectorstore.add_documents(documents)
+            self.vectorstore.persist()
+            return None
+        
+        if self.store_type != "faiss":
+            raise ValueError(f"Unsupported vector store type: {self.store_type}")
+        
+        # 임베딩 API 호출은 잠금 밖에서 수행
+        texts = [doc.page_content for doc in documents]
+        vectors = embeddings.embed_documents(texts) if texts else []
+        return self.append_embeddings(documents, vectors, embeddings, path, keep_versions)
+    
+    def append_embeddings(self, documents: List[Document], vectors, embeddings, path: str,
+                          keep_versions: int = 3, replace: bool = False) -> Optional[str]:
+        """미리 계산한 임베딩을 FAISS 인덱스에 추가하여 새 버전으로 저장
+        
+        replace=True면 기존 인덱스 대신 이번 문서로만 새 인덱스를 만듭니다.
+        self.vectorstore는 게시가 성공한 뒤에만 새 인덱스로 바뀌며, 추가 도중
+        실패하면 게시된 버전과 달라진 메모리 인덱스를 버리고 다음 호출에서 다시 로드합니다.
+        """
+        if self.store_type != "faiss":
+            raise ValueError(f"Unsupported vector store type: {self.store_type}")
+        
+        texts = [doc.page_content for doc in documents]
+        metadatas = [doc.metadata for doc in documents]
+        
+        versions = VersionedIndexStore(path, keep_versions=keep_versions)
+        with versions.lock():
+            if replace or versions.current_path() is None:
+                store = None
+            else:
+                if self.vectorstore is None or self.version != versions.current_version():
+                    self.load(path, embeddings)
+                store = self.vectorstore
+            
+            try:
+                if texts and store is None:
+                    store = FAISS.from_embeddings(
+                        list(zip(texts, vectors)), embeddings, metadatas=metadatas
+                    )
+                elif texts:
+                    store.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+                
+                if store is None:
+                    return None
+                
+                version = versions.publish(
+                    lambda version_path: save_faiss_store(store, version_path)
+                )
+            except Exception:
+                self._discard()
+                raise
+            
+            self.vectorstore, self.version = store, version
+            return version
+    
+    def _discard(self):
+        """게시되지 않은 변경이 섞인 메모리 인덱스 폐기 (다음 쓰기 때 CURRENT 버전 재로드)"""
+        self.vectorstore = None
+        self.version = None
+    
+    def delete_by_metadata(self, key: str, values, embeddings, path: str,
+                           keep_versions: int = 3) -> int:
+        """metadata[key]가 values에 속하는 문서를 FAISS 인덱스에서 지우고 새 버전으로 저장
+        
+        docstore id는 저장할 때마다 행 번호로 바뀌므로 안정적인 메타데이터 값으로 찾습니다.
+        """
+        if self.store_type != "faiss":
+            raise ValueError(f"Unsupported vector store type: {self.store_type}")
+        
+        values = set(values)
+        versions = VersionedIndexStore(path, keep_versions=keep_versions)
+        with versions.lock():
+            if versions.current_path() is None:
+                return 0
+            if self.vectorstore is None or self.version != versions.current_version():
+                self.load(path, embeddings)
+            
+            # 인덱스를 한 번만 훑으며 집합 조회 (컬럼형 docstore는 본문을 디코딩하지 않음)
+            store = self.vectorstore
+            read_metadata = getattr(store.docstore, "metadata", None) or (
+                lambda doc_id: store.docstore.search(doc_id).metadata
+            )
+            doc_ids = [
+                doc_id for doc_id in store.index_to_docstore_id.values()
+                if read_metadata(doc_id).get(key) in values
+            ]
+            if not doc_ids:
+                return 0
+            
+            try:
+                store.delete(doc_ids)
+                self.version = versions.publish(
+                    lambda version_path: save_faiss_store(store, version_path)
+                )
+            except Exception:
+                self._discard()
+                raise
+            return len(doc_ids)
+    
     def similarity_search(self, query: str, k: int = 5) -> List[Document]:
         """유사도 검색"""
         if not self.vectorstore:
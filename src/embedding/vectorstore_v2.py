@@ -6,6 +6,8 @@ CREATED [2024-12-19]: MongoDB text_embedding 필드를 활용한 벡터 검색
 - MongoDB 내장 벡터 검색
 - FAISS/Chroma 벡터 DB에서 MongoDB로 임베딩 이관
 - 하이브리드 검색 지원
+- 폴더별 ANN 인덱스 (선택, 정확 검색 폴백)
+- 차원 축소 투영 (선택, 저장/쿼리 임베딩에 동일하게 적용)
 """
 
 from langchain.schema import Document
@@ -13,65 +15,183 @@ from typing import List, Dict, Any, Optional, Union
 import numpy as np
 from bson import ObjectId
 import logging
-from src.utils.database_v2 import MongoDBClientV2
+from src.embedding.ann_index import ANNIndexManager
+from src.utils.database_v2 import MongoDBClientV2, VECTOR_PAYLOAD_PROJECTION
+from src.utils.embedding_projection import EmbeddingProjection, load_projection
+from src.utils.vector_cache import normalize_vector
 
 logger = logging.getLogger(__name__)
 
 class MongoVectorStore:
     """MongoDB 기반 벡터 스토어"""
     
-    def __init__(self, mongodb_client: MongoDBClientV2):
+    def __init__(self, mongodb_client: MongoDBClientV2, 
+                 ann_index: Optional[ANNIndexManager] = None,
+                 projection: Optional[EmbeddingProjection] = None):
         self.db_client = mongodb_client
         self.collection = mongodb_client.documents
+        config = mongodb_client.config
+        
+        # 차원 축소 투영 (설정된 버전을 로드, 검색 대상도 같은 버전 문서로 한정됨)
+        if projection is None and config.embedding_projection_version:
+            projection = load_projection(config.embedding_projection_path,
+                                         config.embedding_projection_version)
+        if projection is not None and projection.version != config.embedding_projection_version:
+            raise ValueError(f"Projection {projection.version} does not match configured "
+                             f"embedding_projection_version {config.embedding_projection_version}")
+        self.projection = projection
+        
+        # ANN 인덱스 (설정에서 활성화된 경우 자동 생성)
+        if ann_index is None and mongodb_client.config.ann_enabled:
+            ann_index = ANNIndexManager(mongodb_client, mongodb_client.config)
+        self.ann_index = ann_index
+    
+    @property
+    def embedding_version(self) -> Optional[str]:
+        return self.projection.version if self.projection is not None else None
+    
+    def _project(self, embeddings: List[List[float]]) -> List[List[float]]:
+        """원본 임베딩을 저장/검색 공간으로 투영 (투영이 없으면 그대로)"""
+        if self.projection is None:
+            return embeddings
+        return self.projection.transform_list(embeddings)
     
     def add_documents(self, documents: List[Document], embeddings: List[List[float]], 
                      folder_id: ObjectId) -> List[ObjectId]:
         """문서와 임베딩을 MongoDB에 저장"""
-        document_ids = []
+        embeddings = self._project(embeddings)
         
+        # TextChunker.split_document_spans 청크는 본문 대신 원문 위치만 저장
+        rows = []
         for i, (doc, embedding) in enumerate(zip(documents, embeddings)):
-            document_id = self.db_client.insert_document(
-                folder_id=folder_id,
-                raw_text=doc.page_content,
-                chunk_sequence=doc.metadata.get("chunk_id", f"chunk_{i}"),
-                text_embedding=embedding,
-                metadata=doc.metadata
-            )
-            document_ids.append(document_id)
+            source_id = doc.metadata.get("source_id")
+            rows.append({
+                "folder_id": folder_id,
+                "raw_text": doc.page_content,
+                "chunk_sequence": doc.metadata.get("chunk_id", f"chunk_{i}"),
+                "text_embedding": embedding,
+                "metadata": doc.metadata,
+                "embedding_version": self.embedding_version,
+                "source_id": ObjectId(source_id) if source_id else None,
+                "span": (doc.metadata["span_start"], doc.metadata["span_end"]) if source_id else None
+            })
+        document_ids = self.db_client.insert_documents_bulk(rows)
+        
+        if self.ann_index is not None:
+            self.ann_index.add(folder_id, document_ids, embeddings)
         
         logger.info(f"✅ {len(documents)}개 문서와 임베딩을 MongoDB에 저장완료")
         return document_ids
     
+    def _search(self, query_embedding: List[float], folder_id: Optional[ObjectId],
+                k: int, exact: bool = False) -> List[Dict[str, Any]]:
+        """ANN 인덱스 검색 (사용할 수 없거나 exact=True면 정확 검색)"""
+        if self.projection is not None:
+            query_embedding = self._project([query_embedding])[0]
+        
+        if not exact and self.ann_index is not None and folder_id is not None:
+            query_vector = normalize_vector(query_embedding)
+            hits = self.ann_index.search(folder_id, query_vector, k) if query_vector is not None else None
+            
+            if hits is not None:
+                similarities = dict(hits)
+                documents = self.db_client.get_documents_by_ids(
+                    [doc_id for doc_id, _ in hits], VECTOR_PAYLOAD_PROJECTION
+                )
+                return [
+                    {"document": doc, "similarity": similarities[doc["_id"]]}
+                    for doc in documents
+                ]
+        
+        return self.db_client.vector_search(query_embedding, folder_id, k)
+    
+    def measure_recall(self, query_embeddings: List[List[float]], folder_id: ObjectId,
+                       k: int = 5) -> float:
+        """ANN 검색의 recall@k (정확 검색 결과 대비)"""
+        if not query_embeddings:
+            return 0.0
+        
+        recalls = []
+        for query_embedding in query_embeddings:
+            exact_ids = {r["document"]["_id"] for r in self._search(query_embedding, folder_id, k, exact=True)}
+            if not exact_ids:
+                continue
+            ann_ids = {r["document"]["_id"] for r in self._search(query_embedding, folder_id, k)}
+            recalls.append(len(exact_ids & ann_ids) / len(exact_ids))
+        
+        return float(np.mean(recalls)) if recalls else 0.0
+    
     def similarity_search(self, query_embedding: List[float], 
                          folder_id: Optional[ObjectId] = None, 
-                         k: int = 5) -> List[Document]:
+                         k: int = 5, exact: bool = False) -> List[Document]:
         """벡터 유사도 검색"""
-        # MongoDB 벡터 검색 사용
-        results = self.db_client.vector_search(query_embedding, folder_id, k)
+        # ANN 인덱스 또는 MongoDB 벡터 검색 사용
+        results = self._search(query_embedding, folder_id, k, exact)
         
         # Document 객체로 변환
-        documents = []
-        for result in results:
-            doc_data = result["document"]
-            document = Document(
-                page_content=doc_data.get("raw_text", ""),
-                metadata={
-                    **doc_data.get("metadata", {}),
-                    "document_id": str(doc_data["_id"]),
-                    "folder_id": str(doc_data["folder_id"]),
-                    "similarity": result["similarity"],
-                    "chunk_sequence": doc_data.get("chunk_sequence", "")
-                }
-            )
-            documents.append(document)
+        return [self._to_document(result) for result in results]
+    
+    def similarity_search_batch(self, query_embeddings: List[List[float]],
+                                folder_id: Optional[ObjectId] = None,
+                                k: int = 5, exact: bool = False) -> List[List[Document]]:
+        """여러 쿼리를 한 번에 검색 (평가, QA 생성 등 같은 폴더에 대한 대량 질의)
         
-        return documents
+        정확 검색은 쿼리 행렬과 임베딩 행렬의 곱 한 번으로 점수를 계산하고,
+        모든 쿼리의 상위 문서 본문을 $in 조회 한 번으로 가져옵니다.
+        """
+        if not query_embeddings:
+            return []
+        query_embeddings = self._project(query_embeddings)
+        
+        results = None
+        if not exact and self.ann_index is not None and folder_id is not None:
+            results = self._ann_search_batch(query_embeddings, folder_id, k)
+        if results is None:
+            results = self.db_client.vector_search_batch(query_embeddings, folder_id, k)
+        
+        return [[self._to_document(result) for result in query_results] for query_results in results]
+    
+    def _ann_search_batch(self, query_embeddings: List[List[float]], folder_id: ObjectId,
+                          k: int) -> Optional[List[List[Dict[str, Any]]]]:
+        """ANN 인덱스로 쿼리별 검색 후 페이로드 일괄 조회 (사용할 수 없으면 None)"""
+        batch_hits = []
+        for query_embedding in query_embeddings:
+            query_vector = normalize_vector(query_embedding)
+            hits = self.ann_index.search(folder_id, query_vector, k) if query_vector is not None else []
+            if hits is None:
+                return None
+            batch_hits.append(hits)
+        
+        needed_ids = list(dict.fromkeys(doc_id for hits in batch_hits for doc_id, _ in hits))
+        documents = {
+            doc["_id"]: doc
+            for doc in self.db_client.get_documents_by_ids(needed_ids, VECTOR_PAYLOAD_PROJECTION)
+        }
+        return [
+            [{"document": documents[doc_id], "similarity": similarity}
+             for doc_id, similarity in hits if doc_id in documents]
+            for hits in batch_hits
+        ]
+    
+    def _to_document(self, result: Dict[str, Any]) -> Document:
+        """검색 결과를 Document로 변환 (유사도는 metadata에 포함)"""
+        doc_data = result["document"]
+        return Document(
+            page_content=doc_data.get("raw_text", ""),
+            metadata={
+                **doc_data.get("metadata", {}),
+                "document_id": str(doc_data["_id"]),
+                "folder_id": str(doc_data["folder_id"]),
+                "similarity": result["similarity"],
+                "chunk_sequence": doc_data.get("chunk_sequence", "")
+            }
+        )
     
     def similarity_search_with_score(self, query_embedding: List[float], 
                                    folder_id: Optional[ObjectId] = None, 
-                                   k: int = 5) -> List[tuple]:
+                                   k: int = 5, exact: bool = False) -> List[tuple]:
         """점수와 함께 유사도 검색"""
-        results = self.db_client.vector_search(query_embedding, folder_id, k)
+        results = self._search(query_embedding, folder_id, k, exact)
         
         scored_documents = []
         for result in results:
@@ -92,14 +212,23 @@ class MongoVectorStore:
     def update_embeddings_batch(self, document_embeddings: Dict[ObjectId, List[float]]):
         """배치로 임베딩 업데이트"""
         updated_count = 0
+        if self.projection is not None:
+            document_ids = list(document_embeddings)
+            document_embeddings = dict(zip(
+                document_ids, self._project([document_embeddings[i] for i in document_ids])
+            ))
         
         for document_id, embedding in document_embeddings.items():
             try:
-                self.db_client.update_document_embedding(document_id, embedding)
+                self.db_client.update_document_embedding(document_id, embedding,
+                                                         self.embedding_version)
                 updated_count += 1
             except Exception as e:
                 logger.error(f"임베딩 업데이트 실패 {document_id}: {str(e)}")
         
+        if self.ann_index is not None:
+            self.ann_index.update(document_embeddings)
+        
         logger.info(f"✅ {updated_count}개 문서 임베딩 업데이트 완료")
         return updated_count
     
@@ -135,12 +264,13 @@ class MongoVectorStore:
                             folder_id=folder_id,
                             raw_text=document.page_content,
                             chunk_sequence=document.metadata.get("chunk_id", f"migrated_{idx}"),
-                            text_embedding=embedding,
+                            text_embedding=self._project([embedding])[0],
                             metadata={
                                 **document.metadata,
                                 "migrated_from": "faiss",
                                 "original_index": idx
-                            }
+                            },
+                            embedding_version=self.embedding_version
                         )
                         
                         migrated_count += 1
@@ -181,12 +311,13 @@ class MongoVectorStore:
                             folder_id=folder_id,
                             raw_text=doc,
                             chunk_sequence=metadata.get("chunk_id", f"chroma_migrated_{i}"),
-                            text_embedding=embedding,
+                            text_embedding=self._project([embedding])[0],
                             metadata={
                                 **(metadata or {}),
                                 "migrated_from": "chroma",
                                 "original_index": i
-                            }
+                            },
+                            embedding_version=self.embedding_version
                         )
                         
                         migrated_count += 1
@@ -217,7 +348,8 @@ class MongoVectorStore:
         for key, value in metadata_filter.items():
             query[f"metadata.{key}"] = value
         
-        results = list(self.collection.find(query))
+        # span으로 저장된 청크는 원문에서 본문을 채움
+        results = self.db_client.materialize_documents(list(self.collection.find(query)))
         
         documents = []
         for doc_data in results:
@@ -244,9 +376,11 @@ class MongoVectorStore:
     
     def delete_documents(self, document_ids: List[ObjectId]) -> int:
         """문서 삭제"""
-        result = self.collection.delete_many({"_id": {"$in": document_ids}})
-        logger.info(f"✅ {result.deleted_count}개 문서 삭제 완료")
-        return result.deleted_count
+        deleted_count = self.db_client.delete_documents(document_ids)
+        if self.ann_index is not None:
+            self.ann_index.remove(document_ids)
+        logger.info(f"✅ {deleted_count}개 문서 삭제 완료")
+        return deleted_count
 
 class HybridVectorStore:
     """하이브리드 벡터 스토어 (MongoDB + 기존 벡터 DB)"""
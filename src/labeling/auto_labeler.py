@@ -55,7 +55,7 @@ JSON 응답:"""
         labeled_docs = []
         
         for i, doc in enumerate(documents):
-            doc.metadata["chunk_id"] = f"chunk_{i}"
+            doc.metadata.setdefault("chunk_id", f"chunk_{i}")
             labels = self.label_document(doc)
             labeled_docs.append(labels)
         
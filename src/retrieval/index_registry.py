@@ -0,0 +1,178 @@
+"""
+벡터 인덱스 레지스트리
+CREATED [2026-10-18]: API 프로세스에서 FAISS 인덱스 무중단 교체
+
+기능:
+- CURRENT 포인터를 감시하거나 reload 신호를 받으면 백그라운드 스레드에서 새 버전 로드
+- 로드가 끝나면 Retriever의 스토어 참조를 원자적으로 교체
+- 이전 버전은 읽고 있는 요청이 모두 끝날 때까지 유지
+"""
+
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import datetime
+import logging
+import threading
+from src.embedding.index_versions import VersionedIndexStore
+from src.embedding.vectorstore import VectorStore
+
+logger = logging.getLogger(__name__)
+
+
+class IndexVersion:
+    """로드된 인덱스 버전과 읽기 참조 수"""
+
+    def __init__(self, version: Optional[str], vectorstore: VectorStore):
+        self.version = version
+        self.vectorstore = vectorstore
+        self.loaded_at = datetime.datetime.utcnow()
+        self.readers = 0
+
+
+class IndexRegistry:
+    """버전 관리되는 FAISS 인덱스의 로드/교체 관리"""
+
+    def __init__(self, path: str, embeddings, retriever=None,
+                 poll_interval: float = 5.0, store_type: str = None):
+        self.path = path
+        self.embeddings = embeddings
+        self.retriever = retriever
+        self.poll_interval = poll_interval
+        self.store_type = store_type
+        self.versions = VersionedIndexStore(path)
+
+        self._current: Optional[IndexVersion] = None
+        self._retired: List[IndexVersion] = []
+        self._lock = threading.Lock()
+        self._reload_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.reload_count = 0
+        self.last_error: Optional[str] = None
+        self.last_checked_at: Optional[datetime.datetime] = None
+
+    # ---------- 로드 / 교체 ----------
+
+    def _load(self) -> IndexVersion:
+        version = self.versions.current_version()
+        vectorstore = VectorStore(self.store_type)
+        vectorstore.load(self.path, self.embeddings)
+        return IndexVersion(version, vectorstore)
+
+    def load_current(self) -> IndexVersion:
+        """현재 버전을 동기적으로 로드하여 교체 (서버 시작 시)"""
+        loaded = self._load()
+        self._swap(loaded)
+        return loaded
+
+    def _swap(self, loaded: IndexVersion):
+        with self._lock:
+            previous = self._current
+            self._current = loaded
+            if previous is not None:
+                self._retired.append(previous)
+            self._release_retired()
+            self.reload_count += 1
+
+        # 진행 중인 요청은 이미 잡아 둔 이전 스토어를 계속 사용
+        if self.retriever is not None:
+            self.retriever.vectorstore = loaded.vectorstore
+
+        logger.info(f"✅ 벡터 인덱스 교체 완료: {loaded.version}")
+
+    def _release_retired(self):
+        """읽는 요청이 없는 이전 버전 해제 (self._lock 보유 상태에서 호출)"""
+        self._retired = [entry for entry in self._retired if entry.readers > 0]
+
+    def reload_if_changed(self) -> bool:
+        """CURRENT가 바뀌었으면 새 버전을 로드하여 교체"""
+        self.last_checked_at = datetime.datetime.utcnow()
+        latest = self.versions.current_version()
+        current = self._current.version if self._current else None
+        if latest is None or latest == current:
+            return False
+
+        try:
+            self._swap(self._load())
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"❌ 벡터 인덱스 로드 실패 ({latest}): {str(e)}")
+            return False
+
+    def request_reload(self):
+        """백그라운드 스레드에 즉시 확인 요청 (업로드 완료, SIGHUP, 관리 API)"""
+        self._reload_event.set()
+
+    # ---------- 읽기 ----------
+
+    @contextmanager
+    def acquire(self):
+        """현재 버전의 VectorStore를 빌려 사용 (사용 중에는 해제되지 않음)"""
+        with self._lock:
+            entry = self._current
+            if entry is not None:
+                entry.readers += 1
+        try:
+            yield entry.vectorstore if entry is not None else None
+        finally:
+            if entry is not None:
+                with self._lock:
+                    entry.readers -= 1
+                    self._release_retired()
+
+    # ---------- 감시 스레드 ----------
+
+    def start(self):
+        """CURRENT 감시 스레드 시작"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._watch, name="index-registry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._reload_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _watch(self):
+        while not self._stop_event.is_set():
+            timeout = self.poll_interval if self.poll_interval > 0 else None
+            self._reload_event.wait(timeout)
+            self._reload_event.clear()
+            if self._stop_event.is_set():
+                break
+            self.reload_if_changed()
+
+    # ---------- 상태 ----------
+
+    def status(self) -> Dict[str, Any]:
+        """현재 서비스 중인 인덱스 버전 정보"""
+        with self._lock:
+            current = self._current
+            return {
+                "path": self.path,
+                "serving_version": current.version if current else None,
+                "published_version": self.versions.current_version(),
+                "loaded_at": current.loaded_at.isoformat() if current else None,
+                "num_vectors": self._num_vectors(current),
+                "draining_versions": [
+                    {"version": entry.version, "readers": entry.readers}
+                    for entry in self._retired
+                ],
+                "reload_count": self.reload_count,
+                "watching": self._thread is not None and self._thread.is_alive(),
+                "last_checked_at": self.last_checked_at.isoformat() if self.last_checked_at else None,
+                "last_error": self.last_error
+            }
+
+    @staticmethod
+    def _num_vectors(entry: Optional[IndexVersion]) -> Optional[int]:
+        if entry is None or entry.vectorstore.vectorstore is None:
+            return None
+        index = getattr(entry.vectorstore.vectorstore, "index", None)
+        return getattr(index, "ntotal", None)
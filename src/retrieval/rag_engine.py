@@ -2,9 +2,10 @@ from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.chains import ConversationalRetrievalChain
 from langchain.memory import ConversationBufferMemory
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from config.settings import settings
 from src.retrieval.retriever import Retriever
+from src.utils.token_counter import get_token_counter, tokenizer_name
 
 class RAGEngine:
     def __init__(self, retriever: Retriever):
@@ -14,6 +15,8 @@ class RAGEngine:
             model=settings.llm_model,
             temperature=0.7
         )
+        self.count_tokens = get_token_counter(settings.llm_model)
+        self.token_model = tokenizer_name(settings.llm_model)
         
         self.prompt_template = PromptTemplate(
             input_variables=["context", "question"],
@@ -52,19 +55,21 @@ class RAGEngine:
             # 하이브리드 검색 시도
             search_results = self.retriever.hybrid_retrieve(query)
             
-            # 컨텍스트 생성
+            # 컨텍스트 생성: (텍스트, 토큰 수) 목록
             context_parts = []
             
-            # 유사 문서 컨텍스트
+            # 유사 문서 컨텍스트 (청커가 LLM과 같은 토크나이저로 센 token_count만 재사용)
             for doc in search_results.get("similar_documents", []):
-                context_parts.append(doc.page_content)
+                same_tokenizer = doc.metadata.get("token_model") == self.token_model
+                context_parts.append((doc.page_content, doc.metadata.get("token_count") if same_tokenizer else None))
             
             # QA 컨텍스트
             for qa in search_results.get("qa_pairs", []):
-                context_parts.append(f"Q: {qa['question']}\nA: {qa['answer']}")
+                context_parts.append((f"Q: {qa['question']}\nA: {qa['answer']}", None))
             
+            context_parts = self._select_context(context_parts)
             if context_parts:
-                context = "\n\n".join(context_parts[:5])  # 상위 5개만 사용
+                context = "\n\n".join(context_parts)
                 prompt = self.prompt_template.format(context=context, question=query)
                 answer = self.llm.predict(prompt)
                 
@@ -83,6 +88,18 @@ class RAGEngine:
             print(f"Search failed, using basic mode: {str(e)}")
             return self._basic_answer(query)
     
+    def _select_context(self, parts: List[Tuple[str, Optional[int]]], limit: int = 5) -> List[str]:
+        """상위 limit개 중 CONTEXT_MAX_TOKENS 안에 들어가는 컨텍스트만 선택"""
+        selected, used = [], 0
+        for text, token_count in parts[:limit]:
+            if token_count is None:
+                token_count = self.count_tokens(text)
+            if selected and used + token_count > settings.context_max_tokens:
+                break
+            selected.append(text)
+            used += token_count
+        return selected
+    
     def _basic_answer(self, query: str) -> Dict[str, Any]:
         """벡터 스토어 없이 기본 LLM 답변 제공"""
         prompt = self.basic_prompt_template.format(question=query)
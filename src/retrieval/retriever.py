@@ -4,12 +4,18 @@ from src.embedding.vectorstore import VectorStore
 from src.utils.database import MongoDBClient
 
 class Retriever:
-    def __init__(self, vectorstore: VectorStore, db_client: MongoDBClient):
+    def __init__(self, vectorstore: VectorStore, db_client: MongoDBClient,
+                 index_registry=None):
         self.vectorstore = vectorstore
         self.db_client = db_client
+        # 인덱스 레지스트리가 있으면 검색 중인 버전이 교체/해제되지 않도록 빌려서 사용
+        self.index_registry = index_registry
     
     def retrieve_by_similarity(self, query: str, k: int = 5) -> List[Document]:
         """벡터 유사도 기반 검색"""
+        if self.index_registry is not None:
+            with self.index_registry.acquire() as vectorstore:
+                return (vectorstore or self.vectorstore).similarity_search(query, k=k)
         return self.vectorstore.similarity_search(query, k=k)
     
     def retrieve_by_labels(self, labels: List[str]) -> List[Dict[str, Any]]:
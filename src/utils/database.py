@@ -12,7 +12,8 @@ from bson import ObjectId
 class MongoDBClient:
     """기존 코드 호환성을 위한 래퍼 클래스"""
     
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, folder_id: ObjectId = None):
+        """folder_id를 주면 청크/라벨/QA를 기본 폴더 대신 그 폴더에 저장"""
         self.client = MongoClient(uri)
         self.db = self.client.rag_system
         
@@ -25,7 +26,7 @@ class MongoDBClient:
         self.v2 = MongoDBClientV2(uri)
         
         # 기본 폴더 ID 캐시
-        self._default_folder_id = None
+        self._default_folder_id = folder_id
     
     def _get_default_folder_id(self) -> ObjectId:
         """기본 폴더 ID를 가져오거나 생성"""
@@ -43,22 +44,103 @@ class MongoDBClient:
                 )
         return self._default_folder_id
     
+    @property
+    def folder_id(self) -> ObjectId:
+        """청크/라벨/QA를 저장하는 폴더"""
+        return self._get_default_folder_id()
+    
+    def _source_span(self, metadata: Dict[str, Any]):
+        """청크 metadata의 원문 위치 → (source_id, span), 없으면 (None, None)"""
+        if not metadata.get("source_id"):
+            return None, None
+        return ObjectId(metadata["source_id"]), (metadata["span_start"], metadata["span_end"])
+    
     def insert_chunk(self, chunk_data: Dict[str, Any]):
         """청크 데이터 삽입 (새 스키마로 저장)"""
         folder_id = self._get_default_folder_id()
         
-        # v2 형식으로 변환
+        # v2 형식으로 변환 (원문 span이 있으면 본문 대신 위치만 저장)
+        metadata = chunk_data.get("metadata", {})
+        source_id, span = self._source_span(metadata)
         document_id = self.v2.insert_document(
             folder_id=folder_id,
             raw_text=chunk_data.get("content", chunk_data.get("text", "")),
             chunk_sequence=chunk_data.get("chunk_id", f"chunk_{datetime.datetime.now().timestamp()}"),
             text_embedding=chunk_data.get("text_embedding", []),
-            metadata=chunk_data.get("metadata", {})
+            metadata=metadata,
+            source_id=source_id,
+            span=span
         )
         
         # 호환성을 위해 ObjectId를 포함한 결과 반환
         return type('MockResult', (), {'inserted_id': document_id})()
     
+    def insert_chunks_bulk(self, chunks: List[Dict[str, Any]]) -> List[ObjectId]:
+        """insert_chunk의 배치 버전 (반환 Document id는 입력 순서)"""
+        folder_id = self._get_default_folder_id()
+        documents = []
+        for chunk_data in chunks:
+            metadata = chunk_data.get("metadata", {})
+            source_id, span = self._source_span(metadata)
+            documents.append({
+                "folder_id": folder_id,
+                "raw_text": chunk_data.get("content", chunk_data.get("text", "")),
+                "chunk_sequence": chunk_data.get("chunk_id", f"chunk_{datetime.datetime.now().timestamp()}"),
+                "text_embedding": chunk_data.get("text_embedding", []),
+                "metadata": metadata,
+                "source_id": source_id,
+                "span": span
+            })
+        return self.v2.insert_documents_bulk(documents)
+    
+    def _document_ids_by_chunk(self, chunk_ids: List[str]) -> Dict[str, ObjectId]:
+        """chunk_id → Document id 한 번에 조회 (없는 청크는 빈 Document를 만들어 연결)"""
+        document_ids = {}
+        for doc in self.v2.documents.find({"chunk_sequence": {"$in": list(set(chunk_ids))}}, {"chunk_sequence": 1}):
+            document_ids.setdefault(doc["chunk_sequence"], doc["_id"])
+        
+        missing = [chunk_id for chunk_id in dict.fromkeys(chunk_ids) if chunk_id not in document_ids]
+        if missing:
+            folder_id = self._get_default_folder_id()
+            created = self.v2.insert_documents_bulk([
+                {"folder_id": folder_id, "raw_text": "", "chunk_sequence": chunk_id,
+                 "metadata": {"auto_created": True}}
+                for chunk_id in missing
+            ])
+            document_ids.update(zip(missing, created))
+        return document_ids
+    
+    def insert_source(self, text: str, metadata: Dict[str, Any] = None) -> ObjectId:
+        """청크들이 span으로 참조할 원문 저장 (기본 폴더)"""
+        return self.v2.insert_source(self._get_default_folder_id(), text, metadata)
+    
+    def insert_duplicate_chunk(self, chunk_data: Dict[str, Any], canonical_chunk_id: str):
+        """임베딩하지 않은 중복 청크를 같은 폴더의 원본 Document에 연결하여 저장 (벡터 검색 대상 아님)
+        
+        원본 Document가 없으면 ValueError (호출자가 일반 청크로 임베딩하여 저장)
+        """
+        folder_id = self._get_default_folder_id()
+        canonical = self.v2.documents.find_one(
+            {"chunk_sequence": canonical_chunk_id, "folder_id": folder_id}, {"_id": 1}
+        )
+        if canonical is None:
+            raise ValueError(f"Canonical document not found for chunk: {canonical_chunk_id}")
+        metadata = {
+            **chunk_data.get("metadata", {}),
+            "duplicate_of": canonical_chunk_id,
+            "canonical_document_id": canonical["_id"]
+        }
+        source_id, span = self._source_span(metadata)
+        document_id = self.v2.insert_document(
+            folder_id=folder_id,
+            raw_text=chunk_data.get("content", chunk_data.get("text", "")),
+            chunk_sequence=chunk_data.get("chunk_id", f"chunk_{datetime.datetime.now().timestamp()}"),
+            metadata=metadata,
+            source_id=source_id,
+            span=span
+        )
+        return type('MockResult', (), {'inserted_id': document_id})()
+    
     def insert_labels(self, label_data: Dict[str, Any]):
         """라벨 데이터 삽입 (새 스키마로 저장)"""
         folder_id = self._get_default_folder_id()
@@ -130,6 +212,44 @@ class MongoDBClient:
         # 첫 번째 ID 반환 (호환성)
         return type('MockResult', (), {'inserted_id': inserted_ids[0] if inserted_ids else None})()
     
+    def insert_labels_bulk(self, labels: List[Dict[str, Any]]) -> List[ObjectId]:
+        """insert_labels의 배치 버전 (Document 조회 한 번, 라벨 insert_many)"""
+        if not labels:
+            return []
+        folder_id = self._get_default_folder_id()
+        document_ids = self._document_ids_by_chunk([label_data.get("chunk_id", "") for label_data in labels])
+        return self.v2.insert_labels_bulk([
+            {
+                "document_id": document_ids[label_data.get("chunk_id", "")],
+                "folder_id": folder_id,
+                "main_topic": label_data.get("labels", {}).get("main_topic", ""),
+                "tags": label_data.get("labels", {}).get("tags", []),
+                "category": label_data.get("labels", {}).get("category", "general"),
+                "confidence": 0.8
+            }
+            for label_data in labels
+        ])
+    
+    def insert_qa_pairs_bulk(self, qa_batch: List[Dict[str, Any]]) -> List[ObjectId]:
+        """insert_qa_pairs의 배치 버전 (Document 조회 한 번, QA insert_many)"""
+        if not qa_batch:
+            return []
+        folder_id = self._get_default_folder_id()
+        document_ids = self._document_ids_by_chunk([qa_data.get("chunk_id", "") for qa_data in qa_batch])
+        return self.v2.insert_qa_pairs_bulk([
+            {
+                "document_id": document_ids[qa_data.get("chunk_id", "")],
+                "folder_id": folder_id,
+                "question": qa_pair["question"],
+                "answer": qa_pair["answer"],
+                "question_type": "general",
+                "difficulty": "medium"
+            }
+            for qa_data in qa_batch
+            for qa_pair in qa_data.get("qa_pairs", [])
+            if isinstance(qa_pair, dict) and "question" in qa_pair and "answer" in qa_pair
+        ])
+    
     def find_by_labels(self, labels: List[str]) -> List[Dict[str, Any]]:
         """라벨로 검색 (v2로 위임)"""
         results = self.v2.search_by_tags(labels)
@@ -10,17 +10,42 @@ CREATED [2024-12-19]: 새로운 컬렉션 구조 지원
 """
 
 from pymongo import MongoClient, ASCENDING, DESCENDING
-from typing import List, Dict, Any, Optional, Union
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Union
 import datetime
+import logging
+import threading
 from bson import ObjectId
 import numpy as np
+from config.database_config import DatabaseConfig, default_db_config
+from src.utils.embedding_codec import decode_document_embedding, encode_embedding
+from src.utils.embedding_projection import embedding_version_filter
 from src.utils.schemas import MongoSchemas
+from src.utils.text_codec import decode_text, encode_text, search_terms
+from src.utils.embedding_snapshot import load_snapshot, snapshot_dir
+from src.utils.vector_cache import (
+    EmbeddingMatrix, SegmentedEmbeddingMatrix, get_embedding_cache, normalize_vector
+)
+
+logger = logging.getLogger(__name__)
+
+# 벡터 검색 2단계: 점수 계산용 프로젝션과 상위 k개 페이로드용 프로젝션
+VECTOR_SCORING_PROJECTION = {"_id": 1, "text_embedding": 1, "embedding_encoding": 1}
+VECTOR_PAYLOAD_PROJECTION = {"folder_id": 1, "chunk_sequence": 1, "raw_text": 1, "metadata": 1,
+                             "source_id": 1, "span_start": 1, "span_end": 1}
+
+# 캐시를 쓰지 않을 때 스트리밍 점수 계산 블록 크기
+VECTOR_SCORING_BATCH_SIZE = 5000
+
+# 압축을 푼 원문을 보관하는 개수 (같은 원문의 청크가 연달아 조회되는 경우)
+SOURCE_CACHE_SIZE = 16
 
 class MongoDBClientV2:
     """새로운 스키마를 지원하는 MongoDB 클라이언트"""
     
-    def __init__(self, uri: str):
+    def __init__(self, uri: str, config: DatabaseConfig = None):
         self.client = MongoClient(uri)
+        self.config = config or default_db_config
         self.db = self.client.rag_system
         
         # 새 컬렉션들
@@ -28,9 +53,17 @@ class MongoDBClientV2:
         self.labels = self.db.Labels
         self.qa_pairs = self.db.QAPairs
         self.folders = self.db.Folder
+        self.sources = self.db.Sources
+        self.chunk_signatures = self.db.ChunkSignatures
         
         # 스키마 정의
         self.schemas = MongoSchemas()
+        
+        # 벡터 검색용 임베딩 행렬 캐시 (프로세스 공용)
+        self.vector_cache = get_embedding_cache() if self.config.vector_cache_enabled else None
+        self._cache_namespace = self.documents.full_name
+        self._source_cache: "OrderedDict[ObjectId, str]" = OrderedDict()
+        self._source_cache_lock = threading.Lock()
     
     # ==================== Folder 관련 메서드 ====================
     
@@ -93,6 +126,8 @@ class MongoDBClientV2:
         self.documents.delete_many({"folder_id": folder_id})
         self.labels.delete_many({"folder_id": folder_id})
         self.qa_pairs.delete_many({"folder_id": folder_id})
+        self.chunk_signatures.delete_many({"folder_id": folder_id})
+        self.invalidate_vector_cache(folder_id)
         
         # 폴더 자체 삭제
         self.folders.delete_one({"_id": folder_id})
@@ -105,31 +140,88 @@ class MongoDBClientV2:
     
     # ==================== Document 관련 메서드 ====================
     
-    def insert_document(self, folder_id: ObjectId, raw_text: str, 
-                       chunk_sequence: Union[str, int], 
+    def _document_data(self, folder_id: ObjectId, raw_text: str,
+                       chunk_sequence: Union[str, int],
                        text_embedding: List[float] = None,
-                       metadata: Dict[str, Any] = None) -> ObjectId:
-        """Document 삽입"""
+                       metadata: Dict[str, Any] = None,
+                       embedding_version: Optional[str] = None,
+                       source_id: Optional[ObjectId] = None,
+                       span: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+        """insert_document/insert_documents_bulk가 저장하는 Document"""
+        embedding_value, embedding_encoding = self._encode_embedding(text_embedding)
         document_data = {
             "folder_id": folder_id,
             "chunk_sequence": chunk_sequence,
-            "raw_text": raw_text,
-            "text_embedding": text_embedding or [],
+            "raw_text": "" if span is not None else raw_text,
+            "text_embedding": embedding_value,
             "metadata": metadata or {},
             "created_at": datetime.datetime.utcnow(),
             "updated_at": datetime.datetime.utcnow()
         }
         
+        if embedding_encoding:
+            document_data["embedding_encoding"] = embedding_encoding
+        if embedding_version:
+            document_data["embedding_version"] = embedding_version
+        if span is not None:
+            document_data["source_id"] = source_id
+            document_data["span_start"], document_data["span_end"] = span
+        return document_data
+    
+    def insert_document(self, folder_id: ObjectId, raw_text: str, 
+                       chunk_sequence: Union[str, int], 
+                       text_embedding: List[float] = None,
+                       metadata: Dict[str, Any] = None,
+                       embedding_version: Optional[str] = None,
+                       source_id: Optional[ObjectId] = None,
+                       span: Optional[Tuple[int, int]] = None) -> ObjectId:
+        """Document 삽입 (embedding_version: 차원 축소 투영 버전)
+        
+        source_id와 span(원문 내 시작, 끝 위치)을 주면 raw_text는 저장하지 않고
+        조회 시 Sources의 원문에서 잘라 채웁니다.
+        """
+        document_data = self._document_data(folder_id, raw_text, chunk_sequence, text_embedding,
+                                            metadata, embedding_version, source_id, span)
         result = self.documents.insert_one(document_data)
+        self.invalidate_vector_cache(folder_id)
         
         # 폴더 접근 시간 업데이트
         self.update_folder_access_time(folder_id)
         
         return result.inserted_id
     
+    def insert_documents_bulk(self, documents: List[Dict[str, Any]]) -> List[ObjectId]:
+        """Document 여러 개를 config.batch_size개씩 insert_many(ordered=False)로 삽입
+        
+        각 항목은 insert_document의 인자 dict (folder_id, raw_text, chunk_sequence 필수)이며
+        반환 id는 입력 순서와 같습니다. 폴더 접근 시간은 배치마다 한 번만 갱신합니다.
+        """
+        return self._insert_bulk(self.documents, [self._document_data(**document) for document in documents],
+                                 invalidate_cache=True)
+    
+    def _insert_bulk(self, collection, rows: List[Dict[str, Any]], invalidate_cache: bool = False) -> List[ObjectId]:
+        """_id를 미리 부여하고 배치 단위 unordered insert_many (배치마다 폴더 갱신 한 번)"""
+        for row in rows:
+            row.setdefault("_id", ObjectId())
+        
+        batch_size = max(1, self.config.batch_size)
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            collection.insert_many(batch, ordered=False)
+            folder_ids = list({row["folder_id"] for row in batch})
+            if invalidate_cache:
+                for folder_id in folder_ids:
+                    self.invalidate_vector_cache(folder_id)
+            self.folders.update_many(
+                {"_id": {"$in": folder_ids}},
+                {"$set": {"last_accessed_at": datetime.datetime.utcnow()}}
+            )
+        return [row["_id"] for row in rows]
+    
     def get_document(self, document_id: ObjectId) -> Optional[Dict[str, Any]]:
         """Document 조회"""
-        return self.documents.find_one({"_id": document_id})
+        document = self.documents.find_one({"_id": document_id})
+        return self.materialize_documents([document])[0] if document else None
     
     def get_documents_by_folder(self, folder_id: ObjectId, 
                                limit: int = None) -> List[Dict[str, Any]]:
@@ -140,71 +232,378 @@ class MongoDBClientV2:
         if limit:
             cursor = cursor.limit(limit)
             
-        return list(cursor)
+        return self.materialize_documents(list(cursor))
     
     def search_documents_by_text(self, text_query: str, folder_id: ObjectId = None,
                                 limit: int = 10) -> List[Dict[str, Any]]:
-        """텍스트 검색"""
+        """텍스트 검색 (span Document는 원문 검색 결과에서 검색어가 든 청크를 찾아 포함)"""
         query = {"$text": {"$search": text_query}}
         
         if folder_id:
             query["folder_id"] = folder_id
         
-        return list(self.documents.find(query).limit(limit))
+        results = list(self.documents.find(query).limit(limit))
+        if len(results) < limit:
+            results.extend(self._search_span_documents(text_query, folder_id, limit - len(results)))
+        return self.materialize_documents(results)
+    
+    def _search_span_documents(self, text_query: str, folder_id: Optional[ObjectId],
+                               limit: int) -> List[Dict[str, Any]]:
+        """Sources.search_terms의 $text 검색 결과를 검색어가 들어 있는 span 청크로 변환
+        
+        다른 폴더로 복사된 청크도 원래 원문을 참조하므로 폴더 조건은 청크 기준으로 적용합니다.
+        """
+        query = {"$text": {"$search": text_query}}
+        if folder_id:
+            source_ids = [source_id for source_id in self.documents.distinct(
+                "source_id", {"folder_id": folder_id, "source_id": {"$ne": None}}) if source_id is not None]
+            if not source_ids:
+                return []
+            query["_id"] = {"$in": source_ids}
+        sources = self.sources.find(query, {"score": {"$meta": "textScore"}}).sort(
+            [("score", {"$meta": "textScore"})]).limit(limit)
+        rank = {source["_id"]: i for i, source in enumerate(sources)}
+        if not rank:
+            return []
+        
+        chunk_query = {"source_id": {"$in": list(rank)}}
+        if folder_id:
+            chunk_query["folder_id"] = folder_id
+        terms = [term.strip('"').lower() for term in text_query.split() if not term.startswith("-")]
+        hits = []
+        for doc in self.materialize_documents(list(self.documents.find(chunk_query))):
+            text = doc.get("raw_text", "").lower()
+            count = sum(text.count(term) for term in terms if term)
+            if count:
+                hits.append((rank[doc["source_id"]], -count, doc))
+        hits.sort(key=lambda hit: hit[:2])
+        return [doc for _, _, doc in hits[:limit]]
     
     def update_document_embedding(self, document_id: ObjectId, 
-                                 text_embedding: List[float]):
-        """Document의 임베딩 업데이트"""
-        self.documents.update_one(
-            {"_id": document_id},
-            {
-                "$set": {
-                    "text_embedding": text_embedding,
-                    "updated_at": datetime.datetime.utcnow()
-                }
-            }
+                                 text_embedding: List[float],
+                                 embedding_version: Optional[str] = None):
+        """Document의 임베딩 업데이트 (embedding_version: 차원 축소 투영 버전)"""
+        embedding_value, embedding_encoding = self._encode_embedding(text_embedding)
+        update = {
+            "$set": {
+                "text_embedding": embedding_value,
+                "updated_at": datetime.datetime.utcnow()
+            },
+            "$unset": {}
+        }
+        
+        if embedding_encoding:
+            update["$set"]["embedding_encoding"] = embedding_encoding
+        else:
+            update["$unset"]["embedding_encoding"] = ""
+        if embedding_version:
+            update["$set"]["embedding_version"] = embedding_version
+        else:
+            update["$unset"]["embedding_version"] = ""
+        
+        document = self.documents.find_one_and_update(
+            {"_id": document_id}, update, projection={"folder_id": 1}
         )
+        
+        if document is not None:
+            self.invalidate_vector_cache(document.get("folder_id"))
+    
+    def delete_documents(self, document_ids: List[ObjectId], cascade: bool = False) -> int:
+        """Document 삭제 (cascade=True면 연결된 Labels/QAPairs도 삭제)"""
+        source_ids = self.documents.distinct("source_id", {"_id": {"$in": document_ids}})
+        chunks_by_folder = {}
+        for doc in self.documents.find({"_id": {"$in": document_ids}}, {"folder_id": 1, "chunk_sequence": 1}):
+            chunks_by_folder.setdefault(doc["folder_id"], []).append(doc["chunk_sequence"])
+        result = self.documents.delete_many({"_id": {"$in": document_ids}})
+        
+        # 삭제된 청크의 중복 제거 서명 (그 폴더에서 이 청크를 원본으로 삼지 않도록)
+        for folder_id, chunk_ids in chunks_by_folder.items():
+            self.chunk_signatures.delete_many({"_id": {"$in": chunk_ids}, "folder_id": folder_id})
+        
+        if cascade:
+            self.labels.delete_many({"document_id": {"$in": document_ids}})
+            self.qa_pairs.delete_many({"document_id": {"$in": document_ids}})
+        
+        # 더 이상 참조하는 청크가 없는 원문 삭제
+        orphaned = [source_id for source_id in source_ids
+                    if source_id is not None and self.documents.find_one({"source_id": source_id}, {"_id": 1}) is None]
+        if orphaned:
+            self.sources.delete_many({"_id": {"$in": orphaned}})
+        
+        for folder_id in chunks_by_folder:
+            self.invalidate_vector_cache(folder_id)
+        
+        return result.deleted_count
+    
+    def copy_documents_to_folder(self, document_ids: List[ObjectId], folder_id: ObjectId) -> Dict[ObjectId, ObjectId]:
+        """Document와 연결된 Labels/QAPairs를 다른 폴더로 복사 (임베딩/원문 span 그대로, 기존 id → 새 id)"""
+        now = datetime.datetime.utcnow()
+        id_map = {}
+        copies = []
+        for doc in self.documents.find({"_id": {"$in": document_ids}}):
+            new_id = ObjectId()
+            id_map[doc["_id"]] = new_id
+            copies.append({**doc, "_id": new_id, "folder_id": folder_id, "created_at": now, "updated_at": now})
+        if not copies:
+            return id_map
+        self._insert_bulk(self.documents, copies, invalidate_cache=True)
+        
+        for collection in (self.labels, self.qa_pairs):
+            self._insert_bulk(collection, [
+                {**item, "_id": ObjectId(), "document_id": id_map[item["document_id"]], "folder_id": folder_id,
+                 "created_at": now, "updated_at": now}
+                for item in collection.find({"document_id": {"$in": list(id_map)}})
+            ])
+        return id_map
+    
+    # ==================== Sources 관련 메서드 ====================
+    
+    def insert_source(self, folder_id: ObjectId, text: str,
+                      metadata: Dict[str, Any] = None) -> ObjectId:
+        """클렌징된 원문을 압축하여 한 번만 저장 (청크는 span으로 참조)"""
+        text_value, text_encoding = encode_text(text)
+        result = self.sources.insert_one({
+            "folder_id": folder_id,
+            "text": text_value,
+            "text_encoding": text_encoding,
+            "search_terms": search_terms(text),
+            "metadata": metadata or {},
+            "created_at": datetime.datetime.utcnow()
+        })
+        return result.inserted_id
+    
+    def get_source_texts(self, source_ids: List[ObjectId]) -> Dict[ObjectId, str]:
+        """원문 조회 (최근 사용한 원문은 압축을 푼 채로 보관)"""
+        texts = {}
+        with self._source_cache_lock:
+            for source_id in source_ids:
+                if source_id in self._source_cache:
+                    self._source_cache.move_to_end(source_id)
+                    texts[source_id] = self._source_cache[source_id]
+        
+        missing = [source_id for source_id in dict.fromkeys(source_ids) if source_id not in texts]
+        if missing:
+            for source in self.sources.find({"_id": {"$in": missing}}, {"text": 1, "text_encoding": 1}):
+                texts[source["_id"]] = decode_text(source["text"], source["text_encoding"])
+            with self._source_cache_lock:
+                for source_id in missing:
+                    if source_id in texts:
+                        self._source_cache[source_id] = texts[source_id]
+                while len(self._source_cache) > SOURCE_CACHE_SIZE:
+                    self._source_cache.popitem(last=False)
+        return texts
+    
+    def materialize_documents(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """span으로 저장된 Document의 raw_text를 원문에서 잘라 채움 (원문은 한 번씩만 조회)"""
+        spans = [doc for doc in documents if doc.get("source_id") is not None and "span_start" in doc]
+        if spans:
+            texts = self.get_source_texts([doc["source_id"] for doc in spans])
+            for doc in spans:
+                text = texts.get(doc["source_id"])
+                if text is not None:
+                    doc["raw_text"] = text[doc["span_start"]:doc["span_end"]]
+        return documents
+    
+    def get_context_window(self, document: Dict[str, Any], before: int = 500,
+                           after: int = 500) -> str:
+        """검색된 청크 앞뒤로 넓힌 문맥 (span Document는 원문에서, 나머지는 raw_text)"""
+        if document.get("source_id") is None or "span_start" not in document:
+            return document.get("raw_text", "")
+        text = self.get_source_texts([document["source_id"]]).get(document["source_id"])
+        if text is None:
+            return document.get("raw_text", "")
+        return text[max(0, document["span_start"] - before):document["span_end"] + after]
+    
+    def _encode_embedding(self, text_embedding: List[float]):
+        """설정된 저장 형식(embedding_storage_format)으로 임베딩 변환"""
+        return encode_embedding(text_embedding, self.config.embedding_storage_format)
+    
+    def invalidate_vector_cache(self, folder_id: ObjectId = None):
+        """폴더의 임베딩 행렬 캐시 무효화 (folder_id가 없으면 전체)"""
+        if self.vector_cache is not None:
+            self.vector_cache.invalidate(self._cache_namespace, folder_id)
+    
+    def get_documents_by_ids(self, document_ids: List[ObjectId],
+                             projection: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """_id 목록으로 Document를 한 번에 조회 (요청한 순서 유지, raw_text를 요청하면 span 본문 채움)"""
+        if not document_ids:
+            return []
+        
+        documents = {
+            doc["_id"]: doc
+            for doc in self.documents.find({"_id": {"$in": list(document_ids)}}, projection)
+        }
+        ordered = [documents[doc_id] for doc_id in document_ids if doc_id in documents]
+        if projection is None or projection.get("raw_text"):
+            self.materialize_documents(ordered)
+        return ordered
     
     def vector_search(self, query_embedding: List[float], 
                      folder_id: ObjectId = None, k: int = 5) -> List[Dict[str, Any]]:
-        """벡터 유사도 검색 (간단한 구현)"""
+        """벡터 유사도 검색 (2단계: _id/임베딩으로 점수 계산 → 상위 k개만 본문 조회)"""
         # 실제 운영에서는 MongoDB Atlas Search나 전용 벡터 DB 사용 권장
-        query = {}
+        query_vector = normalize_vector(query_embedding)
+        if query_vector is None or k <= 0:
+            return []
+        
+        # 1단계: 점수 계산 (캐시된 행렬 또는 스트리밍 스캔)
+        if self.vector_cache is not None:
+            matrix = self._get_embedding_matrix(folder_id, query_vector.shape[0])
+            hits = matrix.top_k(query_vector, k)
+        else:
+            hits = self._stream_top_k(folder_id, query_vector, k)
+        
+        # 2단계: 상위 k개 문서의 페이로드만 $in 한 번으로 조회
+        similarities = dict(hits)
+        documents = self.get_documents_by_ids(
+            [doc_id for doc_id, _ in hits], VECTOR_PAYLOAD_PROJECTION
+        )
+        
+        return [
+            {"document": doc, "similarity": similarities[doc["_id"]]}
+            for doc in documents
+        ]
+    
+    def vector_search_batch(self, query_embeddings: List[List[float]],
+                            folder_id: ObjectId = None, k: int = 5) -> List[List[Dict[str, Any]]]:
+        """여러 쿼리 벡터를 한 번에 검색 (행렬 곱 1회 + 페이로드 $in 조회 1회)
+        
+        결과는 쿼리 순서대로 vector_search와 같은 형식의 리스트입니다.
+        노름이 0인 쿼리는 빈 리스트를 반환합니다.
+        """
+        normalized = [normalize_vector(embedding) for embedding in query_embeddings]
+        valid = [i for i, vector in enumerate(normalized) if vector is not None]
+        results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+        if not valid or k <= 0:
+            return results
+        
+        dimension = normalized[valid[0]].shape[0]
+        valid = [i for i in valid if normalized[i].shape[0] == dimension]
+        query_matrix = np.vstack([normalized[i] for i in valid])
+        
+        # 1단계: 모든 쿼리 점수 계산
+        if self.vector_cache is not None:
+            matrix = self._get_embedding_matrix(folder_id, dimension)
+            batch_hits = matrix.top_k_batch(query_matrix, k)
+        else:
+            batch_hits = self._stream_top_k_batch(folder_id, query_matrix, k)
+        
+        # 2단계: 모든 쿼리의 상위 문서를 한 번에 조회
+        needed_ids = list(dict.fromkeys(doc_id for hits in batch_hits for doc_id, _ in hits))
+        documents = {
+            doc["_id"]: doc
+            for doc in self.get_documents_by_ids(needed_ids, VECTOR_PAYLOAD_PROJECTION)
+        }
+        
+        for i, hits in zip(valid, batch_hits):
+            results[i] = [
+                {"document": documents[doc_id], "similarity": similarity}
+                for doc_id, similarity in hits if doc_id in documents
+            ]
+        return results
+    
+    def _embedding_query(self, folder_id: Optional[ObjectId]) -> Dict[str, Any]:
+        """임베딩이 있는 문서 조회 조건 (활성 투영 버전의 문서만)"""
+        query = {
+            "text_embedding": {"$exists": True, "$ne": []},
+            **embedding_version_filter(self.config.embedding_projection_version)
+        }
         if folder_id:
             query["folder_id"] = folder_id
+        return query
+    
+    def _get_embedding_matrix(self, folder_id: Optional[ObjectId], 
+                              dimension: int) -> EmbeddingMatrix:
+        """폴더의 임베딩 행렬 조회 (캐시 미스 시 MongoDB에서 로드)"""
+        key = (self._cache_namespace, folder_id, dimension)
+        return self.vector_cache.get_or_load(
+            key, lambda: self._load_embedding_matrix(folder_id, dimension)
+        )
+    
+    def _load_embedding_matrix(self, folder_id: Optional[ObjectId], 
+                               dimension: int) -> EmbeddingMatrix:
+        """MongoDB에서 _id와 임베딩만 읽어 정규화 행렬 생성 (스냅샷이 있으면 우선 사용)"""
+        if self.config.vector_snapshot_enabled and folder_id:
+            matrix = self._load_snapshot_matrix(folder_id, dimension)
+            if matrix is not None:
+                return matrix
+        
+        cursor = self.documents.find(self._embedding_query(folder_id), VECTOR_SCORING_PROJECTION)
+        rows = ((doc["_id"], decode_document_embedding(doc)) for doc in cursor)
+        return EmbeddingMatrix.from_rows(rows, dimension)
+    
+    def _load_snapshot_matrix(self, folder_id: ObjectId, 
+                              dimension: int) -> Optional[SegmentedEmbeddingMatrix]:
+        """mmap 스냅샷 + 기준점 이후 갱신된 문서로 행렬 구성
+        
+        스냅샷에 있던 문서가 갱신되었으면 스냅샷 행은 제외하고 새 임베딩을 사용합니다.
+        삭제 등으로 문서 수가 맞지 않으면 None을 반환하여 전체를 다시 읽게 합니다.
+        """
+        loaded = load_snapshot(
+            snapshot_dir(self.config.vector_snapshot_path, folder_id), dimension,
+            self.config.embedding_projection_version
+        )
+        if loaded is None:
+            return None
+        snapshot, high_water_mark = loaded
+        
+        query = self._embedding_query(folder_id)
+        if high_water_mark is not None:
+            query["updated_at"] = {"$gt": high_water_mark}
+        cursor = self.documents.find(query, VECTOR_SCORING_PROJECTION)
+        delta = EmbeddingMatrix.from_rows(
+            ((doc["_id"], decode_document_embedding(doc)) for doc in cursor), dimension
+        )
+        snapshot.excluded = snapshot.ids.rows_of(list(delta.ids))
+        
+        expected = self.documents.count_documents(self._embedding_query(folder_id))
+        if len(snapshot) + len(delta) != expected:
+            logger.info(f"임베딩 스냅샷 문서 수 불일치, 전체 로드: {folder_id} "
+                        f"(스냅샷 {len(snapshot)} + 변경 {len(delta)} != {expected})")
+            return None
+        
+        return SegmentedEmbeddingMatrix([snapshot, delta])
+    
+    def _stream_top_k(self, folder_id: Optional[ObjectId], query_vector: np.ndarray,
+                      k: int) -> List[tuple]:
+        """전체 행렬을 만들지 않고 블록 단위로 점수를 계산하며 상위 k개 유지"""
+        return self._stream_top_k_batch(folder_id, query_vector[None, :], k)[0]
+    
+    def _stream_top_k_batch(self, folder_id: Optional[ObjectId], query_matrix: np.ndarray,
+                            k: int) -> List[List[tuple]]:
+        """컬렉션을 한 번만 스캔하며 쿼리별 상위 k개 유지"""
+        cursor = self.documents.find(
+            self._embedding_query(folder_id), VECTOR_SCORING_PROJECTION,
+            batch_size=VECTOR_SCORING_BATCH_SIZE
+        )
         
-        # 임베딩이 있는 문서들만 조회
-        query["text_embedding"] = {"$exists": True, "$ne": []}
+        best: List[List[tuple]] = [[] for _ in range(query_matrix.shape[0])]
+        block = []
         
-        documents = list(self.documents.find(query))
+        def merge():
+            nonlocal best
+            if block:
+                matrix = EmbeddingMatrix.from_rows(block, query_matrix.shape[1])
+                best = [
+                    sorted(current + hits, key=lambda hit: hit[1], reverse=True)[:k]
+                    for current, hits in zip(best, matrix.top_k_batch(query_matrix, k))
+                ]
+                block.clear()
         
-        # 코사인 유사도 계산 (단순 구현)
-        results = []
-        query_norm = np.linalg.norm(query_embedding)
+        for doc in cursor:
+            block.append((doc["_id"], decode_document_embedding(doc)))
+            if len(block) >= VECTOR_SCORING_BATCH_SIZE:
+                merge()
+        merge()
         
-        for doc in documents:
-            if doc.get("text_embedding"):
-                doc_embedding = np.array(doc["text_embedding"])
-                doc_norm = np.linalg.norm(doc_embedding)
-                
-                if doc_norm > 0 and query_norm > 0:
-                    similarity = np.dot(query_embedding, doc_embedding) / (query_norm * doc_norm)
-                    results.append({
-                        "document": doc,
-                        "similarity": float(similarity)
-                    })
-        
-        # 유사도 순으로 정렬하고 상위 k개 반환
-        results.sort(key=lambda x: x["similarity"], reverse=True)
-        return results[:k]
+        return best
     
     # ==================== Labels 관련 메서드 ====================
     
-    def insert_labels(self, document_id: ObjectId, folder_id: ObjectId,
-                     main_topic: str, tags: List[str], category: str,
-                     confidence: float = 0.8) -> ObjectId:
-        """Labels 삽입"""
-        label_data = {
+    def _label_data(self, document_id: ObjectId, folder_id: ObjectId,
+                    main_topic: str, tags: List[str], category: str,
+                    confidence: float = 0.8) -> Dict[str, Any]:
+        return {
             "document_id": document_id,
             "folder_id": folder_id,
             "main_topic": main_topic,
@@ -214,10 +613,19 @@ class MongoDBClientV2:
             "created_at": datetime.datetime.utcnow(),
             "updated_at": datetime.datetime.utcnow()
         }
-        
+    
+    def insert_labels(self, document_id: ObjectId, folder_id: ObjectId,
+                     main_topic: str, tags: List[str], category: str,
+                     confidence: float = 0.8) -> ObjectId:
+        """Labels 삽입"""
+        label_data = self._label_data(document_id, folder_id, main_topic, tags, category, confidence)
         result = self.labels.insert_one(label_data)
         return result.inserted_id
     
+    def insert_labels_bulk(self, labels: List[Dict[str, Any]]) -> List[ObjectId]:
+        """Labels 여러 개 삽입 (각 항목은 insert_labels의 인자 dict, 반환 id는 입력 순서)"""
+        return self._insert_bulk(self.labels, [self._label_data(**label) for label in labels])
+    
     def get_labels_by_document(self, document_id: ObjectId) -> List[Dict[str, Any]]:
         """Document별 Labels 조회"""
         return list(self.labels.find({"document_id": document_id}))
@@ -261,11 +669,10 @@ class MongoDBClientV2:
     
     # ==================== QAPairs 관련 메서드 ====================
     
-    def insert_qa_pair(self, document_id: ObjectId, folder_id: ObjectId,
+    def _qa_pair_data(self, document_id: ObjectId, folder_id: ObjectId,
                       question: str, answer: str, question_type: str = "general",
-                      difficulty: str = "medium") -> ObjectId:
-        """QAPair 삽입"""
-        qa_data = {
+                      difficulty: str = "medium") -> Dict[str, Any]:
+        return {
             "document_id": document_id,
             "folder_id": folder_id,
             "question": question,
@@ -275,10 +682,19 @@ class MongoDBClientV2:
             "created_at": datetime.datetime.utcnow(),
             "updated_at": datetime.datetime.utcnow()
         }
-        
+    
+    def insert_qa_pair(self, document_id: ObjectId, folder_id: ObjectId,
+                      question: str, answer: str, question_type: str = "general",
+                      difficulty: str = "medium") -> ObjectId:
+        """QAPair 삽입"""
+        qa_data = self._qa_pair_data(document_id, folder_id, question, answer, question_type, difficulty)
         result = self.qa_pairs.insert_one(qa_data)
         return result.inserted_id
     
+    def insert_qa_pairs_bulk(self, qa_pairs: List[Dict[str, Any]]) -> List[ObjectId]:
+        """QAPair 여러 개 삽입 (각 항목은 insert_qa_pair의 인자 dict, 반환 id는 입력 순서)"""
+        return self._insert_bulk(self.qa_pairs, [self._qa_pair_data(**qa) for qa in qa_pairs])
+    
     def get_qa_pairs_by_document(self, document_id: ObjectId) -> List[Dict[str, Any]]:
         """Document별 QA 쌍 조회"""
         return list(self.qa_pairs.find({"document_id": document_id}))
@@ -342,9 +758,9 @@ class MongoDBClientV2:
         qa_count = self.qa_pairs.count_documents({"folder_id": folder_id})
         
         # 최근 활동
-        recent_documents = list(self.documents.find(
+        recent_documents = self.materialize_documents(list(self.documents.find(
             {"folder_id": folder_id}
-        ).sort("created_at", DESCENDING).limit(5))
+        ).sort("created_at", DESCENDING).limit(5)))
         
         return {
             "folder_id": str(folder_id),
@@ -377,7 +793,7 @@ class MongoDBClientV2:
     
     def get_all_chunks(self) -> List[Dict[str, Any]]:
         """기존 호환성: 모든 chunks(documents) 조회"""
-        documents = list(self.documents.find())
+        documents = self.materialize_documents(list(self.documents.find()))
         
         # 기존 형식으로 변환
         chunks = []
@@ -0,0 +1,81 @@
+"""
+임베딩 저장 형식 코덱
+CREATED [2026-10-18]: Document.text_embedding의 BSON Binary 저장 지원
+
+형식:
+- array: 기존 BSON double 배열 (기본값, 호환성)
+- float32: 원시 float32 바이트
+- float16: 원시 float16 바이트 (용량 1/4)
+- int8: 스칼라 양자화 int8 바이트 + scale (용량 1/8)
+
+Binary 형식은 embedding_encoding 필드에 dtype/dim/scale을 함께 기록하며,
+읽을 때는 두 형식을 모두 지원합니다.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from bson.binary import Binary
+
+EMBEDDING_FORMATS = ("array", "float32", "float16", "int8")
+
+_BINARY_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float16": np.dtype("<f2"),
+    "int8": np.dtype("i1")
+}
+
+
+def encode_embedding(embedding: List[float],
+                     storage_format: str = "array") -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """임베딩을 저장 형식으로 변환하여 (text_embedding 값, embedding_encoding) 반환"""
+    if storage_format not in EMBEDDING_FORMATS:
+        raise ValueError(f"Unsupported embedding storage format: {storage_format}")
+
+    if embedding is None or len(embedding) == 0:
+        return [], None
+
+    if storage_format == "array":
+        if isinstance(embedding, np.ndarray):
+            return embedding.astype(float).tolist(), None
+        return list(embedding), None
+
+    vector = np.asarray(embedding, dtype=np.float32)
+    encoding = {"dtype": storage_format, "dim": int(vector.shape[0])}
+
+    if storage_format == "int8":
+        max_abs = float(np.max(np.abs(vector)))
+        scale = max_abs / 127.0 if max_abs > 0 else 1.0
+        vector = np.clip(np.rint(vector / scale), -127, 127)
+        encoding["scale"] = scale
+
+    data = vector.astype(_BINARY_DTYPES[storage_format]).tobytes()
+    return Binary(data), encoding
+
+
+def decode_embedding(value: Any, encoding: Optional[Dict[str, Any]] = None) -> Optional[np.ndarray]:
+    """저장된 임베딩을 1차원 배열로 변환 (배열/Binary 형식 모두 지원)
+
+    float32 Binary는 np.frombuffer로 복사 없이 읽기 전용 뷰를 반환합니다.
+    float16/int8은 float32로 변환하면서 복사됩니다.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        dtype = (encoding or {}).get("dtype", "float32")
+        vector = np.frombuffer(value, dtype=_BINARY_DTYPES[dtype])
+        if dtype == "float32":
+            return vector
+        vector = vector.astype(np.float32)
+        if dtype == "int8":
+            vector *= np.float32(encoding.get("scale", 1.0))
+        return vector
+
+    if len(value) == 0:
+        return None
+    return np.asarray(value, dtype=np.float32)
+
+
+def decode_document_embedding(document: Dict[str, Any]) -> Optional[np.ndarray]:
+    """Document에서 임베딩 추출"""
+    return decode_embedding(document.get("text_embedding"), document.get("embedding_encoding"))
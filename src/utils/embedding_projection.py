@@ -0,0 +1,169 @@
+"""
+임베딩 차원 축소
+CREATED [2026-10-18]: 벡터 저장소 메모리/디스크 사용량 절감을 위한 선택적 투영 단계
+
+방식:
+- pca: Document 컬렉션 표본으로 학습한 PCA 주성분으로 투영
+  (주성분은 평균을 뺀 표본으로 학습하고, 변환 시에는 내적 순위 보존을 위해 평균을 빼지 않음)
+- truncate: 앞쪽 d개 성분만 사용 (Matryoshka 학습 모델, 예: text-embedding-3-*)
+
+투영은 내용 해시가 포함된 버전 문자열로 저장되며, 문서에는 embedding_version
+필드로 기록됩니다. 검색은 활성 버전과 같은 문서만 대상으로 하므로
+서로 다른 공간의 벡터가 섞이지 않습니다.
+
+파일 구조:
+    <root>/<version>.npz   components, 메타데이터(JSON)
+"""
+
+from typing import Any, Dict, List, Optional
+import datetime
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+from bson import ObjectId
+from src.utils.embedding_codec import decode_document_embedding
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_METHODS = ("pca", "truncate")
+
+
+def embedding_version_filter(version: Optional[str]) -> Dict[str, Any]:
+    """활성 투영 버전의 문서만 고르는 조건 (버전이 없으면 투영되지 않은 문서만)"""
+    if version:
+        return {"embedding_version": version}
+    return {"embedding_version": {"$exists": False}}
+
+
+class EmbeddingProjection:
+    """원본 임베딩 → 축소 임베딩 선형 투영"""
+
+    def __init__(self, method: str, input_dim: int, output_dim: int,
+                 components: Optional[np.ndarray] = None,
+                 metadata: Optional[Dict[str, Any]] = None):
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"Unsupported projection method: {method}")
+        if not 0 < output_dim <= input_dim:
+            raise ValueError(f"output_dim must be in 1..{input_dim}, got {output_dim}")
+        if method == "pca" and (components is None or components.shape != (output_dim, input_dim)):
+            raise ValueError("PCA projection requires (output_dim, input_dim) components")
+
+        self.method = method
+        self.input_dim = input_dim
+        self.output_dim = output_dim
+        self.components = None if components is None else np.asarray(components, dtype=np.float32)
+        self.metadata = metadata or {}
+        self.version = self._compute_version()
+
+    def _compute_version(self) -> str:
+        if self.method == "truncate":
+            return f"truncate-{self.input_dim}-{self.output_dim}"
+        digest = hashlib.sha256(self.components.tobytes()).hexdigest()
+        return f"pca-{self.output_dim}-{digest[:12]}"
+
+    def transform(self, vectors) -> np.ndarray:
+        """(N, input_dim) → (N, output_dim) float32"""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        if matrix.shape[1] != self.input_dim:
+            raise ValueError(f"Expected {self.input_dim}-dimensional embeddings, got {matrix.shape[1]}")
+
+        if self.method == "truncate":
+            return np.ascontiguousarray(matrix[:, :self.output_dim])
+        return matrix @ self.components.T
+
+    def transform_list(self, embeddings: List[List[float]]) -> List[List[float]]:
+        if not embeddings:
+            return []
+        return self.transform(embeddings).tolist()
+
+
+def fit_pca(vectors, output_dim: int) -> EmbeddingProjection:
+    """표본 임베딩으로 PCA 투영 학습 (SVD)"""
+    matrix = np.asarray(vectors, dtype=np.float64)
+    if matrix.ndim != 2 or matrix.shape[0] < output_dim:
+        raise ValueError(f"Need at least {output_dim} sample embeddings to fit PCA")
+
+    _, singular_values, vt = np.linalg.svd(matrix - matrix.mean(axis=0), full_matrices=False)
+    variance = singular_values ** 2
+    explained = float(variance[:output_dim].sum() / variance.sum()) if variance.sum() > 0 else 0.0
+
+    return EmbeddingProjection(
+        "pca", matrix.shape[1], output_dim, components=vt[:output_dim],
+        metadata={
+            "sample_size": int(matrix.shape[0]),
+            "explained_variance_ratio": explained,
+            "fitted_at": datetime.datetime.utcnow().isoformat()
+        }
+    )
+
+
+def truncation(input_dim: int, output_dim: int) -> EmbeddingProjection:
+    """Matryoshka 방식 절단 투영"""
+    return EmbeddingProjection("truncate", input_dim, output_dim)
+
+
+def projection_path(root: str, version: str) -> str:
+    return os.path.join(root, f"{version}.npz")
+
+
+def save_projection(projection: EmbeddingProjection, root: str) -> str:
+    """<root>/<version>.npz로 저장 (임시 파일 후 교체)하고 경로 반환"""
+    os.makedirs(root, exist_ok=True)
+    path = projection_path(root, projection.version)
+    manifest = {
+        "version": projection.version,
+        "method": projection.method,
+        "input_dim": projection.input_dim,
+        "output_dim": projection.output_dim,
+        **projection.metadata
+    }
+    arrays = {"manifest": np.array(json.dumps(manifest))}
+    if projection.method == "pca":
+        arrays["components"] = projection.components
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_projection(root: str, version: str) -> EmbeddingProjection:
+    """저장된 투영 로드 (내용이 버전과 다르면 ValueError)"""
+    with np.load(projection_path(root, version)) as data:
+        manifest = json.loads(str(data["manifest"]))
+        projection = EmbeddingProjection(
+            manifest["method"], manifest["input_dim"], manifest["output_dim"],
+            components=data["components"] if "components" in data else None,
+            metadata={key: value for key, value in manifest.items()
+                      if key not in ("version", "method", "input_dim", "output_dim")}
+        )
+
+    if projection.version != version:
+        raise ValueError(f"Projection file does not match version {version} ({projection.version})")
+    return projection
+
+
+def sample_document_embeddings(db_client, sample_size: int,
+                               folder_id: Optional[ObjectId] = None) -> np.ndarray:
+    """투영되지 않은 원본 임베딩을 Document 컬렉션에서 무작위 표본 추출"""
+    match = {"text_embedding": {"$exists": True, "$ne": []}, **embedding_version_filter(None)}
+    if folder_id:
+        match["folder_id"] = folder_id
+
+    cursor = db_client.documents.aggregate([
+        {"$match": match},
+        {"$sample": {"size": sample_size}},
+        {"$project": {"text_embedding": 1, "embedding_encoding": 1}}
+    ])
+    vectors = [vector for vector in (decode_document_embedding(doc) for doc in cursor)
+               if vector is not None]
+    if not vectors:
+        return np.empty((0, 0), dtype=np.float32)
+
+    dimension = len(vectors[0])
+    return np.vstack([vector for vector in vectors if len(vector) == dimension])
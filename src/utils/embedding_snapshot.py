@@ -0,0 +1,171 @@
+"""
+임베딩 스냅샷
+CREATED [2026-10-18]: 폴더별 정규화 임베딩을 .npy로 내보내고 워커에서 mmap으로 공유
+
+디렉토리 구조:
+    <root>/<folder_id>/embeddings.npy   (N, d) float32, 각 행은 L2 정규화됨
+    <root>/<folder_id>/ids.npy          (N, 12) uint8, Document _id (ObjectId 바이트)
+    <root>/<folder_id>/manifest.json    문서 수, 차원, 투영 버전, updated_at 기준점
+
+워커는 np.load(mmap_mode='r')로 파일을 열기 때문에 여러 uvicorn 워커가
+같은 OS 페이지 캐시를 공유합니다. 로드 후에는 기준점 이후 갱신된 문서만
+MongoDB에서 읽어 따라잡습니다.
+"""
+
+from typing import Any, Dict, Optional
+import datetime
+import json
+import logging
+import os
+import numpy as np
+from bson import ObjectId
+from src.utils.embedding_codec import decode_document_embedding
+from src.utils.embedding_projection import embedding_version_filter, load_projection
+from src.utils.vector_cache import EmbeddingMatrix
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+IDS_FILE = "ids.npy"
+
+
+class ObjectIdArray:
+    """(N, 12) uint8 배열을 ObjectId 시퀀스로 보여주는 래퍼 (조회 시에만 변환)"""
+
+    def __init__(self, raw: np.ndarray):
+        self.raw = raw
+
+    def __len__(self) -> int:
+        return self.raw.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return 0 if isinstance(self.raw, np.memmap) else self.raw.nbytes
+
+    def __getitem__(self, index: int) -> ObjectId:
+        return ObjectId(self.raw[index].tobytes())
+
+    def rows_of(self, document_ids) -> np.ndarray:
+        """주어진 _id들이 있는 행 번호"""
+        if not len(document_ids) or not len(self):
+            return np.empty(0, dtype=np.int64)
+        keys = np.frombuffer(b"".join(doc_id.binary for doc_id in document_ids), dtype="S12")
+        stored = np.ascontiguousarray(self.raw).view("S12").reshape(-1)
+        return np.flatnonzero(np.isin(stored, keys))
+
+
+def snapshot_dir(root: str, folder_id: ObjectId) -> str:
+    return os.path.join(root, str(folder_id))
+
+
+def write_snapshot(directory: str, matrix: EmbeddingMatrix, folder_id: ObjectId,
+                   high_water_mark: Optional[datetime.datetime],
+                   embedding_version: Optional[str] = None):
+    """행렬과 _id를 스냅샷 파일로 저장 (임시 파일 후 교체, manifest는 마지막)"""
+    os.makedirs(directory, exist_ok=True)
+
+    raw_ids = np.zeros((len(matrix.ids), 12), dtype=np.uint8)
+    for row, doc_id in enumerate(matrix.ids):
+        raw_ids[row] = np.frombuffer(doc_id.binary, dtype=np.uint8)
+
+    for name, array in ((EMBEDDINGS_FILE, matrix.matrix), (IDS_FILE, raw_ids)):
+        tmp_path = os.path.join(directory, f"{name}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp_path, os.path.join(directory, name))
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "folder_id": str(folder_id),
+        "dimension": matrix.dimension,
+        "embedding_version": embedding_version,
+        "count": matrix.matrix.shape[0],
+        "updated_at_high_water_mark": high_water_mark.isoformat() if high_water_mark else None,
+        "exported_at": datetime.datetime.utcnow().isoformat()
+    }
+    tmp_path = os.path.join(directory, f"{MANIFEST_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, MANIFEST_FILE))
+
+
+def read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def load_snapshot(directory: str, dimension: int, embedding_version: Optional[str] = None):
+    """스냅샷을 mmap으로 열어 (EmbeddingMatrix, updated_at 기준점) 반환
+
+    스냅샷이 없거나 차원/투영 버전/문서 수가 맞지 않으면 None을 반환합니다.
+    """
+    manifest = read_manifest(directory)
+    if manifest is None or manifest.get("version") != SNAPSHOT_VERSION:
+        return None
+    if manifest.get("dimension") != dimension:
+        return None
+    if manifest.get("embedding_version") != embedding_version:
+        return None
+
+    try:
+        matrix = np.load(os.path.join(directory, EMBEDDINGS_FILE), mmap_mode="r")
+        raw_ids = np.load(os.path.join(directory, IDS_FILE), mmap_mode="r")
+    except (FileNotFoundError, ValueError) as e:
+        logger.warning(f"⚠️ 임베딩 스냅샷 로드 실패 ({directory}): {str(e)}")
+        return None
+
+    count = manifest.get("count")
+    if matrix.shape != (count, dimension) or raw_ids.shape != (count, 12):
+        # 다른 프로세스가 내보내는 도중이면 이번에는 MongoDB에서 로드
+        logger.warning(f"⚠️ 임베딩 스냅샷 크기 불일치: {directory}")
+        return None
+
+    high_water_mark = manifest.get("updated_at_high_water_mark")
+    return (
+        EmbeddingMatrix(matrix, ObjectIdArray(raw_ids)),
+        datetime.datetime.fromisoformat(high_water_mark) if high_water_mark else None
+    )
+
+
+def snapshot_dimension(config, dimension: Optional[int] = None) -> int:
+    """스냅샷 행렬 차원 (투영 버전이 설정되어 있으면 그 투영의 output_dim)
+
+    투영 문서를 다른 차원으로 내보내면 load_snapshot이 스냅샷을 거부하여 모든 워커가
+    전체 로드로 돌아가므로, 투영과 맞지 않는 dimension은 ValueError로 거부합니다.
+    """
+    if not config.embedding_projection_version:
+        return dimension or config.vector_dimension
+    projection = load_projection(config.embedding_projection_path, config.embedding_projection_version)
+    if dimension is not None and dimension != projection.output_dim:
+        raise ValueError(f"Dimension {dimension} does not match projection "
+                         f"{projection.version} (output_dim {projection.output_dim})")
+    return projection.output_dim
+
+
+def export_folder_snapshot(db_client, folder_id: ObjectId, root: str, dimension: int) -> int:
+    """폴더의 임베딩을 MongoDB에서 읽어 스냅샷으로 저장 (저장한 문서 수 반환)"""
+    embedding_version = db_client.config.embedding_projection_version
+    cursor = db_client.documents.find(
+        {"folder_id": folder_id, "text_embedding": {"$exists": True, "$ne": []},
+         **embedding_version_filter(embedding_version)},
+        {"text_embedding": 1, "embedding_encoding": 1, "updated_at": 1}
+    )
+    high_water_mark = None
+
+    def rows():
+        nonlocal high_water_mark
+        for doc in cursor:
+            updated_at = doc.get("updated_at")
+            if updated_at and (high_water_mark is None or updated_at > high_water_mark):
+                high_water_mark = updated_at
+            yield doc["_id"], decode_document_embedding(doc)
+
+    matrix = EmbeddingMatrix.from_rows(rows(), dimension)
+    write_snapshot(snapshot_dir(root, folder_id), matrix, folder_id, high_water_mark, embedding_version)
+    logger.info(f"✅ 임베딩 스냅샷 저장: {folder_id} ({len(matrix)}개)")
+    return len(matrix)
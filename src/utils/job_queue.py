@@ -0,0 +1,282 @@
+"""
+MongoDB 기반 작업 큐
+CREATED [2026-10-18]: 업로드 처리를 API 요청 밖의 백그라운드 워커로 분리
+
+동작:
+- enqueue()로 작업 문서를 queued 상태로 저장하고 id를 바로 반환
+- 워커는 find_one_and_update로 가장 오래된 queued 작업을 원자적으로 가져감 (여러 프로세스 공유 가능)
+- 단계별 진행 상황과 소요 시간은 작업 문서의 stages.<단계> 필드에 기록
+- 실행 중인 작업은 heartbeat_at을 주기적으로 갱신하고, 갱신이 끊긴 작업(프로세스 재시작 등)은
+  다시 queued로 돌려 이어서 처리 (max_attempts를 넘으면 failed로 바꾸고 종류별 on_abandoned 훅으로 정리)
+- 핸들러가 예외를 내도 max_attempts 전까지는 다시 queued로 돌려 재시도
+"""
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+import datetime
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+
+class JobQueue:
+    """작업 컬렉션 래퍼"""
+
+    def __init__(self, collection, max_attempts: int = 3):
+        self.collection = collection
+        self.max_attempts = max_attempts
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], job_id: Optional[str] = None) -> str:
+        """작업 등록 (job_id를 미리 정해 다른 기록에 연결할 수 있음)"""
+        now = datetime.datetime.utcnow()
+        job_id = job_id or uuid.uuid4().hex
+        self.collection.insert_one({
+            "_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "payload": payload,
+            "stages": {},
+            "attempts": 0,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "heartbeat_at": None,
+            "worker": None
+        })
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one({"_id": job_id})
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """가장 오래된 queued 작업을 running으로 바꾸어 반환 (없으면 None)"""
+        now = datetime.datetime.utcnow()
+        return self.collection.find_one_and_update(
+            {"status": "queued"},
+            {"$set": {"status": "running", "started_at": now, "heartbeat_at": now,
+                      "worker": worker, "stages": {}},
+             "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def heartbeat(self, job_ids: Set[str]):
+        if job_ids:
+            self.collection.update_many(
+                {"_id": {"$in": list(job_ids)}, "status": "running"},
+                {"$set": {"heartbeat_at": datetime.datetime.utcnow()}}
+            )
+
+    def update_stage(self, job_id: str, stage: str, **fields):
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {f"stages.{stage}.{key}": value for key, value in fields.items()}}
+        )
+
+    def complete(self, job_id: str, result: Dict[str, Any]):
+        self._finish(job_id, "completed", result=result)
+
+    def fail(self, job_id: str, error: str):
+        self._finish(job_id, "failed", error=error)
+
+    def retry(self, job_id: str, error: str):
+        """실패한 시도를 기록하고 다시 대기열에 넣음 (시도 횟수는 claim 때 증가)"""
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": "queued", "error": error, "worker": None, "heartbeat_at": None}}
+        )
+
+    def _finish(self, job_id: str, status: str, **fields):
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": status, "finished_at": datetime.datetime.utcnow(), **fields}}
+        )
+
+    def _stale_query(self, stale_seconds: float) -> Dict[str, Any]:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=stale_seconds)
+        return {"status": "running", "heartbeat_at": {"$lt": cutoff}}
+
+    def fail_stale(self, stale_seconds: float) -> List[Dict[str, Any]]:
+        """heartbeat가 끊긴 채 시도 횟수를 다 쓴 running 작업을 failed로 바꾸어 반환
+
+        한 작업씩 find_one_and_update로 바꾸므로 여러 프로세스가 같은 작업을 중복 정리하지 않습니다.
+        """
+        failed = []
+        while True:
+            job = self.collection.find_one_and_update(
+                {**self._stale_query(stale_seconds), "attempts": {"$gte": self.max_attempts}},
+                {"$set": {"status": "failed", "finished_at": datetime.datetime.utcnow(),
+                          "error": f"Worker stopped responding after {self.max_attempts} attempts"}},
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                return failed
+            failed.append(job)
+
+    def requeue_stale(self, stale_seconds: float) -> int:
+        """heartbeat가 끊긴 running 작업을 queued로 되돌림 (시도 횟수를 다 쓴 작업은 fail_stale이 처리)"""
+        result = self.collection.update_many(
+            {**self._stale_query(stale_seconds), "attempts": {"$lt": self.max_attempts}},
+            {"$set": {"status": "queued", "worker": None}}
+        )
+        if result.modified_count:
+            logger.warning(f"⚠️ 중단된 작업 {result.modified_count}개를 다시 대기열에 넣음")
+        return result.modified_count
+
+
+class JobProgress:
+    """핸들러가 단계별 진행 상황을 기록하는 객체
+
+    final_attempt가 False면 이번 시도가 실패해도 작업이 다시 실행되므로 핸들러는
+    재시도에 필요한 입력(업로드 파일 등)을 지우지 않아야 합니다.
+    """
+
+    def __init__(self, queue: JobQueue, job_id: str, final_attempt: bool = True):
+        self.queue = queue
+        self.job_id = job_id
+        self.final_attempt = final_attempt
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """with 블록을 한 단계로 기록 (시작/종료 시각, 소요 시간, 실패 시 오류)"""
+        start = time.perf_counter()
+        self.queue.update_stage(self.job_id, name, status="running",
+                                started_at=datetime.datetime.utcnow())
+        try:
+            yield
+        except Exception as e:
+            self.queue.update_stage(self.job_id, name, status="failed", error=str(e),
+                                    finished_at=datetime.datetime.utcnow(),
+                                    seconds=round(time.perf_counter() - start, 3))
+            raise
+        self.queue.update_stage(self.job_id, name, status="completed",
+                                finished_at=datetime.datetime.utcnow(),
+                                seconds=round(time.perf_counter() - start, 3))
+
+    def update(self, name: str, **fields):
+        """단계 진행 중 수치 갱신 (예: 저장한 청크 수)"""
+        self.queue.update_stage(self.job_id, name, **fields)
+
+
+class JobWorkerPool:
+    """작업 종류별 핸들러를 실행하는 워커 스레드 풀
+
+    핸들러는 handler(job, progress)로 호출되며 반환한 dict가 작업 결과로 저장됩니다.
+    예외가 나면 시도 횟수가 남은 작업은 다시 대기열에 넣고, 마지막 시도면 failed로 기록합니다.
+    프로세스가 중단되어 핸들러가 정리하지 못한 채 failed가 된 작업은 on_abandoned[kind](job)로 정리합니다.
+    """
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, Callable[[Dict[str, Any], JobProgress], Dict[str, Any]]],
+                 workers: int = 2, poll_interval: float = 1.0, stale_seconds: float = 300.0,
+                 on_abandoned: Optional[Dict[str, Callable[[Dict[str, Any]], None]]] = None):
+        self.queue = queue
+        self.handlers = handlers
+        self.on_abandoned = on_abandoned or {}
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._running: Set[str] = set()
+        self._lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop_event.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        self._threads.append(threading.Thread(target=self._watch, name="job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        self._wake_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """새 작업이 들어왔음을 알려 대기 중인 워커를 깨움"""
+        self._wake_event.set()
+
+    def _watch(self):
+        """실행 중인 작업의 heartbeat 갱신과 중단된 작업 복구"""
+        interval = max(1.0, self.stale_seconds / 3)
+        while not self._stop_event.is_set():
+            try:
+                with self._lock:
+                    running = set(self._running)
+                self.queue.heartbeat(running)
+                for job in self.queue.fail_stale(self.stale_seconds):
+                    self._abandon(job)
+                if self.queue.requeue_stale(self.stale_seconds):
+                    self.notify()
+            except Exception as e:
+                logger.error(f"❌ 작업 heartbeat 실패: {str(e)}")
+            self._stop_event.wait(interval)
+
+    def _abandon(self, job: Dict[str, Any]):
+        """중단된 채 실패 처리된 작업의 정리 훅 실행"""
+        logger.error(f"❌ 작업 실패 (워커 응답 없음): {job['_id']} ({job['kind']})")
+        hook = self.on_abandoned.get(job["kind"])
+        if hook is None:
+            return
+        try:
+            hook(job)
+        except Exception as e:
+            logger.error(f"❌ 중단된 작업 정리 실패: {job['_id']}: {str(e)}")
+
+    def _work(self):
+        while not self._stop_event.is_set():
+            try:
+                job = self.queue.claim(self.name)
+            except Exception as e:
+                logger.error(f"❌ 작업 가져오기 실패: {str(e)}")
+                job = None
+            if job is None:
+                self._wake_event.wait(self.poll_interval)
+                self._wake_event.clear()
+                continue
+            self.run(job)
+
+    def run(self, job: Dict[str, Any]):
+        """작업 하나 실행 (결과/오류를 작업 문서에 기록)"""
+        job_id = job["_id"]
+        final_attempt = job.get("attempts", 1) >= self.queue.max_attempts
+        with self._lock:
+            self._running.add(job_id)
+        try:
+            handler = self.handlers.get(job["kind"])
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            result = handler(job, JobProgress(self.queue, job_id, final_attempt))
+            self.queue.complete(job_id, result or {})
+            logger.info(f"✅ 작업 완료: {job_id} ({job['kind']})")
+        except Exception as e:
+            if final_attempt:
+                logger.error(f"❌ 작업 실패: {job_id} ({job['kind']}): {str(e)}")
+                self.queue.fail(job_id, str(e))
+            else:
+                logger.warning(f"⚠️ 작업 재시도 예정: {job_id} ({job['kind']}): {str(e)}")
+                self.queue.retry(job_id, str(e))
+                self.notify()
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
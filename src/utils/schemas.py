@@ -19,12 +19,45 @@ class MongoSchemas:
             "folder_id": ObjectId,  # 폴더 참조 (필수)
             "chunk_sequence": int,  # 기존 chunk_id를 대체
             "raw_text": str,  # 기존 content → raw_text
-            "text_embedding": List[float],  # 벡터 DB에서 이관
+            "text_embedding": List[float],  # 벡터 DB에서 이관 (또는 BSON Binary)
+            "embedding_encoding": Optional[Dict[str, Any]],  # Binary 저장 시 dtype/dim/scale
             "metadata": Dict[str, Any],  # 기존 metadata 유지
+            "source_id": Optional[ObjectId],  # span 저장 시 Sources 참조 (raw_text는 빈 문자열)
+            "span_start": Optional[int],  # 원문 내 시작 위치
+            "span_end": Optional[int],  # 원문 내 끝 위치
             "created_at": datetime,  # 기존 유지
             "updated_at": datetime  # 신규 추가
         }
     
+    @staticmethod
+    def get_source_schema() -> Dict[str, Any]:
+        """Sources 컬렉션 스키마 (청크 span이 참조하는 클렌징된 원문)"""
+        return {
+            "_id": ObjectId,  # 자동 생성
+            "folder_id": ObjectId,  # 폴더 참조
+            "text": bytes,  # 압축된 원문 (BSON Binary)
+            "text_encoding": Dict[str, Any],  # codec/length/bytes/sha256
+            "search_terms": str,  # $text 인덱스용 원문 고유 단어 목록
+            "metadata": Dict[str, Any],  # 원본 파일 metadata
+            "created_at": datetime
+        }
+    
+    @staticmethod
+    def get_file_schema() -> Dict[str, Any]:
+        """Files 컬렉션 스키마 (업로드 파일 내용 해시 → 처리 결과)"""
+        return {
+            "_id": str,  # 파일 내용 sha256
+            "filename": str,  # 처음 업로드한 파일 이름
+            "size": int,  # 바이트
+            "status": str,  # queued, completed, failed
+            "job_id": str,  # 처리한 업로드 작업
+            "folder_ids": List[ObjectId],  # 파일 내용이 들어 있는 폴더
+            "document_ids": Dict[str, List[ObjectId]],  # 폴더 id → 파일에서 만든 Document
+            "result": Optional[Dict[str, Any]],  # 업로드 작업 결과 (청크 수, 라벨/QA 샘플 등)
+            "created_at": datetime,
+            "updated_at": datetime
+        }
+    
     @staticmethod
     def get_labels_schema() -> Dict[str, Any]:
         """Labels 컬렉션 스키마 (기존 labels)"""
@@ -0,0 +1,43 @@
+"""
+원문 텍스트 저장 형식 코덱
+CREATED [2026-10-18]: Sources 컬렉션의 압축 원문 저장 지원
+
+형식:
+- zlib: UTF-8 바이트를 zlib으로 압축한 BSON Binary
+
+청크 Document는 원문을 복사하지 않고 (source_id, span_start, span_end)만 저장하며,
+본문이 필요할 때 원문을 풀어 잘라 씁니다. 압축 원문은 $text 인덱스에 넣을 수 없으므로
+원문의 고유 단어 목록(search_terms)을 따로 저장해 텍스트 검색에 씁니다.
+"""
+
+from typing import Any, Dict, Tuple
+import hashlib
+import zlib
+from bson.binary import Binary
+
+TEXT_ENCODINGS = ("zlib",)
+
+_COMPRESSION_LEVEL = 6
+
+
+def encode_text(text: str) -> Tuple[Binary, Dict[str, Any]]:
+    """원문을 저장 형식으로 변환하여 (text 값, text_encoding) 반환"""
+    data = text.encode("utf-8")
+    return Binary(zlib.compress(data, _COMPRESSION_LEVEL)), {
+        "codec": "zlib",
+        "length": len(text),
+        "bytes": len(data),
+        "sha256": hashlib.sha256(data).hexdigest()
+    }
+
+
+def search_terms(text: str) -> str:
+    """$text 인덱스용 단어 목록 (원문의 고유 단어를 등장 순서대로 한 번씩)"""
+    return " ".join(dict.fromkeys(text.split()))
+
+
+def decode_text(value: Any, encoding: Dict[str, Any]) -> str:
+    codec = encoding.get("codec")
+    if codec not in TEXT_ENCODINGS:
+        raise ValueError(f"Unsupported text encoding: {codec}")
+    return zlib.decompress(bytes(value)).decode("utf-8")
@@ -0,0 +1,83 @@
+"""
+토큰 수 계산
+CREATED [2026-10-18]: 임베딩 배치 구성용 tiktoken 토큰 카운터
+
+tiktoken 인코딩 파일을 받을 수 없는 환경(오프라인 등)에서는
+UTF-8 바이트 수 기반 근사치를 사용합니다.
+
+청커가 이미 센 토큰 수는 remember_token_counts로 알려두면 카운터가
+다시 토큰화하지 않고 그 값을 사용합니다 (임베딩 배치 구성 등). 토큰 수는
+토크나이저(tokenizer_name)별로 기록하므로 다른 토크나이저의 값은 재사용하지 않습니다.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Iterable, Optional, Tuple
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 기억해 둘 ((토크나이저, 텍스트 해시) → 토큰 수) 개수
+_KNOWN_COUNTS_SIZE = 65536
+_known_counts: "OrderedDict[Tuple[str, int], int]" = OrderedDict()
+_known_counts_lock = threading.Lock()
+
+APPROXIMATE_TOKENIZER = "approximate"
+
+
+def remember_token_counts(texts: Iterable[str], counts: Iterable[Optional[int]],
+                          tokenizers: Iterable[Optional[str]]):
+    """이미 계산한 토큰 수를 토크나이저별로 기록 (토큰 수나 토크나이저가 None이면 건너뜀)"""
+    with _known_counts_lock:
+        for text, count, tokenizer in zip(texts, counts, tokenizers):
+            if count is not None and tokenizer is not None:
+                _known_counts[(tokenizer, hash(text))] = count
+        while len(_known_counts) > _KNOWN_COUNTS_SIZE:
+            _known_counts.popitem(last=False)
+
+
+def known_token_count(text: str, tokenizer: str) -> Optional[int]:
+    with _known_counts_lock:
+        return _known_counts.get((tokenizer, hash(text)))
+
+
+def _with_known_counts(counter: Callable[[str], int], tokenizer: str) -> Callable[[str], int]:
+    def count(text: str) -> int:
+        known = known_token_count(text, tokenizer)
+        return known if known is not None else counter(text)
+    return count
+
+
+def approximate_token_count(text: str) -> int:
+    """토크나이저 없이 쓰는 근사치 (영문 약 4자, 한글 약 1자당 1토큰)"""
+    return max(1, len(text.encode("utf-8")) // 3)
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    """모델의 tiktoken 인코딩 (사용할 수 없으면 None)"""
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"⚠️ tiktoken 인코딩 로드 실패, 근사 토큰 수 사용: {str(e)}")
+        return None
+
+
+def tokenizer_name(model: str) -> str:
+    """모델이 쓰는 토크나이저 이름 (같은 이름이면 토큰 수가 같음, 예: cl100k_base)"""
+    encoding = _encoding(model)
+    return encoding.name if encoding is not None else APPROXIMATE_TOKENIZER
+
+
+@lru_cache(maxsize=None)
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """모델에 맞는 토큰 카운터 (tiktoken 사용 불가 시 근사치)"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return _with_known_counts(approximate_token_count, APPROXIMATE_TOKENIZER)
+    return _with_known_counts(lambda text: len(encoding.encode(text, disallowed_special=())), encoding.name)
@@ -0,0 +1,329 @@
+"""
+임베딩 행렬 캐시
+CREATED [2026-10-18]: MongoDBClientV2.vector_search용 프로세스 단위 캐시
+
+기능:
+- 폴더별 L2 정규화된 float32 임베딩 행렬 + _id 배열 보관
+- 행렬-벡터 곱 1회 + argpartition 기반 top-k 선택
+- insert/update/delete 시 폴더 단위 무효화
+- 메모리 상한 초과 시 LRU 방식으로 폴더 단위 축출
+- 디스크 스냅샷(mmap) 행렬 + 이후 변경분을 합친 분할 행렬 지원
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+import threading
+import time
+import logging
+import numpy as np
+from config.database_config import default_db_config
+
+logger = logging.getLogger(__name__)
+
+# 행렬 생성 시 한 번에 float32로 변환하는 행 수
+_BUILD_BLOCK_ROWS = 10000
+
+# 배치 검색 시 한 번에 만드는 점수 행렬 (Q, N)의 최대 원소 수 (float32 기준 약 128MB)
+_BATCH_SCORE_ELEMENTS = 32 * 1024 * 1024
+
+
+def normalize_vector(vector) -> Optional[np.ndarray]:
+    """쿼리 벡터를 float32 단위 벡터로 변환 (노름이 0이면 None)"""
+    array = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = np.linalg.norm(array)
+    if array.size == 0 or norm == 0:
+        return None
+    return array / norm
+
+
+class EmbeddingMatrix:
+    """폴더 단위 정규화 임베딩 행렬"""
+
+    def __init__(self, matrix: np.ndarray, ids, excluded: Optional[np.ndarray] = None):
+        self.matrix = matrix  # (N, d) float32, 각 행은 L2 정규화됨 (np.memmap 가능)
+        self.ids = ids  # (N,) Document _id 배열 (정수 인덱싱 가능한 시퀀스)
+        self.excluded = excluded  # 검색에서 제외할 행 번호 (스냅샷 이후 갱신/삭제된 행)
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Any, Any]], dimension: int) -> "EmbeddingMatrix":
+        """(_id, embedding) 행들로부터 행렬 생성
+
+        차원이 다르거나 노름이 0인 임베딩은 제외합니다.
+        """
+        blocks = []
+        ids = []
+        pending = []
+
+        def flush():
+            if pending:
+                blocks.append(np.asarray(pending, dtype=np.float32))
+                pending.clear()
+
+        for doc_id, embedding in rows:
+            if embedding is None or len(embedding) != dimension:
+                continue
+            pending.append(embedding)
+            ids.append(doc_id)
+            if len(pending) >= _BUILD_BLOCK_ROWS:
+                flush()
+        flush()
+
+        if not blocks:
+            return cls(np.empty((0, dimension), dtype=np.float32), np.empty(0, dtype=object))
+
+        matrix = np.vstack(blocks) if len(blocks) > 1 else blocks[0]
+        norms = np.linalg.norm(matrix, axis=1)
+        valid = norms > 0
+        matrix = matrix[valid] / norms[valid, None]
+        id_array = np.empty(len(ids), dtype=object)
+        id_array[:] = ids
+        return cls(np.ascontiguousarray(matrix, dtype=np.float32), id_array[valid])
+
+    def __len__(self) -> int:
+        excluded = len(self.excluded) if self.excluded is not None else 0
+        return self.matrix.shape[0] - excluded
+
+    @property
+    def dimension(self) -> int:
+        return self.matrix.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        # mmap 행렬은 OS 페이지 캐시를 워커끼리 공유하므로 프로세스 메모리에서 제외
+        matrix_bytes = 0 if isinstance(self.matrix, np.memmap) else self.matrix.nbytes
+        if isinstance(self.ids, np.ndarray) and self.ids.dtype == object:
+            # ObjectId 객체 자체 크기(약 56바이트)까지 포함한 근사치
+            id_bytes = len(self.ids) * 64
+        else:
+            id_bytes = getattr(self.ids, "nbytes", 0)
+        return matrix_bytes + id_bytes
+
+    def top_k(self, query_vector: np.ndarray, k: int) -> List[Tuple[Any, float]]:
+        """정규화된 쿼리 벡터와 코사인 유사도 상위 k개 (_id, score) 반환"""
+        n = self.matrix.shape[0]
+        k = min(k, len(self))
+        if n == 0 or k <= 0:
+            return []
+
+        scores = self.matrix @ query_vector
+        if self.excluded is not None and len(self.excluded):
+            scores[self.excluded] = -np.inf
+        if k < n:
+            candidates = np.argpartition(scores, n - k)[n - k:]
+        else:
+            candidates = np.arange(n)
+        order = candidates[np.argsort(scores[candidates])[::-1]]
+        return [(self.ids[i], float(scores[i])) for i in order]
+
+    def top_k_batch(self, query_matrix: np.ndarray, k: int) -> List[List[Tuple[Any, float]]]:
+        """정규화된 쿼리 행렬 (Q, d)의 행마다 상위 k개 (행렬-행렬 곱)
+
+        점수 행렬 (Q, N)이 너무 커지지 않도록 쿼리를 블록 단위로 나눠 계산합니다.
+        """
+        n = self.matrix.shape[0]
+        k = min(k, len(self))
+        if n == 0 or k <= 0:
+            return [[] for _ in range(query_matrix.shape[0])]
+
+        block_rows = max(1, _BATCH_SCORE_ELEMENTS // n)
+        results = []
+        for start in range(0, query_matrix.shape[0], block_rows):
+            results.extend(self._top_k_block(query_matrix[start:start + block_rows], k))
+        return results
+
+    def _top_k_block(self, query_matrix: np.ndarray, k: int) -> List[List[Tuple[Any, float]]]:
+        n = self.matrix.shape[0]
+        scores = query_matrix @ self.matrix.T  # (Q, N)
+        if self.excluded is not None and len(self.excluded):
+            scores[:, self.excluded] = -np.inf
+        if k < n:
+            candidates = np.argpartition(scores, n - k, axis=1)[:, n - k:]
+        else:
+            candidates = np.broadcast_to(np.arange(n), scores.shape)
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1)
+        rows = np.take_along_axis(candidates, order, axis=1)
+        row_scores = np.take_along_axis(candidate_scores, order, axis=1)
+        return [
+            [(self.ids[i], float(score)) for i, score in zip(row, row_score)]
+            for row, row_score in zip(rows, row_scores)
+        ]
+
+
+class SegmentedEmbeddingMatrix:
+    """여러 EmbeddingMatrix를 하나처럼 검색 (스냅샷 + 따라잡기 변경분)"""
+
+    def __init__(self, segments: List[EmbeddingMatrix]):
+        self.segments = [segment for segment in segments if segment.matrix.shape[0]]
+        self.loaded_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(segment.nbytes for segment in self.segments)
+
+    def top_k(self, query_vector: np.ndarray, k: int) -> List[Tuple[Any, float]]:
+        hits = [hit for segment in self.segments for hit in segment.top_k(query_vector, k)]
+        return sorted(hits, key=lambda hit: hit[1], reverse=True)[:k]
+
+    def top_k_batch(self, query_matrix: np.ndarray, k: int) -> List[List[Tuple[Any, float]]]:
+        merged = [[] for _ in range(query_matrix.shape[0])]
+        for segment in self.segments:
+            for hits, segment_hits in zip(merged, segment.top_k_batch(query_matrix, k)):
+                hits.extend(segment_hits)
+        return [sorted(hits, key=lambda hit: hit[1], reverse=True)[:k] for hits in merged]
+
+
+# 동시 로드 직렬화에 쓰는 락 개수
+_LOAD_LOCK_STRIPES = 64
+
+
+class EmbeddingMatrixCache:
+    """폴더별 임베딩 행렬 LRU 캐시 (스레드 안전)
+
+    키는 (namespace, folder_id, dimension) 튜플입니다. folder_id가 None인
+    항목은 전체 컬렉션 행렬이므로 어떤 폴더가 무효화되더라도 함께 버립니다.
+    캐시는 프로세스 단위이므로 다른 워커의 쓰기는 TTL 만료 후 반영됩니다.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, EmbeddingMatrix]" = OrderedDict()
+        self._generations: Dict[Tuple[Any, Any], int] = {}
+        # 키별 락 대신 고정 개수의 락을 키 해시로 나누어 사용 (항목 수와 무관하게 메모리 일정)
+        self._load_locks = [threading.Lock() for _ in range(_LOAD_LOCK_STRIPES)]
+        self._lock = threading.RLock()
+        self._epoch = 0
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _generation(self, namespace, folder_id) -> Tuple[int, int, int]:
+        return (self._epoch,
+                self._generations.get((namespace, folder_id), 0),
+                self._generations.get((namespace, None), 0))
+
+    def _is_expired(self, entry: EmbeddingMatrix) -> bool:
+        return bool(self.ttl_seconds) and time.monotonic() - entry.loaded_at > self.ttl_seconds
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.nbytes
+
+    def get(self, key: Hashable) -> Optional[EmbeddingMatrix]:
+        """캐시 조회 (만료된 항목은 제거)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._is_expired(entry):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: EmbeddingMatrix) -> bool:
+        """캐시 저장 (상한을 넘는 항목은 저장하지 않음)"""
+        if entry.nbytes > self.max_bytes:
+            logger.warning(f"⚠️ 임베딩 행렬이 캐시 상한보다 큼 ({entry.nbytes} bytes): {key}")
+            return False
+
+        with self._lock:
+            self._remove(key)
+            while self._entries and self._total_bytes + entry.nbytes > self.max_bytes:
+                evicted_key, _ = next(iter(self._entries.items()))
+                self._remove(evicted_key)
+                self.evictions += 1
+                logger.debug(f"임베딩 행렬 캐시 축출: {evicted_key}")
+            self._entries[key] = entry
+            self._total_bytes += entry.nbytes
+            return True
+
+    def get_or_load(self, key: Hashable,
+                    loader: Callable[[], EmbeddingMatrix]) -> EmbeddingMatrix:
+        """캐시 조회 후 없으면 loader로 생성하여 저장
+
+        같은 키에 대한 동시 로드는 한 번만 수행됩니다. 로드 도중 해당 폴더가
+        무효화되면 결과는 이번 호출에만 사용하고 캐시에는 넣지 않습니다.
+        """
+        namespace, folder_id = key[0], key[1]
+
+        entry = self.get(key)
+        if entry is not None:
+            with self._lock:
+                self.hits += 1
+            return entry
+
+        load_lock = self._load_locks[hash(key) % len(self._load_locks)]
+
+        with load_lock:
+            entry = self.get(key)
+            if entry is not None:
+                with self._lock:
+                    self.hits += 1
+                return entry
+
+            with self._lock:
+                self.misses += 1
+                generation = self._generation(namespace, folder_id)
+
+            entry = loader()
+
+            with self._lock:
+                if self._generation(namespace, folder_id) == generation:
+                    self.put(key, entry)
+            return entry
+
+    def invalidate(self, namespace, folder_id=None):
+        """폴더 단위 무효화 (전체 컬렉션 행렬도 함께 무효화)"""
+        if folder_id is None:
+            self.invalidate_all(namespace)
+            return
+
+        with self._lock:
+            targets = {(namespace, folder_id), (namespace, None)}
+            for target in targets:
+                self._generations[target] = self._generations.get(target, 0) + 1
+            for key in [k for k in self._entries if (k[0], k[1]) in targets]:
+                self._remove(key)
+
+    def invalidate_all(self, namespace=None):
+        """네임스페이스 전체(또는 모든 항목) 무효화"""
+        with self._lock:
+            self._epoch += 1
+            for key in [k for k in self._entries if namespace is None or k[0] == namespace]:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 통계"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+_default_cache: Optional[EmbeddingMatrixCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingMatrixCache:
+    """프로세스 공용 임베딩 행렬 캐시"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingMatrixCache(
+                max_bytes=default_db_config.vector_cache_max_mb * 1024 * 1024,
+                ttl_seconds=default_db_config.vector_cache_ttl_seconds
+            )
+        return _default_cache
@@ -0,0 +1,102 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from bson import ObjectId
+from config.database_config import DatabaseConfig
+from src.embedding.ann_index import ANNIndexManager, FolderANNIndex
+from src.utils.vector_cache import normalize_vector
+
+
+class TestFolderANNIndex(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(500, 16)).astype(np.float32)
+        self.ids = [ObjectId() for _ in range(500)]
+        self.folder_id = ObjectId()
+
+    def _build(self, index_type):
+        config = DatabaseConfig(ann_index_type=index_type, ann_ivf_nlist=8, ann_nprobe=8)
+        ann_index = FolderANNIndex(self.folder_id, 16, config)
+        ann_index.build(self.ids, self.vectors)
+        return ann_index, config
+
+    def test_finds_nearest_neighbor(self):
+        for index_type in ("hnsw", "ivf_flat"):
+            ann_index, _ = self._build(index_type)
+            hits = ann_index.search(normalize_vector(self.vectors[42]), 3)
+            self.assertEqual(hits[0][0], self.ids[42], index_type)
+
+    def test_removed_documents_are_not_returned(self):
+        for index_type in ("hnsw", "ivf_flat"):
+            ann_index, _ = self._build(index_type)
+            ann_index.remove([self.ids[42]])
+
+            hits = ann_index.search(normalize_vector(self.vectors[42]), 5)
+
+            self.assertNotIn(self.ids[42], [doc_id for doc_id, _ in hits])
+            self.assertEqual(len(hits), 5)
+
+    def test_save_and_load_round_trip(self):
+        for index_type in ("hnsw", "ivf_flat"):
+            ann_index, config = self._build(index_type)
+            ann_index.remove([self.ids[0]])
+
+            with tempfile.TemporaryDirectory() as directory:
+                ann_index.save(directory)
+                self.assertTrue(os.path.exists(os.path.join(directory, "manifest.json")))
+                loaded = FolderANNIndex.load(self.folder_id, directory, config)
+
+            self.assertEqual(loaded.live_count, 499)
+            self.assertEqual(loaded.ids, ann_index.ids)
+            hits = loaded.search(normalize_vector(self.vectors[7]), 1)
+            self.assertEqual(hits[0][0], self.ids[7])
+
+
+class TestANNIndexManager(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.folder_id = ObjectId()
+        self.stored = [{"_id": ObjectId(), "text_embedding": vector.tolist(),
+                        "updated_at": datetime.datetime(2026, 1, 1)}
+                       for vector in rng.normal(size=(8, 16))]
+        self.db_client = Mock()
+        self.db_client.documents.find.side_effect = lambda query, projection: list(self.stored)
+        self.db_client.documents.count_documents.side_effect = lambda query: len(self.stored)
+        self.directory = tempfile.TemporaryDirectory()
+        config = DatabaseConfig(ann_min_documents=10, ann_ivf_nlist=2, ann_nprobe=2)
+        self.manager = ANNIndexManager(self.db_client, config, self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_small_folder_is_rechecked_after_additions(self):
+        self.assertIsNone(self.manager.get(self.folder_id))
+        self.assertIsNone(self.manager.get(self.folder_id))
+        self.assertEqual(self.db_client.documents.find.call_count, 1)
+
+        new_ids = [ObjectId() for _ in range(4)]
+        vectors = np.random.default_rng(2).normal(size=(4, 16))
+        self.stored += [{"_id": doc_id, "text_embedding": vector.tolist(),
+                         "updated_at": datetime.datetime(2026, 1, 2)}
+                        for doc_id, vector in zip(new_ids, vectors)]
+        self.manager.add(self.folder_id, new_ids, vectors.tolist())
+
+        ann_index = self.manager.get(self.folder_id)
+        self.assertIsNotNone(ann_index)
+        self.assertEqual(ann_index.live_count, 12)
+
+    def test_add_advances_high_water_mark(self):
+        self.stored += [{**doc, "_id": ObjectId()} for doc in self.stored]
+        ann_index = self.manager.get(self.folder_id)
+        before = ann_index.high_water_mark
+
+        self.manager.add(self.folder_id, [ObjectId()], [[1.0] * 16])
+
+        self.assertGreater(ann_index.high_water_mark, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,12 @@
+import datetime
+import hashlib
+import os
+import tempfile
+from fastapi import FastAPI, Request
 from fastapi.testclient import TestClient
 from src.api.main import app
+from src.api.routes import _is_abandoned
+from src.api.upload_stream import UploadSlots, stream_upload
 
 client = TestClient(app)
 
@@ -20,3 +27,89 @@ def test_query_endpoint():
     )
     # 벡터 스토어가 초기화되지 않은 경우 500 에러 예상
     assert response.status_code in [200, 500]
+
+def test_index_status_endpoint():
+    response = client.get("/admin/index")
+    # 인덱스 레지스트리가 초기화되지 않은 경우 503
+    assert response.status_code in [200, 503]
+
+def test_unqueued_upload_is_reprocessed_only_after_stale_limit():
+    now = datetime.datetime.utcnow()
+    entry = {"status": "queued", "updated_at": now}
+    
+    # reserve 직후 enqueue 전이면 처리 중으로 보고 재사용
+    assert not _is_abandoned(entry, None)
+    assert not _is_abandoned(entry, {"status": "running"})
+    assert _is_abandoned(entry, {"status": "failed"})
+    assert _is_abandoned({**entry, "updated_at": now - datetime.timedelta(days=1)}, None)
+
+def test_batch_query_rejects_invalid_folder_id():
+    response = client.post(
+        "/query/batch",
+        json={"queries": ["테스트 질문"], "folder_id": "not-an-object-id"}
+    )
+    # MongoDB 벡터 스토어가 초기화되지 않은 경우 503
+    assert response.status_code in [400, 503]
+
+def test_job_status_unknown_job():
+    response = client.get("/jobs/0123456789abcdef")
+    # 작업 큐가 초기화되지 않은 경우 503
+    assert response.status_code in [404, 503]
+
+def _upload_app(directory, max_bytes, slots=None):
+    upload_app = FastAPI()
+
+    @upload_app.post("/upload")
+    async def upload(request: Request):
+        if slots is not None:
+            slots.acquire()
+        try:
+            result = await stream_upload(request, directory, max_bytes)
+        finally:
+            if slots is not None:
+                slots.release()
+        return {"path": result.path, "filename": result.filename, "size": result.size, "sha256": result.sha256}
+
+    return TestClient(upload_app)
+
+def test_stream_upload_writes_file_and_hash():
+    content = os.urandom(300 * 1024)
+    with tempfile.TemporaryDirectory() as directory:
+        response = _upload_app(directory, 1024 * 1024).post(
+            "/upload", data={"note": "무시되는 필드"}, files={"file": ("기사.pdf", content, "application/pdf")}
+        )
+        body = response.json()
+        
+        assert response.status_code == 200
+        assert body["filename"] == "기사.pdf"
+        assert body["size"] == len(content)
+        assert body["sha256"] == hashlib.sha256(content).hexdigest()
+        with open(body["path"], "rb") as f:
+            assert f.read() == content
+
+def test_stream_upload_rejects_oversized_file():
+    with tempfile.TemporaryDirectory() as directory:
+        response = _upload_app(directory, 100 * 1024).post(
+            "/upload", files={"file": ("big.txt", b"x" * (150 * 1024), "text/plain")}
+        )
+        
+        assert response.status_code == 413
+        assert os.listdir(directory) == []
+
+def test_stream_upload_requires_file_field():
+    with tempfile.TemporaryDirectory() as directory:
+        response = _upload_app(directory, 1024).post("/upload", data={"note": "파일 없음"},
+                                                     files={"other": ("a.txt", b"abc", "text/plain")})
+        
+        assert response.status_code == 400
+        assert os.listdir(directory) == []
+
+def test_upload_slots_limit_concurrency():
+    slots = UploadSlots(1)
+    slots.acquire()
+    with tempfile.TemporaryDirectory() as directory:
+        response = _upload_app(directory, 1024, slots).post("/upload", files={"file": ("a.txt", b"abc", "text/plain")})
+    
+    assert response.status_code == 429
+    slots.release()
+    assert slots.active == 0
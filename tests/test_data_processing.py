@@ -1,6 +1,136 @@
+import copy
+import os
+import tempfile
+import threading
+import time
 import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain.schema import Document
 from src.data_processing.cleaner import TextCleaner
-from src.data_processing.chunker import TextChunker
+from src.data_processing.chunker import KoreanSentenceChunker, TextChunker
+from src.data_processing.dedup import ChunkDeduplicator
+from src.data_processing.file_registry import FileRegistry
+from src.data_processing.loader import DocumentLoader
+from src.data_processing.manifest import FileManifest
+from src.data_processing.pipeline import FaissSink, Stage, StreamingPipeline, build_ingest_pipeline, iter_files
+from src.embedding.vectorstore import VectorStore
+from src.utils.token_counter import approximate_token_count, get_token_counter, remember_token_counts, tokenizer_name
+from config.settings import settings
+
+class SlowFileLoader:
+    """내용의 초 만큼 멈추는 테스트용 로더 (프로세스 풀에서 pickle 가능하도록 모듈 수준)"""
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+    
+    def load(self):
+        with open(self.file_path, encoding="utf-8") as f:
+            seconds = float(f.read())
+        time.sleep(seconds)
+        return [Document(page_content=f"slept {seconds}", metadata={"source": self.file_path})]
+
+class FakeManifestCollection:
+    """FileManifest가 쓰는 연산만 구현한 메모리 컬렉션"""
+    
+    def __init__(self):
+        self.docs = {}
+    
+    def find(self, query):
+        return [{"_id": _id, **doc} for _id, doc in self.docs.items() if doc["root"] == query["root"]]
+    
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = dict(doc)
+    
+    def update_one(self, query, update):
+        self.docs[query["_id"]].update(update["$set"])
+    
+    def delete_many(self, query):
+        for _id in query["_id"]["$in"]:
+            self.docs.pop(_id, None)
+
+class FakeSignatureCollection:
+    """ChunkDeduplicator가 쓰는 연산만 구현한 메모리 컬렉션"""
+    
+    def __init__(self):
+        self.docs = {}
+    
+    def find(self, query, projection=None):
+        keys = set(query["bands"]["$in"])
+        return [{"_id": _id, **doc} for _id, doc in self.docs.items()
+                if keys & set(doc["bands"]) and doc["folder_id"] == query["folder_id"]]
+    
+    def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            self.docs[doc["_id"]] = {k: v for k, v in doc.items() if k != "_id"}
+    
+    def delete_many(self, query):
+        for _id in query["_id"]["$in"]:
+            if _id in self.docs and self.docs[_id]["folder_id"] == query["folder_id"]:
+                del self.docs[_id]
+
+class FakeChunkDocuments:
+    """ChunkDeduplicator가 원본 Document 확인에 쓰는 distinct만 구현"""
+    
+    def __init__(self, chunk_ids, folder_id):
+        self.chunk_ids = set(chunk_ids)
+        self.folder_id = folder_id
+    
+    def distinct(self, key, query):
+        if query["folder_id"] != self.folder_id:
+            return []
+        return [chunk_id for chunk_id in query["chunk_sequence"]["$in"] if chunk_id in self.chunk_ids]
+
+class FakeFilesCollection:
+    """FileRegistry가 쓰는 연산만 구현한 메모리 컬렉션"""
+    
+    def __init__(self):
+        self.docs = {}
+    
+    def find_one(self, query):
+        return copy.deepcopy(self.docs.get(query["_id"]))
+    
+    def insert_one(self, doc):
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("duplicate key")
+        self.docs[doc["_id"]] = dict(doc)
+    
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = dict(doc)
+    
+    def update_one(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is None or any(doc.get(key) != value for key, value in query.items()):
+            return SimpleNamespace(matched_count=0)
+        for path, value in update.get("$set", {}).items():
+            target = doc
+            *parents, leaf = path.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = value
+        for key, value in update.get("$addToSet", {}).items():
+            if value not in doc[key]:
+                doc[key] = doc[key] + [value]
+        return SimpleNamespace(matched_count=1)
+
+class FakeDocumentIds:
+    """FileRegistry가 Document 존재 여부를 확인하는 find_one만 구현"""
+    
+    def __init__(self):
+        self.folders = {}
+    
+    def find_one(self, query, projection=None):
+        for _id in query["_id"]["$in"]:
+            if _id in self.folders:
+                return {"_id": _id, "folder_id": self.folders[_id]}
+        return None
+
+ARTICLE = ("서울시는 내년부터 대중교통 요금을 인상한다고 밝혔다. 시는 운영 적자가 누적되어 "
+           "요금 조정이 불가피하다고 설명했다. 인상 폭은 지하철과 버스 모두 150원이며 "
+           "청소년과 어린이 요금은 동결된다. 시민단체는 물가 부담을 이유로 반대 입장을 냈다.")
 
 class TestDataProcessing(unittest.TestCase):
     def setUp(self):
@@ -14,6 +144,35 @@ class TestDataProcessing(unittest.TestCase):
         self.assertNotIn("광고", clean_text)
         self.assertNotIn("<p>", clean_text)
     
+    def test_cleaning_rules_compile_to_merged_passes(self):
+        self.assertEqual(len(self.cleaner.passes), 1)
+        self.assertEqual(self.cleaner.clean_text("기사 https://news.example.com/a?b=1  본문\n\n<br>끝"), "기사 본문 끝")
+    
+    def test_clean_documents_does_not_mutate_input(self):
+        document = Document(page_content="  <b>본문</b>  ", metadata={"source": "a.txt"})
+        
+        cleaned = self.cleaner.clean_documents([document, Document(page_content="<br>")])
+        
+        self.assertEqual([doc.page_content for doc in cleaned], ["본문"])
+        self.assertEqual(cleaned[0].metadata, {"source": "a.txt"})
+        self.assertEqual(document.page_content, "  <b>본문</b>  ")
+    
+    def test_stream_cleaning_matches_whole_text(self):
+        text = ("  첫 줄 <a\nhref='x'>링크</a>\n" + ARTICLE + "\n이 기사에는 광고가 포함될 수 있습니다.\n"
+                "출처 https://news.example.com/2026/10/18/article \n\n\n  <p>\n</p>  \n끝  ") * 3
+        expected = self.cleaner.clean_text(text)
+        
+        for block_size in (1, 7, 40, 1000):
+            blocks = [text[i:i + block_size] for i in range(0, len(text), block_size)]
+            self.assertEqual("".join(self.cleaner.clean_stream(blocks)), expected)
+    
+    def test_parallel_cleaning_keeps_order(self):
+        texts = [f"<p>문서 {i}</p>  본문" for i in range(40)]
+        
+        cleaned = self.cleaner.clean_texts_parallel(texts, max_workers=2, batch_size=8)
+        
+        self.assertEqual(cleaned, [f"문서 {i} 본문" for i in range(40)])
+    
     def test_text_chunking(self):
         text = "A" * 300  # 300자 텍스트
         chunks = self.chunker.split_text(text)
@@ -21,5 +180,431 @@ class TestDataProcessing(unittest.TestCase):
         self.assertGreater(len(chunks), 1)
         self.assertEqual(len(chunks[0]), 100)
 
+class TestStreamingPipeline(unittest.TestCase):
+    def test_stages_stream_and_count_throughput(self):
+        pipeline = StreamingPipeline([
+            Stage("split", lambda n: [n, n + 100], workers=2),
+            Stage("double", lambda batch: [n * 2 for n in batch], workers=2, batch_size=4)
+        ], queue_size=2)
+        
+        results = pipeline.stream(range(10))
+        
+        self.assertEqual(sorted(results), sorted(n * 2 for i in range(10) for n in (i, i + 100)))
+        stats = pipeline.stats()
+        self.assertEqual(stats["split"]["items_in"], 10)
+        self.assertEqual(stats["double"]["items_out"], 20)
+    
+    def test_bounded_queues_apply_backpressure(self):
+        produced = []
+        release = threading.Event()
+        
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+        
+        def slow(n):
+            release.wait()
+            return [n]
+        
+        pipeline = StreamingPipeline([Stage("slow", slow)], queue_size=2)
+        stream = pipeline.stream(source())
+        consumer = threading.Thread(target=lambda: list(stream))
+        consumer.start()
+        time.sleep(0.3)
+        
+        # 입력 큐(2) + 처리 중(1) + 피더가 들고 있는 항목(1)을 넘지 않음
+        self.assertLessEqual(len(produced), 4)
+        release.set()
+        consumer.join()
+        self.assertEqual(len(produced), 100)
+    
+    def test_stage_error_stops_pipeline(self):
+        def fail(n):
+            if n == 3:
+                raise RuntimeError("boom")
+            return [n]
+        
+        pipeline = StreamingPipeline([Stage("fail", fail, workers=2)])
+        
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            pipeline.run(range(1000))
+    
+    def test_ingest_pipeline_publishes_faiss_index(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_dir = os.path.join(tmp_dir, "raw")
+            os.makedirs(input_dir)
+            for i in range(3):
+                with open(os.path.join(input_dir, f"doc{i}.txt"), "w", encoding="utf-8") as f:
+                    f.write(f"문서 {i} 내용입니다. " * 50)
+            
+            embeddings = DeterministicFakeEmbedding(size=8)
+            sink = FaissSink(VectorStore(store_type="faiss"), embeddings, os.path.join(tmp_dir, "faiss"))
+            pipeline = build_ingest_pipeline(
+                embeddings, sink.add, chunker=TextChunker(chunk_size=100, overlap=0),
+                load_workers=2, embed_workers=2, embed_batch_size=8, store_batch_size=16, queue_size=4
+            )
+            
+            stored = pipeline.run(iter_files(input_dir))
+            version = sink.close()
+            
+            self.assertIsNotNone(version)
+            self.assertEqual(pipeline.stats()["load"]["items_in"], 3)
+            self.assertEqual(sink.vector_store.vectorstore.index.ntotal, stored)
+
+    def test_faiss_sink_publishes_every_n_chunks(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            embeddings = DeterministicFakeEmbedding(size=8)
+            sink = FaissSink(VectorStore(store_type="faiss"), embeddings, os.path.join(tmp_dir, "faiss"),
+                             publish_every=4)
+            pairs = [(Document(page_content=f"chunk {i}"), embeddings.embed_query(f"chunk {i}")) for i in range(10)]
+            
+            versions = set()
+            for start in range(0, 10, 2):
+                sink.add(pairs[start:start + 2])
+                self.assertLess(len(sink._pending), 4)
+                versions.add(sink.version)
+            sink.close()
+            
+            self.assertEqual(len(versions - {None}), 2)
+            self.assertEqual(sink.vector_store.vectorstore.index.ntotal, 10)
+
+
+class TestParallelLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.loader = DocumentLoader()
+        self.loader.loaders[".slow"] = SlowFileLoader
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def write(self, name, content):
+        with open(os.path.join(self.tmp_dir.name, name), "w", encoding="utf-8") as f:
+            f.write(content)
+    
+    def test_loads_all_files_and_isolates_corrupt_pdf(self):
+        for i in range(4):
+            self.write(f"doc{i}.txt", f"문서 {i}")
+        self.write("broken.pdf", "not a pdf")
+        
+        documents = list(self.loader.load_directory_parallel(self.tmp_dir.name, max_workers=2))
+        
+        self.assertEqual(sorted(doc.page_content for doc in documents), [f"문서 {i}" for i in range(4)])
+        self.assertEqual([os.path.basename(path) for path, _ in self.loader.failed_files], ["broken.pdf"])
+    
+    def test_large_files_are_scheduled_first(self):
+        self.write("small.txt", "a")
+        self.write("large.txt", "b" * 10000)
+        
+        documents = list(self.loader.load_directory_parallel(self.tmp_dir.name, max_workers=1))
+        
+        self.assertEqual([os.path.basename(doc.metadata["source"]) for doc in documents],
+                         ["large.txt", "small.txt"])
+    
+    def test_stalled_file_times_out_without_blocking_others(self):
+        self.write("stalled.slow", "30")
+        for i in range(3):
+            self.write(f"quick{i}.slow", "0")
+        
+        started = time.monotonic()
+        documents = list(self.loader.load_directory_parallel(
+            self.tmp_dir.name, max_workers=2, file_timeout=1
+        ))
+        
+        self.assertLess(time.monotonic() - started, 15)
+        self.assertEqual(len(documents), 3)
+        self.assertEqual([os.path.basename(path) for path, _ in self.loader.failed_files], ["stalled.slow"])
+    
+    def test_slow_consumer_does_not_time_out_finished_files(self):
+        for i in range(3):
+            self.write(f"quick{i}.slow", "0")
+        
+        documents = []
+        for document in self.loader.load_directory_parallel(self.tmp_dir.name, max_workers=3, file_timeout=0.5):
+            documents.append(document)
+            time.sleep(1)
+        
+        self.assertEqual(len(documents), 3)
+        self.assertEqual(self.loader.failed_files, [])
+
+class TestFileManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manifest = FileManifest(FakeManifestCollection(), self.tmp_dir.name)
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def write(self, name, content, mtime=None):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+        return path
+    
+    def sync(self):
+        plan = self.manifest.plan()
+        for path, info in plan.touched.items():
+            self.manifest.touch(path, info)
+        self.manifest.remove(list(plan.removed))
+        files = {**plan.new, **plan.changed}
+        for path in plan.to_process:
+            self.manifest.record(path, files[path], [f"{path}#0"], [])
+        return plan
+    
+    def test_first_sync_processes_all_files(self):
+        self.write("a.txt", "a")
+        self.write("b.md", "b")
+        
+        plan = self.sync()
+        
+        self.assertEqual(plan.summary(), {"new": 2, "changed": 0, "touched": 0, "removed": 0, "unchanged": 0})
+    
+    def test_plan_classifies_changes(self):
+        self.write("same.txt", "same", mtime=1000)
+        touched = self.write("touched.txt", "touched", mtime=1000)
+        changed = self.write("changed.txt", "old", mtime=1000)
+        removed = self.write("removed.txt", "removed", mtime=1000)
+        self.sync()
+        
+        self.write("touched.txt", "touched", mtime=2000)
+        self.write("changed.txt", "new content", mtime=1000)
+        os.remove(removed)
+        self.write("added.txt", "added")
+        
+        plan = self.sync()
+        
+        self.assertEqual(plan.summary(), {"new": 1, "changed": 1, "touched": 1, "removed": 1, "unchanged": 1})
+        self.assertEqual(list(plan.changed), [changed])
+        self.assertEqual(list(plan.touched), [touched])
+        self.assertEqual(sorted(entry["chunk_ids"][0] for entry in plan.stale_entries),
+                         sorted([f"{changed}#0", f"{removed}#0"]))
+        
+        again = self.sync()
+        self.assertEqual(again.to_process, [])
+        self.assertEqual(again.unchanged, 4)
+
+class TestChunkDeduplicator(unittest.TestCase):
+    def setUp(self):
+        self.collection = FakeSignatureCollection()
+    
+    def test_syndicated_copy_is_marked_duplicate(self):
+        dedup = ChunkDeduplicator(self.collection)
+        chunks = [
+            Document(page_content=ARTICLE),
+            Document(page_content=ARTICLE.replace("밝혔다", "밝혔습니다") + " (연합뉴스)"),
+            Document(page_content="정부는 반도체 산업 지원을 위해 세액 공제 범위를 넓히기로 했다.")
+        ]
+        
+        unique, duplicates = dedup.filter(chunks)
+        
+        self.assertEqual(unique, [chunks[0], chunks[2]])
+        self.assertEqual(duplicates, [chunks[1]])
+        self.assertEqual(chunks[1].metadata["duplicate_of"], chunks[0].metadata["chunk_id"])
+        self.assertEqual((dedup.seen, dedup.duplicates), (3, 1))
+    
+    def test_committed_signatures_persist_across_instances(self):
+        first = ChunkDeduplicator(self.collection)
+        canonical = Document(page_content=ARTICLE)
+        first.filter([canonical])
+        first.commit([canonical.metadata["chunk_id"]])
+        
+        copy = Document(page_content="[속보] " + ARTICLE)
+        unique, duplicates = ChunkDeduplicator(self.collection).filter([copy])
+        
+        self.assertEqual(unique, [])
+        self.assertEqual(copy.metadata["duplicate_of"], canonical.metadata["chunk_id"])
+    
+    def test_uncommitted_or_removed_chunks_are_not_canonical(self):
+        first = ChunkDeduplicator(self.collection)
+        stored, failed = Document(page_content=ARTICLE), Document(page_content=ARTICLE[::-1])
+        first.filter([stored, failed])
+        first.commit([stored.metadata["chunk_id"]])
+        first.remove([stored.metadata["chunk_id"]])
+        
+        unique, _ = ChunkDeduplicator(self.collection).filter(
+            [Document(page_content=ARTICLE), Document(page_content=ARTICLE[::-1])]
+        )
+        
+        self.assertEqual(len(unique), 2)
+    
+    def test_other_folder_or_deleted_canonical_is_not_duplicate(self):
+        folder_a, folder_b = ObjectId(), ObjectId()
+        canonical = Document(page_content=ARTICLE)
+        first = ChunkDeduplicator(self.collection, folder_id=folder_a)
+        first.filter([canonical])
+        first.commit([canonical.metadata["chunk_id"]])
+        
+        other_folder = ChunkDeduplicator(self.collection, folder_id=folder_b,
+                                         documents=FakeChunkDocuments([], folder_b))
+        unique, _ = other_folder.filter([Document(page_content=ARTICLE)])
+        self.assertEqual(len(unique), 1)
+        
+        deleted = ChunkDeduplicator(self.collection, folder_id=folder_a,
+                                    documents=FakeChunkDocuments([], folder_a))
+        unique, _ = deleted.filter([Document(page_content=ARTICLE)])
+        self.assertEqual(len(unique), 1)
+        self.assertNotIn(canonical.metadata["chunk_id"], self.collection.docs)
+    
+    def test_pipeline_skips_embedding_duplicates(self):
+        embeddings = Mock(wraps=DeterministicFakeEmbedding(size=8))
+        duplicates = []
+        stored = []
+        dedup = ChunkDeduplicator(self.collection)
+        pipeline = build_ingest_pipeline(
+            embeddings, lambda pairs: stored.extend(pairs), chunker=TextChunker(chunk_size=1000, overlap=0),
+            load_stage=False, deduplicator=dedup, on_duplicate=duplicates.append
+        )
+        
+        documents = [Document(page_content=ARTICLE, metadata={"source": f"news{i}.txt"}) for i in range(3)]
+        output = list(pipeline.stream(documents))
+        
+        self.assertEqual(len(output), 1)
+        self.assertEqual(sum(len(call.args[0]) for call in embeddings.embed_documents.call_args_list), 1)
+        self.assertEqual([chunk.metadata["duplicate_of"] for chunk in duplicates],
+                         [output[0].metadata["chunk_id"]] * 2)
+        self.assertEqual(list(self.collection.docs), [output[0].metadata["chunk_id"]])
+
+
+class TestKoreanSentenceChunker(unittest.TestCase):
+    def setUp(self):
+        self.text = " ".join([
+            "서울시는 내년부터 대중교통 요금을 3.5% 인상한다고 밝혔다.",
+            "시는 운영 적자가 누적되어 요금 조정이 불가피하다고 설명했다!",
+            "정말 그럴까?",
+            "전문가들은 “금리 인하 시점이 늦어질 수 있다”고 전망했다."
+        ] * 20)
+        self.chunker = KoreanSentenceChunker(chunk_tokens=80, overlap_tokens=20,
+                                             token_counter=approximate_token_count)
+    
+    def test_split_sentences_keeps_decimals(self):
+        sentences = [self.text[start:end] for start, end in self.chunker.split_sentences(self.text)]
+        
+        self.assertEqual(sentences[0], "서울시는 내년부터 대중교통 요금을 3.5% 인상한다고 밝혔다.")
+        self.assertEqual(sentences[2], "정말 그럴까?")
+        self.assertEqual(sentences[3], "전문가들은 “금리 인하 시점이 늦어질 수 있다”고 전망했다.")
+        self.assertEqual(len(sentences), 80)
+    
+    def test_chunks_fit_token_budget_and_record_counts(self):
+        chunks = self.chunker.split_document_spans(Document(page_content=self.text, metadata={"source": "news.txt"}))
+        
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(chunk.metadata["token_count"], 80)
+            self.assertEqual(chunk.metadata["token_count"], approximate_token_count(chunk.page_content))
+            self.assertEqual(self.text[chunk.metadata["span_start"]:chunk.metadata["span_end"]], chunk.page_content)
+            self.assertTrue(chunk.page_content.endswith((".", "!", "?")))
+        # 다음 청크는 이전 청크의 끝 문장부터 시작 (overlap)
+        self.assertLess(chunks[1].metadata["span_start"], chunks[0].metadata["span_end"])
+    
+    def test_long_sentence_without_spaces_is_split(self):
+        text = "가" * 500
+        spans = self.chunker.split_spans(text)
+        
+        self.assertEqual((spans[0][0], spans[-1][1]), (0, 500))
+        self.assertTrue(all(start <= prev_end for (_, prev_end), (start, _) in zip(spans, spans[1:])))
+        for start, end in spans:
+            self.assertLessEqual(approximate_token_count(text[start:end]), 80)
+    
+    def test_remembered_counts_skip_tokenization(self):
+        counter = get_token_counter("text-embedding-ada-002")
+        text = "토큰 수를 다시 세지 않는 청크"
+        remember_token_counts([text], [12345], [tokenizer_name("text-embedding-ada-002")])
+        
+        self.assertEqual(counter(text), 12345)
+    
+    def test_chunks_record_tokenizer(self):
+        chunker = KoreanSentenceChunker(chunk_tokens=80, overlap_tokens=20)
+        chunks = chunker.split_documents([Document(page_content=self.text)])
+        
+        self.assertEqual({chunk.metadata["token_model"] for chunk in chunks},
+                         {tokenizer_name(settings.embedding_model)})
+        self.assertNotIn("token_model", self.chunker.split_documents([Document(page_content=self.text)])[0].metadata)
+    
+    def test_counts_from_another_tokenizer_are_not_reused(self):
+        counter = get_token_counter("text-embedding-ada-002")
+        text = "다른 토크나이저로 센 청크"
+        remember_token_counts([text], [12345], ["other_tokenizer"])
+        
+        self.assertNotEqual(counter(text), 12345)
+
+
+class TestFileRegistry(unittest.TestCase):
+    def setUp(self):
+        self.documents = FakeDocumentIds()
+        self.db = SimpleNamespace(
+            db=SimpleNamespace(Files=FakeFilesCollection()),
+            documents=self.documents,
+            copy_documents_to_folder=Mock(side_effect=lambda ids, folder: {_id: ObjectId() for _id in ids})
+        )
+        self.registry = FileRegistry(self.db)
+        self.folder = ObjectId()
+    
+    def _complete(self, job_id="job-1"):
+        self.registry.reserve("hash", job_id, "news.pdf", 10)
+        document_ids = [ObjectId(), ObjectId()]
+        for _id in document_ids:
+            self.documents.folders[_id] = self.folder
+        self.registry.complete("hash", job_id, self.folder, document_ids, {"num_chunks": 2})
+        return document_ids
+    
+    def test_reupload_returns_existing_entry(self):
+        self.assertIsNone(self.registry.reserve("hash", "job-1", "news.pdf", 10))
+        self.assertEqual(self.registry.reserve("hash", "job-2", "copy.pdf", 10)["job_id"], "job-1")
+        
+        self._complete("job-1")
+        existing = self.registry.reserve("hash", "job-3", "copy.pdf", 10)
+        
+        self.assertEqual(existing["status"], "completed")
+        self.assertEqual(existing["result"], {"num_chunks": 2})
+    
+    def test_force_and_failed_entries_are_reprocessed(self):
+        self._complete("job-1")
+        
+        self.assertIsNone(self.registry.reserve("hash", "job-2", "news.pdf", 10, force=True))
+        # 교체된 작업의 결과는 기록하지 않음
+        self.registry.complete("hash", "job-1", self.folder, [], {"num_chunks": 0})
+        self.assertEqual(self.registry.lookup("hash")["job_id"], "job-2")
+        
+        self.registry.fail("hash", "job-2")
+        self.assertIsNone(self.registry.lookup("hash"))
+        self.assertIsNone(self.registry.reserve("hash", "job-3", "news.pdf", 10))
+    
+    def test_deleted_documents_invalidate_entry(self):
+        for _id in self._complete():
+            del self.documents.folders[_id]
+        
+        self.assertIsNone(self.registry.lookup("hash"))
+        self.assertIsNone(self.registry.reserve("hash", "job-2", "news.pdf", 10))
+    
+    def test_link_copies_documents_into_new_folder(self):
+        document_ids = self._complete()
+        other_folder = ObjectId()
+        
+        entry = self.registry.link(self.registry.lookup("hash"), other_folder)
+        self.registry.link(entry, other_folder)
+        
+        self.db.copy_documents_to_folder.assert_called_once_with(document_ids, other_folder)
+        self.assertEqual(entry["folder_ids"], [self.folder, other_folder])
+        self.assertEqual(self.registry.lookup("hash")["folder_ids"], [self.folder, other_folder])
+        self.assertEqual(len(self.registry.lookup("hash")["document_ids"][str(other_folder)]), 2)
+    
+    def test_pending_links_are_applied_on_complete(self):
+        self.registry.reserve("hash", "job-1", "news.pdf", 10)
+        other_folder = ObjectId()
+        
+        self.assertTrue(self.registry.add_pending_link(self.registry.lookup("hash"), other_folder))
+        document_ids = self._complete("job-1")
+        
+        entry = self.registry.lookup("hash")
+        self.db.copy_documents_to_folder.assert_called_once_with(document_ids, other_folder)
+        self.assertEqual(entry["folder_ids"], [self.folder, other_folder])
+        self.assertEqual(entry["pending_folder_ids"], [])
+        # 완료된 뒤에는 기록하지 않음 (호출자가 바로 link)
+        self.assertFalse(self.registry.add_pending_link(entry, ObjectId()))
+
+
 if __name__ == "__main__":
     unittest.main()
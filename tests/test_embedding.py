@@ -1,6 +1,24 @@
+import json
+import os
+import tempfile
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
+from langchain.schema import Document
+from langchain_community.embeddings import DeterministicFakeEmbedding
+from langchain_community.vectorstores import FAISS
+from src.embedding.docstore import MmapDocstore, load_faiss_store, save_faiss_store
 from src.embedding.embedder import Embedder
+from src.embedding.embedding_cache import CachedEmbeddings, EmbeddingCache
+from src.embedding.index_versions import VersionedIndexStore
+from src.embedding.local_embeddings import HashingNgramEmbeddings
+from src.embedding.query_cache import QueryEmbeddingCache
+from src.embedding.scheduler import EmbeddingScheduler, TokenBucket, pack_batches
+from src.embedding.vectorstore import VectorStore
+from src.retrieval.index_registry import IndexRegistry
+from config.settings import settings
 
 class TestEmbedding(unittest.TestCase):
     @patch('src.embedding.embedder.OpenAIEmbeddings')
@@ -17,5 +35,397 @@ class TestEmbedding(unittest.TestCase):
         self.assertEqual(len(result), 3)
         self.assertEqual(result, [0.1, 0.2, 0.3])
 
+    @patch('src.embedding.embedder.OpenAIEmbeddings')
+    def test_embed_queries_uses_query_path(self, mock_embeddings):
+        mock_instance = Mock()
+        mock_instance.embed_query.side_effect = lambda query: [float(len(query))]
+        mock_embeddings.return_value = mock_instance
+
+        embedder = Embedder()
+        result = embedder.embed_queries(["a", "bb", "a"])
+
+        self.assertEqual(result, [[1.0], [2.0], [1.0]])
+        self.assertEqual(mock_instance.embed_query.call_count, 2)
+        mock_instance.embed_documents.assert_not_called()
+
+class TestLocalEmbeddings(unittest.TestCase):
+    def test_deterministic_and_normalized(self):
+        embeddings = HashingNgramEmbeddings(dimension=256)
+        first = embeddings.embed_documents(["데이터베이스 정규화"])[0]
+        second = HashingNgramEmbeddings(dimension=256).embed_query("데이터베이스 정규화")
+        
+        self.assertEqual(len(first), 256)
+        self.assertEqual(first, second)
+        self.assertAlmostEqual(sum(value * value for value in first), 1.0, places=5)
+    
+    def test_similar_texts_score_higher(self):
+        embeddings = HashingNgramEmbeddings(dimension=512)
+        query, similar, unrelated = embeddings.embed_documents([
+            "관계형 데이터베이스의 정규화",
+            "데이터베이스 정규화 과정",
+            "오늘 점심 메뉴는 비빔밥"
+        ])
+        score = lambda a, b: sum(x * y for x, y in zip(a, b))
+        
+        self.assertGreater(score(query, similar), score(query, unrelated))
+    
+    def test_embedder_uses_local_backend_without_api(self):
+        with patch.object(settings, "embedding_model", "local-hash-ngram"), \
+             patch.object(settings, "local_embedding_dimension", 64), \
+             patch('src.embedding.embedder.OpenAIEmbeddings') as mock_embeddings:
+            embedder = Embedder()
+            result = embedder.embed_query("test query")
+        
+        mock_embeddings.assert_not_called()
+        self.assertTrue(embedder.is_local)
+        self.assertIsNone(embedder.scheduler)
+        self.assertEqual(len(result), 64)
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache", "embeddings.sqlite")
+        self.provider = Mock()
+        self.provider.embed_documents.side_effect = lambda texts: [[float(len(t)), 1.0] for t in texts]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _embeddings(self, max_bytes=1 << 20):
+        return CachedEmbeddings(self.provider, EmbeddingCache(self.path, max_bytes), "test-model")
+
+    def test_only_misses_are_sent_to_provider(self):
+        embeddings = self._embeddings()
+        embeddings.embed_documents(["alpha", "beta"])
+
+        result = embeddings.embed_documents(["beta", "gamma", "gamma", " alpha  "])
+
+        self.assertEqual(result, [[4.0, 1.0], [5.0, 1.0], [5.0, 1.0], [5.0, 1.0]])
+        self.assertEqual(self.provider.embed_documents.call_args.args[0], ["gamma"])
+        self.assertEqual(embeddings.cache.stats()["hits"], 2)
+
+    def test_cache_persists_across_instances(self):
+        first = self._embeddings()
+        first.embed_documents(["persisted"])
+        first.cache.close()
+
+        self._embeddings().embed_documents(["persisted"])
+
+        self.assertEqual(self.provider.embed_documents.call_count, 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        entry_bytes = 8 + 32  # float32 2개 + sha256
+        embeddings = self._embeddings(max_bytes=entry_bytes * 3)
+        for text in ["a", "b", "c"]:
+            embeddings.embed_documents([text])
+        embeddings.embed_documents(["a"])
+        embeddings.embed_documents(["d"])
+        self.provider.embed_documents.reset_mock()
+
+        embeddings.embed_documents(["a", "d", "b"])
+
+        self.assertEqual(self.provider.embed_documents.call_args.args[0], ["b"])
+
+class DictQueryCacheBackend:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, embedding):
+        self.values[key] = embedding
+
+class TestQueryEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.now = [0.0]
+        self.calls = []
+
+    def _compute(self, query):
+        self.calls.append(query)
+        return [float(len(query))]
+
+    def test_lru_and_ttl(self):
+        cache = QueryEmbeddingCache(max_entries=2, ttl_seconds=10, clock=lambda: self.now[0])
+        cache.get_or_compute("m", "a", self._compute)
+        cache.get_or_compute("m", "bb", self._compute)
+        cache.get_or_compute("m", "  a ", self._compute)
+        cache.get_or_compute("m", "ccc", self._compute)  # "bb" 축출
+
+        cache.get_or_compute("m", "bb", self._compute)
+        self.now[0] = 11.0
+        cache.get_or_compute("m", "a", self._compute)
+
+        self.assertEqual(self.calls, ["a", "bb", "ccc", "bb", "a"])
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_concurrent_identical_queries_share_one_call(self):
+        cache = QueryEmbeddingCache()
+        started = threading.Event()
+
+        def slow_compute(query):
+            started.set()
+            time.sleep(0.1)
+            return self._compute(query)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            cache.get_or_compute("m", "popular question", slow_compute))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(results, [[16.0]] * 5)
+        self.assertEqual(cache.stats()["coalesced"] + cache.stats()["hits"], 4)
+
+    def test_shared_backend_is_used_across_workers(self):
+        backend = DictQueryCacheBackend()
+        QueryEmbeddingCache(backend=backend).get_or_compute("m", "question", self._compute)
+        other_worker = QueryEmbeddingCache(backend=backend)
+
+        result = other_worker.get_or_compute("m", "question", self._compute)
+
+        self.assertEqual(result, [8.0])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(other_worker.stats()["shared_hits"], 1)
+
+class StubEmbeddingServer:
+    """OpenAI 호환 /embeddings 스텁 서버 (처음 failures개 요청은 429/503 응답)"""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with lock:
+                    stub.requests.append(body["input"])
+                    fail = len(stub.requests) <= stub.failures
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(delay)
+                with lock:
+                    stub.in_flight -= 1
+
+                if fail:
+                    self.send_response(429 if len(stub.requests) % 2 else 503)
+                    self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+
+                data = [{"index": i, "embedding": [float(len(text)), float(i)]}
+                        for i, text in enumerate(body["input"])]
+                payload = json.dumps({"data": list(reversed(data))}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class TestEmbeddingScheduler(unittest.TestCase):
+    def _scheduler(self, server, **kwargs):
+        return EmbeddingScheduler("test-key", "test-model", base_url=server.url,
+                                  backoff_base=0.01, token_counter=lambda text: len(text.split()),
+                                  **kwargs)
+
+    def test_batches_run_concurrently_and_keep_input_order(self):
+        server = StubEmbeddingServer(delay=0.05)
+        self.addCleanup(server.close)
+        texts = [" ".join(["word"] * (i % 5 + 1)) for i in range(40)]
+
+        result = self._scheduler(server, max_concurrency=4, max_batch_tokens=10).embed(texts)
+
+        self.assertEqual([vector[0] for vector in result], [float(len(text)) for text in texts])
+        self.assertGreater(len(server.requests), 4)
+        self.assertGreater(server.max_in_flight, 1)
+        self.assertLessEqual(server.max_in_flight, 4)
+
+    def test_retries_rate_limited_and_server_errors(self):
+        server = StubEmbeddingServer(failures=3)
+        self.addCleanup(server.close)
+        scheduler = self._scheduler(server, max_concurrency=1)
+
+        result = scheduler.embed(["a b", "c"])
+
+        self.assertEqual(result, [[3.0, 0.0], [1.0, 1.0]])
+        self.assertEqual(scheduler.retries, 3)
+
+    def test_pack_batches_by_token_count(self):
+        batches = pack_batches([3, 3, 3, 12, 1, 1], max_batch_tokens=7, max_batch_size=10)
+
+        self.assertEqual(batches, [[0, 1], [2], [3], [4, 5]])
+        self.assertEqual(pack_batches([1] * 5, 100, 2), [[0, 1], [2, 3], [4]])
+
+    def test_token_bucket_waits_for_refill(self):
+        now = [0.0]
+        bucket = TokenBucket(per_minute=60, capacity=2, clock=lambda: now[0])
+
+        self.assertEqual(bucket.reserve(2), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1), 1.0)
+        now[0] = 3.0
+        self.assertEqual(bucket.reserve(1), 0.0)
+
+class TestVersionedVectorStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = self.tmp_dir.name
+        self.embeddings = DeterministicFakeEmbedding(size=8)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _docs(self, prefix, count):
+        return [Document(page_content=f"{prefix} {i}", metadata={"i": i}) for i in range(count)]
+
+    def test_append_keeps_previous_documents(self):
+        writer = VectorStore(store_type="faiss")
+        first = writer.append_documents(self._docs("first", 3), self.embeddings, self.path)
+        second = writer.append_documents(self._docs("second", 2), self.embeddings, self.path)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(VersionedIndexStore(self.path).current_version(), second)
+
+        reader = VectorStore(store_type="faiss")
+        reader.load(self.path, self.embeddings)
+        self.assertEqual(reader.vectorstore.index.ntotal, 5)
+        self.assertEqual(reader.version, second)
+
+    def test_writer_reloads_when_another_writer_published(self):
+        writer_a = VectorStore(store_type="faiss")
+        writer_b = VectorStore(store_type="faiss")
+        writer_a.append_documents(self._docs("a", 2), self.embeddings, self.path)
+        writer_b.append_documents(self._docs("b", 2), self.embeddings, self.path)
+        writer_a.append_documents(self._docs("c", 1), self.embeddings, self.path)
+
+        self.assertEqual(writer_a.vectorstore.index.ntotal, 5)
+
+    def test_failed_publish_does_not_keep_unpublished_vectors(self):
+        writer = VectorStore(store_type="faiss")
+        first = writer.append_documents(self._docs("first", 3), self.embeddings, self.path)
+
+        with patch("src.embedding.vectorstore.save_faiss_store", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                writer.append_documents(self._docs("lost", 2), self.embeddings, self.path)
+
+        self.assertEqual(VersionedIndexStore(self.path).current_version(), first)
+        writer.append_documents(self._docs("second", 1), self.embeddings, self.path)
+        self.assertEqual(writer.vectorstore.index.ntotal, 4)
+
+    def test_delete_by_metadata_publishes_new_version(self):
+        writer = VectorStore(store_type="faiss")
+        docs = [Document(page_content=f"doc {i}", metadata={"chunk_id": f"c{i}"}) for i in range(4)]
+        first = writer.append_documents(docs, self.embeddings, self.path)
+
+        deleted = writer.delete_by_metadata("chunk_id", ["c1", "c3", "missing"], self.embeddings, self.path)
+
+        self.assertEqual(deleted, 2)
+        self.assertNotEqual(VersionedIndexStore(self.path).current_version(), first)
+        reader = VectorStore(store_type="faiss")
+        reader.load(self.path, self.embeddings)
+        remaining = sorted(reader.vectorstore.docstore.search(doc_id).metadata["chunk_id"]
+                           for doc_id in reader.vectorstore.index_to_docstore_id.values())
+        self.assertEqual(remaining, ["c0", "c2"])
+        self.assertEqual(writer.delete_by_metadata("chunk_id", ["c1"], self.embeddings, self.path), 0)
+
+    def test_prune_keeps_current_and_recent_versions(self):
+        store = VersionedIndexStore(self.path, keep_versions=2)
+        for _ in range(4):
+            store.publish(lambda path: os.makedirs(path))
+
+        self.assertEqual(len(store.list_versions()), 2)
+        self.assertIn(store.current_version(), store.list_versions())
+
+    def test_registry_swaps_and_drains_previous_version(self):
+        writer = VectorStore(store_type="faiss")
+        first = writer.append_documents(self._docs("first", 2), self.embeddings, self.path)
+        retriever = Mock()
+        registry = IndexRegistry(self.path, self.embeddings, retriever, store_type="faiss")
+        registry.load_current()
+
+        with registry.acquire() as in_flight:
+            second = writer.append_documents(self._docs("second", 2), self.embeddings, self.path)
+            self.assertTrue(registry.reload_if_changed())
+
+            self.assertEqual(in_flight.vectorstore.index.ntotal, 2)
+            self.assertEqual(retriever.vectorstore.vectorstore.index.ntotal, 4)
+            status = registry.status()
+            self.assertEqual(status["serving_version"], second)
+            self.assertEqual(status["draining_versions"], [{"version": first, "readers": 1}])
+
+        self.assertEqual(registry.status()["draining_versions"], [])
+        self.assertFalse(registry.reload_if_changed())
+
+class TestColumnarDocstore(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = self.tmp_dir.name
+        self.embeddings = DeterministicFakeEmbedding(size=8)
+        docs = [
+            Document(page_content="첫 번째 문서", metadata={"source": "a.pdf", "page": 1}),
+            Document(page_content="second document", metadata={}),
+            Document(page_content="", metadata={"source": "c.txt"}),
+        ]
+        self.store = FAISS.from_documents(docs, self.embeddings)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip_without_pickle(self):
+        save_faiss_store(self.store, self.path)
+        self.assertFalse(os.path.exists(os.path.join(self.path, "index.pkl")))
+
+        loaded = load_faiss_store(self.path, self.embeddings)
+
+        self.assertIsInstance(loaded.docstore, MmapDocstore)
+        self.assertEqual(loaded.docstore.search("0").page_content, "첫 번째 문서")
+        self.assertEqual(loaded.docstore.search("0").metadata, {"source": "a.pdf", "page": 1})
+        self.assertEqual(loaded.docstore.search("2").page_content, "")
+        self.assertEqual(loaded.docstore.search("3"), "ID 3 not found.")
+        hit = loaded.similarity_search("second document", k=1)[0]
+        self.assertEqual(hit.page_content, "second document")
+        self.assertEqual(loaded.docstore.metadata("0"), {"source": "a.pdf", "page": 1})
+        self.assertEqual(loaded.docstore.metadata("1"), {})
+        self.assertEqual(loaded.docstore.metadata("3"), {})
+
+    def test_add_and_delete_after_load(self):
+        save_faiss_store(self.store, self.path)
+        loaded = load_faiss_store(self.path, self.embeddings)
+
+        new_ids = loaded.add_texts(["새 문서"], metadatas=[{"source": "new.txt"}])
+        loaded.delete(["1"])
+        save_faiss_store(loaded, self.path)
+        reloaded = load_faiss_store(self.path, self.embeddings)
+
+        self.assertEqual(reloaded.index.ntotal, 3)
+        contents = [reloaded.docstore.search(str(i)).page_content for i in range(3)]
+        self.assertEqual(contents, ["첫 번째 문서", "", "새 문서"])
+        self.assertEqual(len(new_ids), 1)
+
+    def test_pickle_only_index_requires_opt_in(self):
+        self.store.save_local(self.path)
+
+        with self.assertRaises(ValueError):
+            load_faiss_store(self.path, self.embeddings)
+        loaded = load_faiss_store(self.path, self.embeddings, allow_pickle=True)
+        self.assertEqual(loaded.index.ntotal, 3)
+
 if __name__ == "__main__":
     unittest.main()
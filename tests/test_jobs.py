@@ -0,0 +1,237 @@
+import datetime
+import os
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from src.api import upload_jobs
+from src.utils.job_queue import JobProgress, JobQueue, JobWorkerPool
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$lt" in condition and not (value is not None and value < condition["$lt"]):
+                return False
+            if "$gte" in condition and not (value is not None and value >= condition["$gte"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _apply(doc, update):
+    for path, value in update.get("$set", {}).items():
+        target = doc
+        *parents, leaf = path.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    for key, value in update.get("$inc", {}).items():
+        doc[key] = doc.get(key, 0) + value
+
+
+class FakeJobCollection:
+    """JobQueue가 쓰는 연산만 구현한 메모리 컬렉션"""
+
+    def __init__(self):
+        self.docs = {}
+        self.lock = threading.Lock()
+
+    def insert_one(self, doc):
+        self.docs[doc["_id"]] = dict(doc)
+
+    def find_one(self, query):
+        return next((doc for doc in self.docs.values() if _matches(doc, query)), None)
+
+    def find_one_and_update(self, query, update, sort=None, return_document=None):
+        with self.lock:
+            matched = sorted((doc for doc in self.docs.values() if _matches(doc, query)),
+                             key=lambda doc: doc[sort[0][0]] if sort else 0)
+            if not matched:
+                return None
+            _apply(matched[0], update)
+            return dict(matched[0])
+
+    def update_one(self, query, update):
+        for doc in self.docs.values():
+            if _matches(doc, query):
+                _apply(doc, update)
+                return
+
+    def update_many(self, query, update):
+        matched = [doc for doc in self.docs.values() if _matches(doc, query)]
+        for doc in matched:
+            _apply(doc, update)
+        return SimpleNamespace(modified_count=len(matched))
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.collection = FakeJobCollection()
+        self.queue = JobQueue(self.collection, max_attempts=2)
+
+    def test_claim_takes_oldest_queued_job(self):
+        first = self.queue.enqueue("upload", {"filename": "a.txt"})
+        second = self.queue.enqueue("upload", {"filename": "b.txt"})
+        self.collection.docs[first]["created_at"] -= datetime.timedelta(seconds=1)
+
+        claimed = [self.queue.claim("worker")["_id"] for _ in range(2)]
+
+        self.assertEqual(claimed, [first, second])
+        self.assertIsNone(self.queue.claim("worker"))
+        self.assertEqual(self.queue.get(first)["status"], "running")
+        self.assertEqual(self.queue.get(first)["attempts"], 1)
+
+    def test_progress_records_stage_timing_and_errors(self):
+        job_id = self.queue.enqueue("upload", {})
+        progress = JobProgress(self.queue, job_id)
+
+        with progress.stage("ingest"):
+            progress.update("ingest", chunks=10)
+        with self.assertRaises(RuntimeError):
+            with progress.stage("labeling"):
+                raise RuntimeError("LLM unavailable")
+
+        stages = self.queue.get(job_id)["stages"]
+        self.assertEqual(stages["ingest"]["status"], "completed")
+        self.assertEqual(stages["ingest"]["chunks"], 10)
+        self.assertGreaterEqual(stages["ingest"]["seconds"], 0)
+        self.assertEqual(stages["labeling"]["status"], "failed")
+        self.assertEqual(stages["labeling"]["error"], "LLM unavailable")
+
+    def test_requeue_stale_running_jobs(self):
+        job_id = self.queue.enqueue("upload", {})
+        self.queue.claim("crashed-worker")
+        self.collection.docs[job_id]["heartbeat_at"] -= datetime.timedelta(seconds=600)
+
+        self.assertEqual(self.queue.requeue_stale(300), 1)
+        self.assertEqual(self.queue.get(job_id)["status"], "queued")
+
+        # 시도 횟수를 다 쓰면 다시 넣지 않고 실패 처리
+        self.queue.claim("crashed-worker")
+        self.collection.docs[job_id]["heartbeat_at"] -= datetime.timedelta(seconds=600)
+        self.assertEqual(self.queue.requeue_stale(300), 0)
+        self.assertEqual([job["_id"] for job in self.queue.fail_stale(300)], [job_id])
+        self.assertEqual(self.queue.get(job_id)["status"], "failed")
+        self.assertEqual(self.queue.fail_stale(300), [])
+
+    def test_abandoned_jobs_are_cleaned_up_by_kind(self):
+        abandoned = threading.Event()
+        on_abandoned = Mock(side_effect=lambda job: abandoned.set())
+        job_id = self.queue.enqueue("upload", {"path": "/tmp/upload.txt"})
+        self.queue.claim("crashed-worker")
+        self.collection.docs[job_id]["attempts"] = 2
+        self.collection.docs[job_id]["heartbeat_at"] -= datetime.timedelta(seconds=600)
+
+        pool = JobWorkerPool(self.queue, {"upload": Mock()}, workers=1, poll_interval=0.05,
+                             on_abandoned={"upload": on_abandoned})
+        pool.start()
+        try:
+            self.assertTrue(abandoned.wait(5))
+        finally:
+            pool.stop()
+
+        self.assertEqual(on_abandoned.call_args.args[0]["_id"], job_id)
+        self.assertEqual(self.queue.get(job_id)["status"], "failed")
+
+    def test_worker_pool_runs_handlers(self):
+        done = threading.Event()
+
+        def handler(job, progress):
+            with progress.stage("work"):
+                pass
+            if job["payload"]["fail"]:
+                raise ValueError("broken file")
+            done.set()
+            return {"ok": True}
+
+        pool = JobWorkerPool(self.queue, {"upload": handler}, workers=1, poll_interval=0.05)
+        failed = self.queue.enqueue("upload", {"fail": True})
+        succeeded = self.queue.enqueue("upload", {"fail": False})
+        self.collection.docs[failed]["created_at"] -= datetime.timedelta(seconds=1)
+        pool.start()
+        try:
+            self.assertTrue(done.wait(5))
+        finally:
+            pool.stop()
+
+        self.assertEqual(self.queue.get(failed)["status"], "failed")
+        self.assertEqual(self.queue.get(failed)["error"], "broken file")
+        self.assertEqual(self.queue.get(succeeded)["status"], "completed")
+        self.assertEqual(self.queue.get(succeeded)["result"], {"ok": True})
+        self.assertEqual(self.queue.get(succeeded)["stages"]["work"]["status"], "completed")
+
+    def test_failed_job_is_retried_until_max_attempts(self):
+        attempts = []
+        done = threading.Event()
+
+        def handler(job, progress):
+            attempts.append((job["attempts"], progress.final_attempt))
+            if len(attempts) == 1:
+                raise ConnectionError("MongoDB unavailable")
+            done.set()
+            return {"ok": True}
+
+        pool = JobWorkerPool(self.queue, {"upload": handler}, workers=1, poll_interval=0.05)
+        job_id = self.queue.enqueue("upload", {})
+        pool.start()
+        try:
+            self.assertTrue(done.wait(5))
+        finally:
+            pool.stop()
+
+        self.assertEqual(attempts, [(1, False), (2, True)])
+        self.assertEqual(self.queue.get(job_id)["status"], "completed")
+
+
+class TestProcessUpload(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "upload.txt")
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("본문")
+        self.progress = JobProgress(Mock(), "job-1")
+        for name in ("MongoDBClient", "Embedder", "FileRegistry"):
+            patch.object(upload_jobs, name).start()
+        patch.object(upload_jobs, "build_ingest_pipeline", side_effect=RuntimeError("embedding API down")).start()
+        self.purge = patch.object(upload_jobs, "_purge_job_output", return_value=0).start()
+        self.addCleanup(patch.stopall)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def _run(self, attempts, final_attempt):
+        self.progress.final_attempt = final_attempt
+        job = {"_id": "job-1", "attempts": attempts,
+               "payload": {"path": self.path, "filename": "upload.txt", "content_hash": "abc"}}
+        with self.assertRaises(RuntimeError):
+            upload_jobs.process_upload(job, self.progress)
+
+    def test_upload_is_kept_for_retry(self):
+        self._run(attempts=1, final_attempt=False)
+
+        self.assertTrue(os.path.exists(self.path))
+        self.purge.assert_not_called()
+        upload_jobs.FileRegistry.return_value.fail.assert_not_called()
+
+    def test_retry_purges_previous_attempt_and_final_failure_cleans_up(self):
+        self._run(attempts=2, final_attempt=True)
+
+        self.assertEqual(self.purge.call_count, 2)
+        self.assertFalse(os.path.exists(self.path))
+        upload_jobs.FileRegistry.return_value.fail.assert_called_once_with("abc", "job-1")
+
+    def test_abandoned_upload_is_cleaned_up(self):
+        upload_jobs.abandon_upload({"_id": "job-1", "kind": "upload",
+                                    "payload": {"path": self.path, "filename": "upload.txt", "content_hash": "abc"}})
+
+        self.purge.assert_called_once()
+        self.assertFalse(os.path.exists(self.path))
+        upload_jobs.FileRegistry.return_value.fail.assert_called_once_with("abc", "job-1")
+        upload_jobs.MongoDBClient.return_value.close.assert_called_once()
+
+if __name__ == "__main__":
+    unittest.main()
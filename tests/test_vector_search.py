@@ -0,0 +1,565 @@
+import datetime
+import tempfile
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from langchain.schema import Document
+from src.data_processing.chunker import TextChunker
+from bson import ObjectId
+from config.database_config import DatabaseConfig
+from src.embedding.vectorstore_v2 import MongoVectorStore
+from src.utils.database_v2 import MongoDBClientV2
+from src.utils.embedding_codec import decode_embedding, encode_embedding
+from src.utils.embedding_projection import fit_pca, load_projection, save_projection, truncation
+from src.utils.embedding_snapshot import export_folder_snapshot, snapshot_dimension
+from src.utils.vector_cache import EmbeddingMatrix, EmbeddingMatrixCache, normalize_vector
+
+
+class FakeCursor(list):
+    """sort/limit만 흉내내는 커서 (sort는 순서를 바꾸지 않음)"""
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, count):
+        return FakeCursor(self[:count])
+
+
+def _text_matches(text, query):
+    return any(term in text.split() for term in query["$search"].split())
+
+
+def _field(doc, path):
+    for key in path.split("."):
+        doc = doc.get(key) if isinstance(doc, dict) else None
+    return doc
+
+
+class FakeDocuments:
+    """vector_search/텍스트·메타데이터 검색이 사용하는 find 연산만 흉내내는 컬렉션"""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.full_name = "rag_system.Document"
+        self.find_calls = []
+
+    def find(self, query=None, projection=None, **kwargs):
+        self.find_calls.append((query, projection))
+        query = query or {}
+        results = []
+        for doc in self.documents:
+            if "_id" in query and doc["_id"] not in query["_id"]["$in"]:
+                continue
+            if "folder_id" in query and doc["folder_id"] != query["folder_id"]:
+                continue
+            if "updated_at" in query and not doc["updated_at"] > query["updated_at"]["$gt"]:
+                continue
+            if "embedding_version" in query:
+                version = query["embedding_version"]
+                if isinstance(version, dict):
+                    if "embedding_version" in doc:
+                        continue
+                elif doc.get("embedding_version") != version:
+                    continue
+            if "$text" in query and not _text_matches(doc.get("raw_text", ""), query["$text"]):
+                continue
+            if "source_id" in query and doc.get("source_id") not in query["source_id"].get("$in", [doc.get("source_id")]):
+                continue
+            if "source_id" in query and doc.get("source_id") == query["source_id"].get("$ne", ...):
+                continue
+            if any(_field(doc, key) != value for key, value in query.items() if key.startswith("metadata.")):
+                continue
+            if projection:
+                doc = {key: value for key, value in doc.items()
+                       if key == "_id" or projection.get(key)}
+            results.append(dict(doc))
+        return FakeCursor(results)
+
+    def distinct(self, key, query):
+        return list(dict.fromkeys(doc.get(key) for doc in self.find(query)))
+
+    def count_documents(self, query):
+        return len(self.find(query))
+
+
+class FakeSources:
+    """insert_one/find만 흉내내는 Sources 컬렉션"""
+
+    def __init__(self):
+        self.documents = {}
+        self.find_calls = 0
+
+    def insert_one(self, document):
+        _id = ObjectId()
+        self.documents[_id] = {"_id": _id, **document}
+        return Mock(inserted_id=_id)
+
+    def find(self, query, projection=None):
+        self.find_calls += 1
+        sources = [self.documents[_id] for _id in query.get("_id", {"$in": list(self.documents)})["$in"]
+                   if _id in self.documents]
+        if "$text" in query:
+            sources = [source for source in sources if _text_matches(source["search_terms"], query["$text"])]
+        return FakeCursor(sources)
+
+
+class TestEmbeddingMatrix(unittest.TestCase):
+    def test_top_k_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(50, 8))
+        ids = [ObjectId() for _ in range(50)]
+        matrix = EmbeddingMatrix.from_rows(zip(ids, vectors.tolist()), 8)
+
+        query = rng.normal(size=8)
+        hits = matrix.top_k(normalize_vector(query), 5)
+
+        expected = np.argsort(-(vectors @ query) / np.linalg.norm(vectors, axis=1))[:5]
+        self.assertEqual([doc_id for doc_id, _ in hits], [ids[i] for i in expected])
+
+    def test_top_k_batch_matches_top_k(self):
+        rng = np.random.default_rng(2)
+        ids = [ObjectId() for _ in range(40)]
+        matrix = EmbeddingMatrix.from_rows(zip(ids, rng.normal(size=(40, 8)).tolist()), 8)
+        matrix.excluded = np.array([3, 7])
+        queries = np.vstack([normalize_vector(q) for q in rng.normal(size=(6, 8))])
+
+        batch = matrix.top_k_batch(queries, 4)
+
+        self.assertEqual(batch, [matrix.top_k(query, 4) for query in queries])
+
+    def test_skips_mismatched_and_zero_rows(self):
+        rows = [(1, [1.0, 0.0]), (2, [0.0, 0.0]), (3, [1.0, 0.0, 0.0])]
+        matrix = EmbeddingMatrix.from_rows(rows, 2)
+
+        self.assertEqual(len(matrix), 1)
+        self.assertEqual(list(matrix.ids), [1])
+
+
+class TestEmbeddingMatrixCache(unittest.TestCase):
+    def _matrix(self, rows=4):
+        return EmbeddingMatrix(np.ones((rows, 4), dtype=np.float32), np.arange(rows, dtype=object))
+
+    def test_lru_eviction(self):
+        entry_bytes = self._matrix().nbytes
+        cache = EmbeddingMatrixCache(max_bytes=entry_bytes * 2)
+
+        cache.put(("ns", "a", 4), self._matrix())
+        cache.put(("ns", "b", 4), self._matrix())
+        cache.get(("ns", "a", 4))
+        cache.put(("ns", "c", 4), self._matrix())
+
+        self.assertIsNotNone(cache.get(("ns", "a", 4)))
+        self.assertIsNone(cache.get(("ns", "b", 4)))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_invalidate_drops_folder_and_global_entries(self):
+        cache = EmbeddingMatrixCache(max_bytes=1 << 20)
+        cache.put(("ns", "a", 4), self._matrix())
+        cache.put(("ns", "b", 4), self._matrix())
+        cache.put(("ns", None, 4), self._matrix())
+
+        cache.invalidate("ns", "a")
+
+        self.assertIsNone(cache.get(("ns", "a", 4)))
+        self.assertIsNone(cache.get(("ns", None, 4)))
+        self.assertIsNotNone(cache.get(("ns", "b", 4)))
+
+    def test_invalidation_during_load_is_not_cached(self):
+        cache = EmbeddingMatrixCache(max_bytes=1 << 20)
+
+        def loader():
+            cache.invalidate("ns", "a")
+            return self._matrix()
+
+        cache.get_or_load(("ns", "a", 4), loader)
+        self.assertIsNone(cache.get(("ns", "a", 4)))
+
+    def test_load_locks_do_not_grow_with_keys(self):
+        cache = EmbeddingMatrixCache(max_bytes=self._matrix().nbytes)
+        locks = len(cache._load_locks)
+
+        for i in range(locks * 4):
+            cache.get_or_load(("ns", f"folder_{i}", 4), self._matrix)
+
+        self.assertEqual(len(cache._load_locks), locks)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+
+class TestEmbeddingCodec(unittest.TestCase):
+    def setUp(self):
+        self.vector = np.random.default_rng(1).normal(size=64).astype(np.float32)
+
+    def test_float32_round_trip_is_zero_copy(self):
+        value, encoding = encode_embedding(self.vector, "float32")
+        decoded = decode_embedding(value, encoding)
+
+        np.testing.assert_array_equal(decoded, self.vector)
+        self.assertFalse(decoded.flags.owndata)
+
+    def test_quantized_formats_are_close(self):
+        for storage_format, tolerance in (("float16", 1e-2), ("int8", 5e-2)):
+            value, encoding = encode_embedding(self.vector, storage_format)
+            decoded = decode_embedding(value, encoding)
+            self.assertLess(np.max(np.abs(decoded - self.vector)), tolerance)
+        self.assertIn("scale", encode_embedding(self.vector, "int8")[1])
+
+    def test_array_format_is_unchanged(self):
+        value, encoding = encode_embedding([0.1, 0.2], "array")
+
+        self.assertEqual(value, [0.1, 0.2])
+        self.assertIsNone(encoding)
+
+
+class TestVectorSearch(unittest.TestCase):
+    def setUp(self):
+        self.folder_id = ObjectId()
+        self.docs = [
+            {"_id": ObjectId(), "folder_id": self.folder_id, "raw_text": f"doc {i}",
+             "text_embedding": embedding}
+            for i, embedding in enumerate([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0], [-1.0, 0.0]])
+        ]
+        self.db = MongoDBClientV2("mongodb://localhost:27017")
+        self.db.vector_cache = EmbeddingMatrixCache(max_bytes=1 << 20)
+        self.db.documents = FakeDocuments(self.docs)
+
+    def test_results_ordered_by_similarity(self):
+        results = self.db.vector_search([1.0, 0.1], self.folder_id, k=2)
+
+        self.assertEqual([r["document"]["raw_text"] for r in results], ["doc 0", "doc 1"])
+        self.assertGreater(results[0]["similarity"], results[1]["similarity"])
+
+    def test_matrix_is_cached_between_queries(self):
+        self.db.vector_search([1.0, 0.0], self.folder_id, k=1)
+        self.db.vector_search([0.0, 1.0], self.folder_id, k=1)
+
+        scoring_scans = [q for q, _ in self.db.documents.find_calls if "_id" not in q]
+        self.assertEqual(len(scoring_scans), 1)
+
+    def test_payload_fetch_excludes_embeddings(self):
+        results = self.db.vector_search([1.0, 0.0], self.folder_id, k=2)
+
+        self.assertNotIn("text_embedding", results[0]["document"])
+        payload_fetches = [q for q, _ in self.db.documents.find_calls if "_id" in q]
+        self.assertEqual(len(payload_fetches), 1)
+
+    def test_streaming_scan_matches_cached_search(self):
+        cached = self.db.vector_search([0.3, 1.0], self.folder_id, k=3)
+        self.db.vector_cache = None
+        streamed = self.db.vector_search([0.3, 1.0], self.folder_id, k=3)
+
+        self.assertEqual([r["document"]["_id"] for r in streamed],
+                         [r["document"]["_id"] for r in cached])
+
+    def test_batch_matches_single_queries(self):
+        queries = [[1.0, 0.1], [0.3, 1.0], [-1.0, 0.2]]
+        expected = [self.db.vector_search(query, self.folder_id, k=2) for query in queries]
+        self.db.documents.find_calls.clear()
+
+        results = self.db.vector_search_batch(queries, self.folder_id, k=2)
+
+        self.assertEqual([[r["document"]["_id"] for r in result] for result in results],
+                         [[r["document"]["_id"] for r in result] for result in expected])
+        payload_fetches = [q for q, _ in self.db.documents.find_calls if "_id" in q]
+        self.assertEqual(len(payload_fetches), 1)
+
+    def test_streaming_batch_scans_once(self):
+        self.db.vector_cache = None
+        queries = [[1.0, 0.1], [0.0, 0.0], [0.3, 1.0]]
+
+        results = self.db.vector_search_batch(queries, self.folder_id, k=3)
+
+        self.assertEqual(results[1], [])
+        self.assertEqual([r["document"]["raw_text"] for r in results[2]], ["doc 2", "doc 1", "doc 0"])
+        scoring_scans = [q for q, _ in self.db.documents.find_calls if "_id" not in q]
+        self.assertEqual(len(scoring_scans), 1)
+
+    def test_mixed_storage_formats(self):
+        expected = self.db.vector_search([0.3, 1.0], self.folder_id, k=4)
+        for doc, storage_format in zip(self.docs, ("float32", "float16", "int8")):
+            doc["text_embedding"], doc["embedding_encoding"] = \
+                encode_embedding(doc["text_embedding"], storage_format)
+        self.db.invalidate_vector_cache(self.folder_id)
+
+        results = self.db.vector_search([0.3, 1.0], self.folder_id, k=4)
+
+        self.assertEqual([r["document"]["_id"] for r in results],
+                         [r["document"]["_id"] for r in expected])
+
+
+class TestChunkSpans(unittest.TestCase):
+    def setUp(self):
+        self.folder_id = ObjectId()
+        self.text = " ".join(f"문장 {i}번은 원문에 한 번만 저장됩니다." for i in range(200))
+        self.chunker = TextChunker(chunk_size=120, overlap=40)
+        self.db = MongoDBClientV2("mongodb://localhost:27017")
+        self.db.vector_cache = EmbeddingMatrixCache(max_bytes=1 << 20)
+        self.db.sources = FakeSources()
+        self.source_id = self.db.insert_source(self.folder_id, self.text, {"source": "news.txt"})
+
+        self.spans = self.chunker.split_spans(self.text)
+        rng = np.random.default_rng(0)
+        self.docs = [
+            {"_id": ObjectId(), "folder_id": self.folder_id, "raw_text": "", "chunk_sequence": i,
+             "source_id": self.source_id, "span_start": start, "span_end": end,
+             "text_embedding": rng.normal(size=4).tolist()}
+            for i, (start, end) in enumerate(self.spans)
+        ]
+        self.db.documents = FakeDocuments(self.docs)
+
+    def test_spans_match_copied_chunks(self):
+        self.assertEqual([self.text[start:end] for start, end in self.spans],
+                         self.chunker.split_text(self.text))
+        chunks = self.chunker.split_document_spans(Document(page_content=self.text), str(self.source_id))
+        self.assertEqual(chunks[1].metadata["span_start"], self.spans[1][0])
+        self.assertEqual(chunks[1].metadata["source_id"], str(self.source_id))
+
+    def test_search_materializes_text_from_one_source_fetch(self):
+        results = self.db.vector_search(self.docs[3]["text_embedding"], self.folder_id, k=5)
+
+        self.assertEqual(results[0]["document"]["_id"], self.docs[3]["_id"])
+        for result in results:
+            doc = result["document"]
+            self.assertEqual(doc["raw_text"], self.text[doc["span_start"]:doc["span_end"]])
+        self.db.vector_search(self.docs[7]["text_embedding"], self.folder_id, k=5)
+        self.assertEqual(self.db.sources.find_calls, 1)
+
+    def test_context_window_expands_around_hit(self):
+        doc = self.docs[5]
+
+        window = self.db.get_context_window(doc, before=100, after=100)
+
+        self.assertEqual(window, self.text[doc["span_start"] - 100:doc["span_end"] + 100])
+
+    def test_text_search_finds_span_chunks_through_sources(self):
+        results = self.db.search_documents_by_text("150번은", self.folder_id, limit=3)
+
+        self.assertTrue(results)
+        for doc in results:
+            self.assertIn("150번은", doc["raw_text"])
+        self.assertEqual(self.db.search_documents_by_text("150번은", ObjectId()), [])
+        self.db.search_qa_pairs = Mock(return_value=[])
+        self.db.search_by_tags = Mock(return_value=[])
+        self.assertEqual(self.db.hybrid_search("150번은", self.folder_id, k=3)["text_results"], results)
+
+    def test_metadata_search_materializes_span_text(self):
+        for doc in self.docs:
+            doc["metadata"] = {"source": "news.txt"}
+        store = MongoVectorStore(self.db)
+
+        results = store.search_by_metadata({"source": "news.txt"}, self.folder_id)
+
+        self.assertEqual([doc.page_content for doc in results],
+                         [self.text[start:end] for start, end in self.spans])
+
+    def test_stored_text_is_smaller_than_copied_chunks(self):
+        copied = sum(len(self.text[start:end].encode("utf-8")) for start, end in self.spans)
+        source = self.db.sources.documents[self.source_id]
+
+        self.assertLess(source["text_encoding"]["bytes"], copied)
+        self.assertLess(len(source["text"]), source["text_encoding"]["bytes"])
+
+
+class FakeWriteCollection:
+    """insert_many/update_many 호출만 기록하는 컬렉션"""
+
+    def __init__(self):
+        self.batches = []
+        self.updates = []
+
+    def insert_many(self, documents, ordered=True):
+        self.batches.append((list(documents), ordered))
+
+    def update_many(self, query, update):
+        self.updates.append(query)
+
+
+class TestBulkWrites(unittest.TestCase):
+    def setUp(self):
+        self.db = MongoDBClientV2("mongodb://localhost:27017", DatabaseConfig(batch_size=4))
+        self.db.vector_cache = EmbeddingMatrixCache(max_bytes=1 << 20)
+        self.db.documents = FakeWriteCollection()
+        self.db.labels = FakeWriteCollection()
+        self.db.folders = FakeWriteCollection()
+        self.folder_id = ObjectId()
+
+    def test_documents_are_inserted_in_unordered_batches(self):
+        rows = [{"folder_id": self.folder_id, "raw_text": f"청크 {i}", "chunk_sequence": f"c{i}",
+                 "text_embedding": [0.1 * i, 0.2]} for i in range(10)]
+
+        ids = self.db.insert_documents_bulk(rows)
+
+        batches = self.db.documents.batches
+        self.assertEqual([len(batch) for batch, _ in batches], [4, 4, 2])
+        self.assertTrue(all(ordered is False for _, ordered in batches))
+        self.assertEqual(ids, [doc["_id"] for batch, _ in batches for doc in batch])
+        self.assertEqual([doc["chunk_sequence"] for batch, _ in batches for doc in batch],
+                         [f"c{i}" for i in range(10)])
+        # 폴더 접근 시간은 배치마다 한 번
+        self.assertEqual(self.db.folders.updates, [{"_id": {"$in": [self.folder_id]}}] * 3)
+
+    def test_bulk_rows_match_single_insert_format(self):
+        source_id = ObjectId()
+        self.db.insert_documents_bulk([{"folder_id": self.folder_id, "raw_text": "본문", "chunk_sequence": "c0",
+                                        "source_id": source_id, "span": (3, 9)}])
+        self.db.insert_labels_bulk([{"document_id": ObjectId(), "folder_id": self.folder_id,
+                                     "main_topic": "경제", "tags": ["금리"], "category": "news"}])
+
+        document = self.db.documents.batches[0][0][0]
+        label = self.db.labels.batches[0][0][0]
+        self.assertEqual((document["raw_text"], document["source_id"], document["span_start"], document["span_end"]),
+                         ("", source_id, 3, 9))
+        self.assertEqual((label["main_topic"], label["confidence"]), ("경제", 0.8))
+        self.assertEqual(self.db.insert_labels_bulk([]), [])
+
+    def test_delete_documents_removes_chunk_signatures(self):
+        other_folder = ObjectId()
+        docs = [{"_id": ObjectId(), "folder_id": self.folder_id, "chunk_sequence": "c0"},
+                {"_id": ObjectId(), "folder_id": other_folder, "chunk_sequence": "c1"}]
+        self.db.documents = Mock()
+        self.db.documents.find.return_value = docs
+        self.db.documents.distinct.return_value = []
+        self.db.chunk_signatures = Mock()
+        self.db.labels = Mock()
+        self.db.qa_pairs = Mock()
+
+        self.db.delete_documents([doc["_id"] for doc in docs], cascade=True)
+
+        self.db.chunk_signatures.delete_many.assert_any_call({"_id": {"$in": ["c0"]}, "folder_id": self.folder_id})
+        self.db.chunk_signatures.delete_many.assert_any_call({"_id": {"$in": ["c1"]}, "folder_id": other_folder})
+
+
+class TestEmbeddingSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.folder_id = ObjectId()
+        self.exported_at = datetime.datetime(2026, 1, 1)
+        self.docs = [
+            {"_id": ObjectId(), "folder_id": self.folder_id, "raw_text": f"doc {i}",
+             "text_embedding": embedding, "updated_at": self.exported_at}
+            for i, embedding in enumerate([[1.0, 0.0], [0.6, 0.8], [0.0, 1.0]])
+        ]
+        config = DatabaseConfig(vector_snapshot_enabled=True,
+                                vector_snapshot_path=self.tmp_dir.name)
+        self.db = MongoDBClientV2("mongodb://localhost:27017", config)
+        self.db.vector_cache = EmbeddingMatrixCache(max_bytes=1 << 20)
+        self.db.documents = FakeDocuments(self.docs)
+        export_folder_snapshot(self.db, self.folder_id, self.tmp_dir.name, 2)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_snapshot_is_memory_mapped(self):
+        results = self.db.vector_search([1.0, 0.1], self.folder_id, k=2)
+
+        self.assertEqual([r["document"]["raw_text"] for r in results], ["doc 0", "doc 1"])
+        matrix = self.db._get_embedding_matrix(self.folder_id, 2)
+        self.assertIsInstance(matrix.segments[0].matrix, np.memmap)
+        self.assertEqual(matrix.nbytes, 0)
+
+    def test_catches_up_on_updated_and_new_documents(self):
+        later = self.exported_at + datetime.timedelta(minutes=1)
+        self.docs[0].update(text_embedding=[-1.0, 0.0], updated_at=later)
+        self.docs.append({"_id": ObjectId(), "folder_id": self.folder_id, "raw_text": "doc 3",
+                          "text_embedding": [0.9, 0.1], "updated_at": later})
+
+        results = self.db.vector_search([1.0, 0.0], self.folder_id, k=4)
+
+        self.assertEqual([r["document"]["raw_text"] for r in results],
+                         ["doc 3", "doc 1", "doc 2", "doc 0"])
+        catch_up = [q for q, _ in self.db.documents.find_calls if "updated_at" in q]
+        self.assertEqual(len(catch_up), 1)
+
+    def test_deleted_documents_fall_back_to_full_load(self):
+        del self.docs[0]
+
+        results = self.db.vector_search([1.0, 0.0], self.folder_id, k=3)
+
+        self.assertEqual([r["document"]["raw_text"] for r in results], ["doc 1", "doc 2"])
+        self.assertIsInstance(self.db._get_embedding_matrix(self.folder_id, 2), EmbeddingMatrix)
+
+
+
+class TestEmbeddingProjection(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # 8차원 부분공간에 놓인 32차원 벡터
+        self.vectors = rng.normal(size=(200, 8)) @ rng.normal(size=(8, 32))
+
+    def test_pca_preserves_neighbors_of_low_rank_data(self):
+        projection = fit_pca(self.vectors, 8)
+        reduced = projection.transform(self.vectors)
+        query = self.vectors[:5] + 0.01
+
+        full = EmbeddingMatrix.from_rows(enumerate(self.vectors), 32)
+        small = EmbeddingMatrix.from_rows(enumerate(reduced), 8)
+        for i in range(5):
+            full_hits = [doc_id for doc_id, _ in full.top_k(normalize_vector(query[i]), 3)]
+            small_hits = [doc_id for doc_id, _ in small.top_k(
+                normalize_vector(projection.transform(query[i])[0]), 3)]
+            self.assertEqual(full_hits, small_hits)
+        self.assertAlmostEqual(projection.metadata["explained_variance_ratio"], 1.0, places=5)
+
+    def test_saved_projection_keeps_version(self):
+        projection = fit_pca(self.vectors, 4)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_projection(projection, tmp_dir)
+            loaded = load_projection(tmp_dir, projection.version)
+
+        self.assertTrue(projection.version.startswith("pca-4-"))
+        self.assertEqual(loaded.version, projection.version)
+        np.testing.assert_allclose(loaded.transform(self.vectors[:3]), projection.transform(self.vectors[:3]))
+        self.assertNotEqual(fit_pca(self.vectors[:100], 4).version, projection.version)
+
+    def test_snapshot_dimension_follows_active_projection(self):
+        projection = fit_pca(self.vectors, 4)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_projection(projection, tmp_dir)
+            config = DatabaseConfig(vector_dimension=32, embedding_projection_version=projection.version,
+                                    embedding_projection_path=tmp_dir)
+
+            self.assertEqual(snapshot_dimension(config), 4)
+            self.assertEqual(snapshot_dimension(config, 4), 4)
+            with self.assertRaises(ValueError):
+                snapshot_dimension(config, 32)
+        self.assertEqual(snapshot_dimension(DatabaseConfig(vector_dimension=32)), 32)
+
+    def test_search_only_uses_documents_of_active_version(self):
+        folder_id = ObjectId()
+        docs = [
+            {"_id": ObjectId(), "folder_id": folder_id, "raw_text": "raw", "text_embedding": [1.0, 0.0]},
+            {"_id": ObjectId(), "folder_id": folder_id, "raw_text": "v1", "text_embedding": [1.0, 0.0],
+             "embedding_version": "truncate-4-2"}
+        ]
+        for version, expected in ((None, ["raw"]), ("truncate-4-2", ["v1"])):
+            db = MongoDBClientV2("mongodb://localhost:27017", DatabaseConfig(
+                vector_cache_enabled=False, embedding_projection_version=version))
+            db.documents = FakeDocuments(docs)
+
+            results = db.vector_search([1.0, 0.0], folder_id, k=5)
+
+            self.assertEqual([r["document"]["raw_text"] for r in results], expected)
+
+    def test_vector_store_projects_documents_and_queries(self):
+        projection = truncation(4, 2)
+        db_client = Mock()
+        db_client.config = DatabaseConfig(embedding_projection_version=projection.version)
+        db_client.vector_search.return_value = []
+        store = MongoVectorStore(db_client, projection=projection)
+
+        store.add_documents([Document(page_content="a")], [[0.1, 0.2, 0.3, 0.4]], ObjectId())
+        store.similarity_search([1.0, 0.0, 0.5, 0.5], ObjectId(), k=1)
+
+        inserted = db_client.insert_documents_bulk.call_args.args[0][0]
+        np.testing.assert_allclose(inserted["text_embedding"], [0.1, 0.2], rtol=1e-6)
+        self.assertEqual(inserted["embedding_version"], "truncate-4-2")
+        self.assertEqual(db_client.vector_search.call_args.args[0], [1.0, 0.0])
+
+    def test_vector_store_rejects_projection_of_other_version(self):
+        db_client = Mock()
+        db_client.config = DatabaseConfig()
+
+        with self.assertRaises(ValueError):
+            MongoVectorStore(db_client, projection=truncation(4, 2))
+
+if __name__ == "__main__":
+    unittest.main()